@@ -4,14 +4,27 @@
 from __future__ import annotations
 
 import getpass
+import hmac
 import json
 import os
 import threading
 from datetime import datetime, timedelta
+from typing import TYPE_CHECKING
 
+import click
 import pytz
 import sqlalchemy as sqla
-from flask import Flask, redirect, request, session, url_for
+from flask import (
+    Flask,
+    Response,
+    abort,
+    current_app,
+    jsonify,
+    redirect,
+    request,
+    session,
+    url_for,
+)
 from flask_login import LoginManager
 from flask_socketio import SocketIO
 from flask_sqlalchemy import SQLAlchemy
@@ -26,17 +39,38 @@ from app.const import (
     MQTT_TRIGGER_TOPIC,
     MQTT_WORKOUT,
     MQTT_WORKOUT_CONTROL_ALL_TOPIC,
-    SENSOR_LOCATION,
+    STAIR_GEOMETRY,
     WORKOUT_SETTINGS,
     WORKOUTS,
+    AnimationPriority,
+    CommandStatus,
     IsAdmin,
+    QueuePolicy,
     ResetCounter,
 )
+from app.effect_executor import EffectExecutor
+from app.led_benchmark import run_benchmark
+from app.led_clock import VirtualClock, create_clock
+from app.led_commands import LEDCommandQueue
 from app.led_controller import Colors, LEDController
+from app.led_daemon import LEDDaemon, LEDDaemonClient
 from app.mqtt_controller import MQTTClient
+from app.mqtt_queue import MessageQueue
+from app.sensor_registry import SensorRegistry
+from app.stair_geometry import StairGeometry
+
+if TYPE_CHECKING:
+    from typing import BinaryIO
+
+    from app.led_animations import AnimationHandle
 
 db = SQLAlchemy()
 mqtt = MQTTClient()
+effect_executor = EffectExecutor()
+led_commands = LEDCommandQueue(effect_executor)
+sensor_registry = SensorRegistry()
+mqtt_triggers = MessageQueue("mqtt-trigger")
+mqtt_statuses = MessageQueue("mqtt-status", QueuePolicy.LATEST_WINS)
 socketio = SocketIO(engineio_logger=False, logger=False, cors_allowed_origins="*")
 login = LoginManager()
 login.login_view = "auth.login"
@@ -49,20 +83,24 @@ client_counters: list = [1]
 stair_counter: int = 0
 steps_counter: int = 0
 
-sandglass_thread: threading.Thread = None
+sandglass_animation: AnimationHandle = None
+# Set once the boot animation finished or was skipped
+led_ready = threading.Event()
 christmas_colors: list = [Colors.RED, Colors.GREEN]
 
 
 # ----------------------------------------------------------------------------#
 # LED strip configuration.
 # ----------------------------------------------------------------------------#
-LED_COUNT = 104  # Number of LED pixels.
+STAIR = StairGeometry.from_dict(STAIR_GEOMETRY)  # Steps and sensors on the strip
+LED_COUNT = STAIR.led_count  # Number of LED pixels.
 LED_PIN = 10  # GPIO pin connected to the pixels (18 uses PWM!).
 LED_FREQ_HZ = 800000  # LED signal frequency in hertz (usually 800khz)
 LED_DMA = 10  # DMA channel to use for generating signal (try 10)
 LED_BRIGHTNESS = 125  # Set to 0 for darkest and 255 for brightest
 LED_INVERT = False  # ON to invert the signal (Using level shift)
 LED_CHANNEL = 0  # set to '1' for GPIOs 13, 19, 41, 45 or 53
+LED_FPS = 60  # Number of frames per second committed to the strip
 
 led_controller = LEDController(
     LED_COUNT,
@@ -72,6 +110,8 @@ led_controller = LEDController(
     LED_BRIGHTNESS,
     LED_INVERT,
     LED_CHANNEL,
+    LED_FPS,
+    STAIR,
 )
 
 # -----------------------------------
@@ -79,13 +119,20 @@ led_controller = LEDController(
 # -----------------------------------
 
 
-def create_app() -> Flask:
+def create_app(*, led_daemon: bool = False) -> Flask:  # noqa: PLR0912, PLR0915
     """Create the Flask application.
 
-    Returns
+    Args:
+    ----
+        led_daemon (bool): Create the app of the LED daemon, which only
+            drives the strip and runs `flask led_daemon`. It does not
+            connect to MQTT, start the effect workers or register routes.
+
+    Returns:
     -------
         Flask: The Flask application.
     """
+    global led_controller
     app = Flask(__name__)
 
     # Load config values from app/config.py
@@ -95,18 +142,42 @@ def create_app() -> Flask:
         app.config.from_object("config.TestingConfig")
     else:
         app.config.from_object("config.DevelopmentConfig")
+    app.config["LED_DAEMON"] = led_daemon
+
+    if led_daemon:
+        start_led_controller(app, led_controller)
+        led_controller.turn_off()
+        register_cli_commands(app)
+        return app
 
     # Initialize the socketio instance
     socketio.init_app(app)
     socketio.async_mode = app.config["SOCKETIO_ASYNC_MODE"]
-    led_controller.start()
+    if app.config["LED_DAEMON_SOCKET"]:
+        # The strip is owned by the LED daemon, see `flask led_daemon`
+        led_controller = LEDDaemonClient(
+            StairGeometry.load(app.config["STAIR_GEOMETRY_FILE"])
+            if app.config["STAIR_GEOMETRY_FILE"]
+            else STAIR,
+            app.config["LED_DAEMON_SOCKET"],
+            app.config["LED_DAEMON_FRAMES"],
+        )
+    else:
+        start_led_controller(app, led_controller)
     led_controller.turn_off()
+    # The blueprints look the controller up here, it can be the daemon client
+    app.extensions["led_controller"] = led_controller
 
     initialize_extensions(app)
     register_blueprints(app)
     register_cli_commands(app)
     register_routes(app)
     register_mqtt_events(app)
+    if not app.config["LED_API_TOKEN"]:
+        app.logger.warning(
+            "LED_API_TOKEN is not set, anyone on the network can drive the LEDs "
+            "through /led_frame, /led_stream and the led_frame Socket.IO event",
+        )
 
     # Check if the database needs to be initialized
     engine = sqla.create_engine(app.config["SQLALCHEMY_DATABASE_URI"])
@@ -118,14 +189,79 @@ def create_app() -> Flask:
             app.logger.info("Initialized the database!")
     else:
         app.logger.info("Database already contains the users table.")
-
-    # Show visual feedback that the app is ready
-    led_controller.rainbow()
-    led_controller.color_wipe(Color(0, 0, 0), 10)
+        if not inspector.has_table("scenes"):
+            with app.app_context():
+                Scene.__table__.create(db.engine)
+                app.logger.info("Added the scenes table to the database.")
+
+    # Triggers are checked against the sensors in memory
+    with app.app_context():
+        sensor_registry.load(Sensor.query.all())
+
+    # Show visual feedback that the app is ready, without delaying the boot
+    led_ready.clear()
+    boot_job = None
+    if app.config["LED_BOOT_ANIMATION"]:
+        boot_job = effect_executor.submit(boot_animation, key="boot")
+    if boot_job is None:
+        led_ready.set()
+    else:
+        boot_job.add_done_callback(lambda _: led_ready.set())
 
     return app
 
 
+def start_led_controller(app: Flask, controller: LEDController) -> None:
+    """Configure a controller that owns the strip and start rendering.
+
+    Args:
+    ----
+        app: The Flask application.
+        controller (LEDController): The controller to start
+    """
+    if app.config["STAIR_GEOMETRY_FILE"]:
+        controller.set_geometry(StairGeometry.load(app.config["STAIR_GEOMETRY_FILE"]))
+    controller.set_clock(
+        create_clock(app.config["LED_CLOCK"], app.config["LED_CLOCK_SPEED"]),
+    )
+    controller.start(
+        app.config["LED_BACKEND"],
+        app.config["LED_SINK_PATH"],
+        app.config["LED_CHANNELS"],
+    )
+    # Limit the memory used by pre-rendered animations
+    controller.frame_cache.resize(app.config["LED_FRAME_CACHE_SIZE"])
+    controller.renderer.flight_recorder.resize(
+        app.config["LED_FLIGHT_RECORDER_FRAMES"],
+    )
+
+
+def boot_animation() -> None:
+    """Show a rainbow and wipe it away to signal that the app is ready.
+
+    Both run as background animations, so the first trigger or workout
+    takes over the stair right away.
+    """
+    if led_controller.rainbow(priority=AnimationPriority.BACKGROUND):
+        led_controller.color_wipe(
+            Color(0, 0, 0),
+            10,
+            priority=AnimationPriority.BACKGROUND,
+        )
+
+
+def workout_end_animation(celebrate: bool) -> None:  # noqa: FBT001
+    """Wipe the stair when a workout stops.
+
+    Args:
+    ----
+        celebrate (bool): Show a rainbow first, for a finished workout
+    """
+    if celebrate:
+        led_controller.rainbow()
+    led_controller.color_wipe(Color(0, 0, 0), 10)
+
+
 def initialize_extensions(app: Flask) -> None:
     """Initialize the extensions.
 
@@ -143,6 +279,12 @@ def initialize_extensions(app: Flask) -> None:
         app.config["MQTT_KEEPALIVE"],
     )
 
+    # Initialize the LED effect workers
+    effect_executor.start(
+        app.config["LED_EFFECT_WORKERS"],
+        app.config["LED_EFFECT_QUEUE_SIZE"],
+    )
+
     # Initialize the login manager
     login.init_app(app)
 
@@ -170,7 +312,7 @@ def initialize_extensions(app: Flask) -> None:
 
 
 from app.blueprints.auth.models import User
-from app.blueprints.backend.models import Sensor, Workout
+from app.blueprints.backend.models import Scene, Sensor, Workout
 
 
 def register_blueprints(app: Flask) -> None:
@@ -189,7 +331,7 @@ def register_blueprints(app: Flask) -> None:
     app.register_blueprint(frontend_bp)
 
 
-def register_cli_commands(app: Flask) -> None:
+def register_cli_commands(app: Flask) -> None:  # noqa: PLR0915
     """Register the CLI commands.
 
     Args:
@@ -250,6 +392,78 @@ def register_cli_commands(app: Flask) -> None:
             db.session.rollback()
             return
 
+    @app.cli.command("led_daemon")
+    def led_daemon() -> None:
+        """Run the LED pipeline in this process for the web workers."""
+        if not app.config["LED_DAEMON"]:
+            msg = (
+                "The LED daemon needs its own app without MQTT, run it with "
+                "flask --app 'app:create_app(led_daemon=True)' led_daemon"
+            )
+            raise click.UsageError(msg)
+        controller = led_controller
+        server = LEDDaemon(
+            controller,
+            app.config["LED_DAEMON_SOCKET"],
+            app.config["LED_DAEMON_FRAMES"],
+        )
+        print(f"LED daemon listening on {app.config['LED_DAEMON_SOCKET']}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            print("LED daemon stopped")
+        finally:
+            server.server_close()
+            controller.stop()
+
+    @app.cli.command("benchmark_leds")
+    @click.option("--seconds", default=60.0, help="Seconds of stair time to render")
+    def benchmark_leds(seconds: float) -> None:
+        """Measure the frame times of a busy workout on the virtual clock."""
+        if app.config["LED_DAEMON_SOCKET"] or app.config["LED_DAEMON"]:
+            # The strip belongs to the LED daemon
+            backend = "virtual"
+        else:
+            # Free the strip this process opened when it started
+            led_controller.stop()
+            backend = app.config["LED_BACKEND"]
+        controller = LEDController(
+            LED_COUNT,
+            LED_PIN,
+            LED_FREQ_HZ,
+            LED_DMA,
+            LED_BRIGHTNESS,
+            LED_INVERT,
+            LED_CHANNEL,
+            LED_FPS,
+            STAIR,
+        )
+        if app.config["STAIR_GEOMETRY_FILE"]:
+            controller.set_geometry(
+                StairGeometry.load(app.config["STAIR_GEOMETRY_FILE"]),
+            )
+        controller.set_clock(VirtualClock())
+        controller.start(
+            backend,
+            app.config["LED_SINK_PATH"],
+            app.config["LED_CHANNELS"],
+        )
+        stats = run_benchmark(controller, seconds)
+        controller.stop()
+
+        print(
+            f"{stats['frames']} frames in {stats['elapsed_s']} s, "
+            f"frame budget {stats['budget_ms']} ms",
+        )
+        print(f"{'stage':<24}{'frames':>8}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}")
+        rows = {"frame": stats["frame"], "commit": stats["commit"]}
+        rows.update({f"effect {name}": row for name, row in stats["effects"].items()})
+        for name, row in rows.items():
+            print(
+                f"{name:<24}{row['count']:>8}{row['p50_ms']:>9.3f}"
+                f"{row['p95_ms']:>9.3f}{row['p99_ms']:>9.3f}{row['max_ms']:>9.3f}",
+            )
+
 
 def control_workout(event: dict) -> None:
     """General function to control the workouts.
@@ -263,6 +477,8 @@ def control_workout(event: dict) -> None:
     if event["mode"] == "start":
         print(f"Starting workout - nr: {event['workout_id']}")
         workout_id = event["workout_id"]
+        # Stop what is left of the previous workout right away
+        led_controller.cancel_animations()
 
         WORKOUT_SETTINGS = {
             "active": True,
@@ -276,6 +492,17 @@ def control_workout(event: dict) -> None:
         else:
             mqtt.send(MQTT_WORKOUT_CONTROL_ALL_TOPIC, "start")
 
+        # Visuals described by the operator, see app/led_programs.py. They
+        # run as a compositor layer next to the sandglass
+        if event.get("program"):
+            try:
+                led_controller.play_program(
+                    event["program"],
+                    AnimationPriority.TRIGGER,
+                )
+            except ValueError as error:
+                print(f"Invalid effect program: {error}")
+
     elif event["mode"] == "stop" or event["mode"] == "finished":
         print(f"Stopping workout - nr: {event['workout_id']}")
         mqtt.send(MQTT_WORKOUT_CONTROL_ALL_TOPIC, "stop")
@@ -286,11 +513,20 @@ def control_workout(event: dict) -> None:
             "christmas_mode": False,
         }
 
+        celebrate = False
         if workout_id == 2:
             handle_workout_id_2(event, start=False)
+            celebrate = event["mode"] == "finished" and event["led_toggle"]
 
         workout_id = None
-        led_controller.color_wipe(Color(0, 0, 0), 10)
+        # Runs on the LED command workers like /turn_off, so the Socket.IO
+        # handler does not wait for the animation
+        led_commands.submit(
+            "stop_workout",
+            workout_end_animation,
+            celebrate,
+            key="led_color",
+        )
 
 
 def handle_workout_id_2(event: dict, start: bool) -> None:  # noqa: FBT001
@@ -317,10 +553,6 @@ def handle_workout_id_2(event: dict, start: bool) -> None:  # noqa: FBT001
 
         stop_workout_2_thread(event)
 
-        if event["mode"] == "finished" and event["led_toggle"]:
-            led_controller.rainbow()
-            led_controller.color_wipe(Color(0, 0, 0), 10)
-
 
 def activate_specific_sensors() -> None:
     """Activate the sensors via MQTT."""
@@ -330,26 +562,24 @@ def activate_specific_sensors() -> None:
 
 
 def start_workout_2_thread(event: dict) -> None:
-    """Start the sandglass thread.
+    """Start the sandglass animation.
 
     Args:
     ----
         event (dict): The event data.
     """
-    global sandglass_thread
+    global sandglass_animation
     colors = Colors()
 
-    if sandglass_thread is not None and sandglass_thread.is_alive():
-        led_controller.stop_sandglass_thread()
-        sandglass_thread.join()
-        sandglass_thread = None
+    if sandglass_animation is not None:
+        sandglass_animation.cancel()
+        sandglass_animation = None
 
     if event["led_toggle"]:
-        sandglass_thread = threading.Thread(
-            target=led_controller.sandglass,
-            args=(event["time"], colors.hex_to_rgb(event["color"])),
+        sandglass_animation = led_controller.sandglass(
+            event["time"],
+            colors.hex_to_rgb(event["color"]),
         )
-        sandglass_thread.start()
     else:
         led_controller.set_sensor_led(colors.BLUE, int(event["end_sensor"][7:]))
         led_controller.one_led(colors.GREEN, 103)
@@ -357,19 +587,19 @@ def start_workout_2_thread(event: dict) -> None:
 
 
 def stop_workout_2_thread(event: dict) -> None:
-    """Stop the sandglass thread.
+    """Stop the sandglass animation.
 
     Args:
     ----
         event (dict): The event data.
     """
-    global sandglass_thread
+    global sandglass_animation
     colors = Colors()
 
     if event["led_toggle"]:
-        led_controller.stop_sandglass_thread()
-        sandglass_thread = None
-        print(f"thread stopped: {led_controller.stop_sandglass_thread()}")
+        if sandglass_animation is not None:
+            print(f"Sandglass stopped: {sandglass_animation.cancel()}")
+        sandglass_animation = None
     else:
         led_controller.one_led(colors.RED, 103)
 
@@ -410,14 +640,7 @@ def update_counters(value: int, reset: ResetCounter = ResetCounter.NO) -> None:
         stair_counter += value
 
         # Update the steps counter
-        steps = {
-            1: 1,
-            2: 3,
-            3: 5,
-            4: 7,
-            5: 9,
-            6: 11,
-        }.get(client_counters[1])
+        steps = led_controller.geometry.sensor_step(client_counters[1])
         steps_counter += steps
 
         print(f"Stair counter: {stair_counter}, Steps counter: {steps_counter}")
@@ -428,7 +651,7 @@ def update_counters(value: int, reset: ResetCounter = ResetCounter.NO) -> None:
     )
 
 
-def register_mqtt_events(app: Flask) -> None:
+def register_mqtt_events(app: Flask) -> None:  # noqa: PLR0915
     """Register the MQTT events.
 
     Args:
@@ -437,7 +660,7 @@ def register_mqtt_events(app: Flask) -> None:
     """
 
     def is_client_id_valid(client_id: str) -> bool:
-        """Run check on valid sensor in database.
+        """Check that the sensor is registered, without touching the database.
 
         Args:
         ----
@@ -447,28 +670,20 @@ def register_mqtt_events(app: Flask) -> None:
         -------
             bool: True if the client ID is valid, False if not.
         """
-        with app.app_context():
-            sensor = Sensor.query.filter_by(client_id=f"sensor-{client_id}").first()
-        return sensor is not None
+        return client_id in sensor_registry
 
-    def on_topic_trigger(
-        client: MQTTClient,  # pylint: disable=unused-argument
-        userdata: dict,  # pylint: disable=unused-argument
-        message: dict,
-    ) -> None:
-        """MQTT function to handle trigger messages.
+    def handle_trigger(data: dict) -> None:
+        """Handle a trigger message on the trigger worker.
 
         Args:
         ----
-            client: The client instance for this callback.
-            userdata: The private user data as set in Client() or userdata_set().
-            message: An instance of MQTTMessage.
+            data: The parsed trigger message.
         """
         colors = Colors()
-        data: dict = json.loads(message.payload)
         client_id = data["client_id"]
 
         if WORKOUT_SETTINGS["active"] and is_client_id_valid(client_id):
+            led_controller.trigger_program(client_id)
             match workout_id:
                 case 1:
                     # Kameleon
@@ -478,7 +693,12 @@ def register_mqtt_events(app: Flask) -> None:
                     workout_counting(client_id)
                 case 3:
                     # Meeloper
-                    print("Workout 3")
+                    led_controller.follow_step(
+                        led_controller.geometry.sensor_position(client_id),
+                        colors.hex_to_rgb(WORKOUT_SETTINGS["color"])
+                        if WORKOUT_SETTINGS["color"]
+                        else colors.RED,
+                    )
                 case 4:
                     # Waterdruppels
                     # Define the color effect
@@ -491,42 +711,32 @@ def register_mqtt_events(app: Flask) -> None:
                     else:
                         color_effect = colors.hex_to_rgb(WORKOUT_SETTINGS["color"])
 
-                    # Start the thread
-                    thread = threading.Thread(
-                        target=led_controller.ripple_effect,
-                        args=(
-                            SENSOR_LOCATION.get(client_id),
-                            12,
-                            color_effect,
-                        ),
+                    # Drop a wave into the shared ripple field, overlapping
+                    # waves of nearby sensors interfere with each other
+                    led_controller.ripple_drop(
+                        led_controller.geometry.sensor_position(client_id),
+                        color_effect,
                     )
-                    thread.start()
                 case _:
                     print("Workout not found")
-        print(f"Message Received from Others: {message.payload.decode()}")
+        print(f"Message Received from Others: {json.dumps(data)}")
 
-    def on_topic_status(
-        client: MQTTClient,  # pylint: disable=unused-argument
-        userdata: dict,  # pylint: disable=unused-argument
-        message: dict,
-    ) -> None:
-        """MQTT Function to handle status messages.
+    def handle_status(data: dict) -> None:
+        """Handle a status message on the status worker.
 
         Args:
         ----
-            client: The client instance for this callback.
-            userdata: The private user data as set in Client() or userdata_set().
-            message: An instance of MQTTMessage.
+            data: The parsed status message.
         """
-        data = json.loads(message.payload)
         # Send the data to the frontend
         socketio.emit(f"sensor_status_{data['client_id']}", data)
         socketio.emit("sensors_status_all", data)
         try:
+            sensor_id = sensor_registry.get(data["client_id"])
             with app.app_context():
-                sensor = Sensor.query.filter_by(
-                    client_id=f"sensor-{data['client_id']}",
-                ).first()
+                sensor = (
+                    None if sensor_id is None else db.session.get(Sensor, sensor_id)
+                )
                 if sensor:
                     # If the sensor already exists
                     sensor.ip_address = data["ip_address"]
@@ -541,7 +751,8 @@ def register_mqtt_events(app: Flask) -> None:
 
                     db.session.commit()
                 else:
-                    # If the sensor doesn't exist
+                    # If the sensor doesn't exist, or was deleted meanwhile
+                    sensor_registry.remove(data["client_id"])
                     print(
                         f"Sensor: {data['client_id']}, doesn't exist in the database."
                     )
@@ -550,12 +761,64 @@ def register_mqtt_events(app: Flask) -> None:
         except KeyError as error:
             print(f"MQTT data is missing the following key: {error}")
 
+    def on_topic_trigger(
+        client: MQTTClient,  # pylint: disable=unused-argument
+        userdata: dict,  # pylint: disable=unused-argument
+        message: dict,
+    ) -> None:
+        """MQTT function to queue trigger messages.
+
+        Runs on the paho network thread, so it only parses the message.
+        Messages without a client ID are dropped here, so the trigger
+        worker only gets messages it can handle.
+
+        Args:
+        ----
+            client: The client instance for this callback.
+            userdata: The private user data as set in Client() or userdata_set().
+            message: An instance of MQTTMessage.
+        """
+        try:
+            data = json.loads(message.payload)
+            data["client_id"]
+        except (KeyError, TypeError, ValueError) as error:
+            print(f"Invalid MQTT trigger message: {error}")
+            return
+        mqtt_triggers.put(data)
+
+    def on_topic_status(
+        client: MQTTClient,  # pylint: disable=unused-argument
+        userdata: dict,  # pylint: disable=unused-argument
+        message: dict,
+    ) -> None:
+        """MQTT Function to queue status messages.
+
+        Runs on the paho network thread, so it only parses the message. A
+        newer status of a sensor replaces its status that is still waiting.
+
+        Args:
+        ----
+            client: The client instance for this callback.
+            userdata: The private user data as set in Client() or userdata_set().
+            message: An instance of MQTTMessage.
+        """
+        try:
+            data = json.loads(message.payload)
+            client_id = data["client_id"]
+        except (KeyError, TypeError, ValueError) as error:
+            print(f"Invalid MQTT status message: {error}")
+            return
+        mqtt_statuses.put(data, key=client_id)
+
+    mqtt_triggers.start(handle_trigger, app.config["MQTT_QUEUE_SIZE"])
+    mqtt_statuses.start(handle_status, app.config["MQTT_QUEUE_SIZE"])
+
     # MQTT events
     mqtt.client.message_callback_add(MQTT_TRIGGER_TOPIC, on_topic_trigger)
     mqtt.client.message_callback_add(MQTT_STATUS_TOPIC, on_topic_status)
 
 
-def register_routes(app: Flask) -> None:
+def register_routes(app: Flask) -> None:  # noqa: PLR0915
     """Register the routes.
 
     Args:
@@ -563,20 +826,156 @@ def register_routes(app: Flask) -> None:
         app: The Flask application.
     """
 
+    def command_response(command_id: str) -> Response:
+        """Answer a queued LED command without waiting for it.
+
+        Args:
+        ----
+            command_id (str): Id of the queued command
+
+        Returns:
+        -------
+            Response: The command status for API clients, otherwise a
+                redirect back to the LED control page
+        """
+        if request.accept_mimetypes.best == "application/json":
+            status = led_commands.status(command_id)
+            code = 503 if status["status"] == CommandStatus.DROPPED.value else 202
+            return jsonify(status), code
+        return redirect(url_for("backend.led_control", command=command_id))
+
     @app.route("/set_color", methods=["GET"])
-    def set_color() -> None:
-        """Set LED strip color."""
+    def set_color() -> Response:
+        """Queue a new LED strip color."""
         args = request.args
-        led_controller.set_color(
-            Color(int(args.get("red")), int(args.get("green")), int(args.get("blue"))),
+        try:
+            color = Color(
+                *(
+                    min(max(int(args[name]), 0), 255)
+                    for name in ("red", "green", "blue")
+                ),
+            )
+        except (KeyError, ValueError):
+            abort(400)
+        command_id = led_commands.submit(
+            "set_color",
+            led_controller.set_color,
+            color,
+            key="led_color",
         )
-        return redirect(url_for("backend.led_control"))
+        return command_response(command_id)
 
     @app.route("/turn_off")
-    def turn_off() -> None:
-        """Turn off LED strip."""
-        led_controller.color_wipe(Color(0, 0, 0), 10)
-        return redirect(url_for("backend.led_control"))
+    def turn_off() -> Response:
+        """Queue turning off the LED strip."""
+        command_id = led_commands.submit(
+            "turn_off",
+            led_controller.color_wipe,
+            Color(0, 0, 0),
+            10,
+            key="led_color",
+        )
+        return command_response(command_id)
+
+    @app.route("/scene/<int:scene_id>")
+    def show_scene(scene_id: int) -> Response:
+        """Queue showing a stored scene.
+
+        Args:
+        ----
+            scene_id (int): The id of the scene to show.
+        """
+        scene = db.session.get(Scene, scene_id)
+        if scene is None:
+            abort(404)
+        command_id = led_commands.submit(
+            "show_scene",
+            led_controller.show_scene,
+            scene.id,
+            scene.spec,
+            key="led_color",
+        )
+        return command_response(command_id)
+
+    @app.route("/led_frame", methods=["POST"])
+    def led_frame() -> Response:
+        """Show one raw frame, three RGB bytes per LED pixel."""
+        if not led_api_authorized():
+            abort(401)
+        try:
+            led_controller.show_frame(request.get_data(cache=False))
+        except ValueError as error:
+            abort(400, str(error))
+        return "", 204
+
+    @app.route("/led_stream", methods=["POST"])
+    def led_stream() -> Response:
+        """Show the raw frames of a streamed body one after the other.
+
+        The body is read one frame at a time while it arrives, so a show
+        can stream for as long as it runs over a single connection.
+        """
+        if not led_api_authorized():
+            abort(401)
+        frame_size = led_controller.count * 3
+        frames = 0
+        while data := read_exactly(request.stream, frame_size):
+            try:
+                led_controller.show_frame(data)
+            except ValueError as error:
+                abort(400, f"Frame {frames} is incomplete: {error}")
+            frames += 1
+        return jsonify({"frames": frames})
+
+    @app.route("/led_commands/<command_id>")
+    def led_command_status(command_id: str) -> Response:
+        """Return the status of a queued LED command."""
+        status = led_commands.status(command_id)
+        if status is None:
+            abort(404)
+        return jsonify(status)
+
+    @app.route("/health")
+    def health() -> Response:
+        """Return 200 once the boot animation finished, 503 before."""
+        ready = led_ready.is_set()
+        return jsonify({"led_ready": ready}), 200 if ready else 503
+
+
+def led_api_authorized() -> bool:
+    """Check the token of the binary frame API, if one is configured.
+
+    Returns
+    -------
+        bool: True if no token is configured or the request carries it
+    """
+    token = current_app.config["LED_API_TOKEN"]
+    if not token:
+        return True
+    sent = request.headers.get("Authorization", "").removeprefix("Bearer ")
+    sent = sent or request.args.get("token", "")
+    return hmac.compare_digest(sent.encode(), token.encode())
+
+
+def read_exactly(stream: BinaryIO, size: int) -> bytes:
+    """Read a number of bytes from a stream, unless the stream ends first.
+
+    Args:
+    ----
+        stream (BinaryIO): The stream to read from
+        size (int): Number of bytes to read
+
+    Returns:
+    -------
+        bytes: The bytes read, shorter than `size` at the end of the stream
+    """
+    data = bytearray()
+    while len(data) < size:
+        chunk = stream.read(size - len(data))
+        if not chunk:
+            break
+        data += chunk
+    return bytes(data)
 
 
 # SocketIO events
@@ -597,6 +996,30 @@ def on_system_control(event: dict) -> None:
     control_workout(event)
 
 
+@socketio.on("led_frame")
+def on_led_frame(data: bytes) -> bool:
+    """Show one raw frame sent as a binary Socket.IO message.
+
+    The connection stays open, so an external controller streams its
+    frames by emitting one `led_frame` event per frame.
+
+    Args:
+    ----
+        data (bytes): Three RGB bytes per LED pixel
+
+    Returns:
+    -------
+        bool: Acknowledgement, True if the frame was shown
+    """
+    if not led_api_authorized() or not isinstance(data, bytes):
+        return False
+    try:
+        led_controller.show_frame(data)
+    except ValueError:
+        return False
+    return True
+
+
 @socketio.on("restart_sensors")
 def on_restart_sensors(event: str) -> None:
     """SocketIO function to handle restart_sensors event.
@@ -1,22 +1,55 @@
 """Blueprint for the backend of the application."""
 from __future__ import annotations
 
+import io
+import json
+import tempfile
 from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING
 
 import pytz
-from flask import Blueprint, flash, redirect, render_template, request, url_for
+from flask import (
+    Blueprint,
+    abort,
+    current_app,
+    flash,
+    jsonify,
+    redirect,
+    render_template,
+    request,
+    send_file,
+    url_for,
+)
 from flask_login import current_user, login_required
 from sqlalchemy.exc import SQLAlchemyError
 
-from app import db
+from app import (
+    db,
+    led_commands,
+    mqtt_statuses,
+    mqtt_triggers,
+    sensor_registry,
+)
 from app.blueprints.auth.models import User
+from app.led_profiler import HISTOGRAM_EDGES_MS
+from app.led_scenes import compile_scene
 
 from .forms import AddSensorForm
-from .models import Sensor, Workout
+from .models import Scene, Sensor, Workout
+
+if TYPE_CHECKING:
+    from app.led_controller import LEDController
+    from app.led_daemon import LEDDaemonClient
 
 bp = Blueprint("backend", __name__, template_folder="templates/admin")
 
 
+def _led_controller() -> LEDController | LEDDaemonClient:
+    """Return the LED controller of the app, or the client of the LED daemon."""
+    return current_app.extensions["led_controller"]
+
+
 @bp.route("/", methods=["GET"])
 @login_required
 def dashboard() -> None:
@@ -77,6 +110,7 @@ def add_sensor() -> None:
             )
             db.session.add(sensor)
             db.session.commit()
+            sensor_registry.add(sensor.client_id, sensor.id)
         except SQLAlchemyError as error:
             print(f"Failed to add sensor: {error}")
     flash("Sensor is toegevoegd!", "success")
@@ -95,6 +129,7 @@ def delete_sensor(sensor_id: str) -> None:
         sensor = db.session.get(Sensor, sensor_id)
         db.session.delete(sensor)
         db.session.commit()
+        sensor_registry.remove(sensor.client_id)
     except SQLAlchemyError as error:
         print(f"Failed to delete sensor: {error}")
     flash("Sensor is verwijderd!", "success")
@@ -107,6 +142,7 @@ def delete_all_sensors() -> None:
     """Delete all sensors."""
     Sensor.query.delete()
     db.session.commit()
+    sensor_registry.clear()
     flash("All sensors deleted.", "success")
     return redirect(url_for("backend.sensors"))
 
@@ -186,7 +222,100 @@ def delete_workout(workout_id: int) -> None:
 @login_required
 def led_control() -> None:
     """Render the led_control page."""
-    return render_template("led_control.html", user=current_user)
+    command_id = request.args.get("command")
+    return render_template(
+        "led_control.html",
+        user=current_user,
+        command=led_commands.status(command_id) if command_id else None,
+        scenes=Scene.query.order_by(Scene.name).all(),
+    )
+
+
+# Scene routes
+def _scene_spec() -> dict | None:
+    """Parse and compile the scene description of the posted form.
+
+    Returns
+    -------
+        dict: The description, None if it is invalid
+    """
+    try:
+        spec = json.loads(request.form.get("spec") or "{}")
+        controller = _led_controller()
+        compile_scene(spec, controller.count, controller.geometry)
+    except ValueError as error:
+        flash(f"Ongeldige scene: {error}", "danger")
+        return None
+    return spec
+
+
+@bp.route("/scenes/add", methods=["POST"])
+@login_required
+def add_scene() -> None:
+    """Add a scene."""
+    spec = _scene_spec()
+    if spec is not None:
+        try:
+            scene = Scene(
+                name=request.form.get("name"),
+                spec=spec,
+                updated_at=datetime.now(pytz.timezone("Europe/Amsterdam")),
+            )
+            db.session.add(scene)
+            db.session.commit()
+            flash("Scene is toegevoegd!", "success")
+        except SQLAlchemyError as error:
+            db.session.rollback()
+            print(f"Failed to add scene: {error}")
+    return redirect(url_for("backend.led_control"))
+
+
+@bp.route("/scenes/<int:scene_id>/update", methods=["POST"])
+@login_required
+def update_scene(scene_id: int) -> None:
+    """Update a scene.
+
+    Args:
+    ----
+        scene_id (int): The id of the scene to update.
+    """
+    scene = db.session.get(Scene, scene_id)
+    if scene is None:
+        abort(404)
+    spec = _scene_spec()
+    if spec is not None:
+        try:
+            scene.name = request.form.get("name", scene.name)
+            scene.spec = spec
+            scene.updated_at = datetime.now(pytz.timezone("Europe/Amsterdam"))
+            db.session.commit()
+            flash("Scene is bijgewerkt!", "success")
+        except SQLAlchemyError as error:
+            db.session.rollback()
+            print(f"Failed to update scene: {error}")
+        # Compile the new description the next time the scene is shown
+        _led_controller().invalidate_scene(scene_id)
+    return redirect(url_for("backend.led_control"))
+
+
+@bp.route("/scenes/<int:scene_id>/delete", methods=["POST"])
+@login_required
+def delete_scene(scene_id: int) -> None:
+    """Delete a scene.
+
+    Args:
+    ----
+        scene_id (int): The id of the scene to delete.
+    """
+    try:
+        scene = db.session.get(Scene, scene_id)
+        db.session.delete(scene)
+        db.session.commit()
+    except SQLAlchemyError as error:
+        print(f"Failed to delete scene: {error}")
+    _led_controller().invalidate_scene(scene_id)
+    flash("Scene is verwijderd!", "success")
+    return redirect(url_for("backend.led_control"))
 
 
 @bp.route("/users", methods=["GET"])
@@ -196,3 +325,64 @@ def users() -> None:
     if current_user.is_admin:
         return render_template("users.html", user=current_user, users=User.query.all())
     return redirect(url_for("backend.dashboard"))
+
+
+@bp.route("/led_profiler", methods=["GET"])
+@login_required
+def led_profiler() -> None:
+    """Render the frame times of the LED effects, or return them as JSON."""
+    if not current_user.is_admin:
+        abort(403)
+    report = _led_controller().profiler_report()
+    if report is None:
+        # The LED daemon cannot be reached
+        abort(503)
+    if request.args.get("format") == "json":
+        return jsonify(report["stats"])
+    return render_template(
+        "led_profiler.html",
+        user=current_user,
+        stats=report["stats"],
+        renderer=report["renderer"],
+        edges=HISTOGRAM_EDGES_MS,
+    )
+
+
+@bp.route("/mqtt_queues", methods=["GET"])
+@login_required
+def mqtt_queues() -> None:
+    """Return the depth, drops and lag of the MQTT message queues as JSON."""
+    if not current_user.is_admin:
+        abort(403)
+    return jsonify(trigger=mqtt_triggers.stats, status=mqtt_statuses.stats)
+
+
+@bp.route("/flight_recorder", methods=["GET"])
+@login_required
+def flight_recorder() -> None:
+    """Download the last committed LED frames as an animation file.
+
+    With `?format=json` the time and source of every frame, and the last
+    render errors, are returned instead of the frames.
+    """
+    if not current_user.is_admin:
+        abort(403)
+    controller = _led_controller()
+    if request.args.get("format") == "json":
+        log = controller.flight_recorder_log()
+        if log is None:
+            # The LED daemon cannot be reached
+            abort(503)
+        return jsonify(log)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "flight_recorder.stan"
+        if controller.dump_flight_recorder(str(path)) is None:
+            abort(503)
+        data = path.read_bytes()
+    return send_file(
+        io.BytesIO(data),
+        mimetype="application/octet-stream",
+        as_attachment=True,
+        download_name="flight_recorder.stan",
+    )
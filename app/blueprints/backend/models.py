@@ -84,3 +84,26 @@ class Workout(db.Model):
         self.description = description
         self.pros = pros
         self.cons = cons
+
+
+class Scene(db.Model):
+    """Scene model, a stored look of the LED strip."""
+
+    __tablename__ = "scenes"
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(50), unique=True)
+    spec = db.Column(db.JSON)
+    updated_at = db.Column(db.DateTime)
+
+    def __init__(self, name: str, spec: dict, updated_at: datetime) -> None:
+        """Initialize Scene model.
+
+        Args:
+        ----
+            name (str): Scene name
+            spec (dict): Scene description, see `app.led_scenes`
+            updated_at (datetime): Scene last update
+        """
+        self.name = name
+        self.spec = spec
+        self.updated_at = updated_at
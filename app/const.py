@@ -1,14 +1,11 @@
 """Constants for the Stair Challenge app."""
 # ruff: noqa: E501
-import threading
 from enum import Enum
 from typing import Final
 
 MQTT_SENSOR: Final = "sensor"
 MQTT_WORKOUT: Final = "workout"
 
-THREAD_STOP_EVENT = threading.Event()
-
 # MQTT topics - Subscribed
 MQTT_TEST_TOPIC: Final = "test"
 MQTT_TRIGGER_TOPIC: Final = f"{MQTT_SENSOR}/+/trigger"
@@ -34,13 +31,64 @@ class Direction(Enum):
     BOTTOM_TO_TOP = False
 
 
-class SensorLedZone(Enum):
-    """Enum for the sensor LEDs."""
+class BlendMode(Enum):
+    """Enum for the way an effect layer is blended onto the frame."""
+
+    ADD = "add"
+    MAX = "max"
+    OVER = "over"
+
+
+class Easing(Enum):
+    """Enum for the easing curve of a fade or a movement in an effect program."""
+
+    LINEAR = "linear"
+    EASE_IN = "ease_in"
+    EASE_OUT = "ease_out"
+    EASE_IN_OUT = "ease_in_out"
+
+
+class MotionRepeat(Enum):
+    """Enum for what a moving segment does when it reaches its end."""
+
+    NONE = "none"
+    LOOP = "loop"
+    BOUNCE = "bounce"
+
+
+class AnimationPriority(Enum):
+    """Enum for the priority of an animation, higher values preempt lower ones."""
 
-    SENSOR_3: tuple = {"start": 56, "end": 59}
-    SENSOR_4: tuple = {"start": 36, "end": 39}
-    SENSOR_5: tuple = {"start": 16, "end": 19}
-    SENSOR_6: tuple = {"start": 0, "end": 3}
+    BACKGROUND = 0
+    NORMAL = 1
+    TRIGGER = 2
+
+
+class AnimationStatus(Enum):
+    """Enum for the status of an animation."""
+
+    RUNNING = "running"
+    FINISHED = "finished"
+    CANCELLED = "cancelled"
+
+
+class QueuePolicy(Enum):
+    """Enum for what the effect executor does when its queue is full."""
+
+    DROP_NEWEST = "drop_newest"
+    DROP_OLDEST = "drop_oldest"
+    LATEST_WINS = "latest_wins"
+
+
+class CommandStatus(Enum):
+    """Enum for the status of a queued LED command."""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+    DROPPED = "dropped"
 
 
 class IsAdmin(Enum):
@@ -57,13 +105,20 @@ class ResetCounter(Enum):
     NO = False
 
 
-SENSOR_LOCATION: Final = {
-    1: 97,
-    2: 77,
-    3: 57,
-    4: 37,
-    5: 17,
-    6: 0,
+# Default layout of the stair, see `app.stair_geometry.StairGeometry`. Steps
+# are numbered from the top, sensor zones are [start, end) LED ranges.
+STAIR_GEOMETRY: Final = {
+    "led_count": 104,
+    "step_count": 11,
+    "step_length": 10,
+    "sensors": {
+        1: {"led": 97, "step": 1, "zone": [96, 99]},
+        2: {"led": 77, "step": 3, "zone": [76, 79]},
+        3: {"led": 57, "step": 5, "zone": [56, 59]},
+        4: {"led": 37, "step": 7, "zone": [36, 39]},
+        5: {"led": 17, "step": 9, "zone": [16, 19]},
+        6: {"led": 0, "step": 11, "zone": [0, 3]},
+    },
 }
 
 WORKOUTS = [
@@ -0,0 +1,206 @@
+"""Bounded executor for LED effects."""
+from __future__ import annotations
+
+import threading
+from collections import deque
+from concurrent.futures import Future
+from typing import TYPE_CHECKING, Any
+
+from app.const import QueuePolicy
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Hashable
+
+
+class _Job:
+    """Effect call waiting in the queue."""
+
+    def __init__(
+        self,
+        key: Hashable | None,
+        func: Callable[..., Any],
+        args: tuple,
+    ) -> None:
+        """Initialize the job.
+
+        Args:
+        ----
+            key (Hashable): Coalescing key of the job
+            func (Callable): The effect function to run
+            args (tuple): Positional arguments for the effect function
+        """
+        self.key = key
+        self.func = func
+        self.args = args
+        self.future: Future = Future()
+
+
+class EffectExecutor:
+    """Run LED effects on a fixed number of worker threads.
+
+    Jobs wait in a bounded queue. With `QueuePolicy.LATEST_WINS` a job that
+    is submitted with the same key as a job that is still waiting replaces
+    that job, so a flapping sensor only ever has one pending effect.
+    """
+
+    def __init__(
+        self,
+        workers: int = 4,
+        max_queue: int = 16,
+        policy: QueuePolicy = QueuePolicy.LATEST_WINS,
+    ) -> None:
+        """Initialize the effect executor.
+
+        Args:
+        ----
+            workers (int): Number of worker threads
+            max_queue (int): Maximum number of jobs waiting for a worker
+            policy (QueuePolicy): What to do with new jobs when the queue is full
+        """
+        self.workers = workers
+        self.max_queue = max_queue
+        self.policy = policy
+        self.counters: dict[str, int] = dict.fromkeys(
+            ("queued", "coalesced", "dropped", "completed", "failed"),
+            0,
+        )
+
+        self._queue: deque[_Job] = deque()
+        self._condition = threading.Condition()
+        self._threads: list[threading.Thread] = []
+        self._stop_event = threading.Event()
+        self._stop_event.set()
+
+    @property
+    def pending(self) -> int:
+        """Return the number of jobs waiting for a worker."""
+        return len(self._queue)
+
+    @property
+    def stats(self) -> dict[str, int]:
+        """Return a snapshot of the counters and the queue depth."""
+        with self._condition:
+            return {**self.counters, "pending": len(self._queue)}
+
+    def start(
+        self,
+        workers: int | None = None,
+        max_queue: int | None = None,
+    ) -> None:
+        """Start the worker threads, stopping any previous ones first.
+
+        Args:
+        ----
+            workers (int): Number of worker threads
+            max_queue (int): Maximum number of jobs waiting for a worker
+        """
+        self.shutdown(wait=False)
+        if workers is not None:
+            self.workers = workers
+        if max_queue is not None:
+            self.max_queue = max_queue
+
+        # Every generation of workers gets its own stop event, so workers of a
+        # previous start() that are still finishing a job exit afterwards.
+        self._stop_event = threading.Event()
+        self._threads = [
+            threading.Thread(
+                target=self._worker,
+                args=(self._stop_event,),
+                name=f"led-effect-{index}",
+                daemon=True,
+            )
+            for index in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def shutdown(self, wait: bool = True) -> None:  # noqa: FBT001, FBT002
+        """Stop the workers and cancel all waiting jobs.
+
+        Args:
+        ----
+            wait (bool): Wait for the running jobs to finish
+        """
+        with self._condition:
+            self._stop_event.set()
+            while self._queue:
+                self._queue.popleft().future.cancel()
+            self._condition.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+        self._threads = []
+
+    def submit(
+        self,
+        func: Callable[..., Any],
+        *args: Any,
+        key: Hashable | None = None,
+    ) -> Future | None:
+        """Queue an effect call.
+
+        Args:
+        ----
+            func (Callable): The effect function to run
+            args: Positional arguments for the effect function
+            key (Hashable): Coalescing key, for example the sensor ID
+
+        Returns:
+        -------
+            Future: Future of the call, or None if the job was dropped
+        """
+        job = _Job(key, func, args)
+        with self._condition:
+            if self._stop_event.is_set():
+                self.counters["dropped"] += 1
+                return None
+
+            if self.policy == QueuePolicy.LATEST_WINS and key is not None:
+                for index, waiting in enumerate(self._queue):
+                    if waiting.key == key:
+                        self._queue[index] = job
+                        waiting.future.cancel()
+                        self.counters["coalesced"] += 1
+                        return job.future
+
+            if len(self._queue) >= self.max_queue:
+                if self.policy == QueuePolicy.DROP_NEWEST:
+                    self.counters["dropped"] += 1
+                    return None
+                self._queue.popleft().future.cancel()
+                self.counters["dropped"] += 1
+
+            self._queue.append(job)
+            self.counters["queued"] += 1
+            self._condition.notify_all()
+        return job.future
+
+    def _worker(self, stop_event: threading.Event) -> None:
+        """Run queued jobs until the executor shuts down.
+
+        Args:
+        ----
+            stop_event (threading.Event): Event that stops this worker
+        """
+        while True:
+            with self._condition:
+                while not self._queue and not stop_event.is_set():
+                    self._condition.wait()
+                if stop_event.is_set():
+                    return
+                job = self._queue.popleft()
+
+            if not job.future.set_running_or_notify_cancel():
+                continue
+            try:
+                job.future.set_result(job.func(*job.args))
+            except Exception as error:  # noqa: BLE001
+                name = getattr(job.func, "__name__", repr(job.func))
+                print(f"LED effect {name} failed: {error!s}")
+                job.future.set_exception(error)
+                with self._condition:
+                    self.counters["failed"] += 1
+            else:
+                with self._condition:
+                    self.counters["completed"] += 1
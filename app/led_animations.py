@@ -0,0 +1,233 @@
+"""Handles for running LED animations."""
+from __future__ import annotations
+
+import threading
+from contextlib import contextmanager
+from typing import TYPE_CHECKING
+
+from app.const import AnimationPriority, AnimationStatus
+from app.led_clock import Clock
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from app.led_compositor import Compositor, Layer
+
+
+class AnimationHandle:
+    """Handle to cancel, join and inspect one running animation.
+
+    An animation either runs as a compositor layer, in which case cancelling
+    removes the layer, or as a loop in the calling thread that checks the
+    handle between frames with `sleep`.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        priority: AnimationPriority,
+        compositor: Compositor,
+        layer: Layer | None = None,
+        clock: Clock | None = None,
+    ) -> None:
+        """Initialize the handle.
+
+        Args:
+        ----
+            name (str): Name of the animation
+            priority (AnimationPriority): Priority of the animation
+            compositor (Compositor): Compositor that renders the layer
+            layer (Layer): Layer of the animation, None for a loop animation
+            clock (Clock): Clock the animation waits on, defaults to real time
+        """
+        self.name = name
+        self.priority = priority
+        self.layer = layer
+        self.clock = clock or Clock()
+        self.started_at = self.clock.now()
+        self._compositor = compositor
+        self._cancelled = threading.Event()
+        self._done = threading.Event()
+
+    @property
+    def is_cancelled(self) -> bool:
+        """Return True if the animation was cancelled."""
+        return self._cancelled.is_set()
+
+    @property
+    def is_done(self) -> bool:
+        """Return True if the animation finished or was cancelled."""
+        if self.layer is not None:
+            return self.layer.finished.is_set()
+        return self._done.is_set()
+
+    @property
+    def status(self) -> AnimationStatus:
+        """Return the status of the animation."""
+        if self.is_cancelled:
+            return AnimationStatus.CANCELLED
+        if self.is_done:
+            return AnimationStatus.FINISHED
+        return AnimationStatus.RUNNING
+
+    def cancel(self) -> bool:
+        """Stop the animation.
+
+        Returns
+        -------
+            bool: True if the animation was still running
+        """
+        if self.is_done:
+            return False
+        self._cancelled.set()
+        if self.layer is not None:
+            self._compositor.remove(self.layer)
+        return True
+
+    def join(self, timeout: float | None = None) -> bool:
+        """Wait until the animation finished or was cancelled.
+
+        Args:
+        ----
+            timeout (float): Seconds to wait at most
+
+        Returns:
+        -------
+            bool: True if the animation ended within the timeout
+        """
+        if self.layer is not None:
+            return self.layer.wait(timeout)
+        return self._done.wait(timeout)
+
+    def sleep(self, seconds: float) -> bool:
+        """Wait between two frames of a loop animation.
+
+        Args:
+        ----
+            seconds (float): Seconds to wait
+
+        Returns:
+        -------
+            bool: True to continue, False if the animation was cancelled
+        """
+        return not self.clock.wait(self._cancelled, seconds)
+
+    def finish(self) -> None:
+        """Mark a loop animation as ended."""
+        self._done.set()
+
+
+class AnimationManager:
+    """Keep track of the running animations.
+
+    Starting an animation cancels the running loop animations with a lower
+    priority, so a trigger effect immediately replaces a background
+    animation instead of waiting for it to end. Loop animations all draw
+    into the one frame buffer, layer animations are blended by the
+    compositor and do not compete, so a trigger never preempts a layer like
+    the sandglass of a running workout.
+    """
+
+    def __init__(self, compositor: Compositor, clock: Clock | None = None) -> None:
+        """Initialize the animation manager.
+
+        Args:
+        ----
+            compositor (Compositor): Compositor that renders the layers
+            clock (Clock): Clock the animations wait on, defaults to real time
+        """
+        self.compositor = compositor
+        self.clock = clock or Clock()
+        self._handles: list[AnimationHandle] = []
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> list[AnimationHandle]:
+        """Return the animations that are still running and not cancelled."""
+        with self._lock:
+            self._handles = [
+                handle
+                for handle in self._handles
+                if not handle.is_done and not handle.is_cancelled
+            ]
+            return self._handles.copy()
+
+    @property
+    def stats(self) -> list[dict[str, str | float]]:
+        """Return the name, priority and runtime of every running animation."""
+        now = self.clock.now()
+        return [
+            {
+                "name": handle.name,
+                "priority": handle.priority.name.lower(),
+                "status": handle.status.value,
+                "runtime": round(now - handle.started_at, 3),
+            }
+            for handle in self.running
+        ]
+
+    def start(
+        self,
+        name: str,
+        priority: AnimationPriority = AnimationPriority.NORMAL,
+        layer: Layer | None = None,
+    ) -> AnimationHandle:
+        """Register a new animation and preempt the loop animations below it.
+
+        Args:
+        ----
+            name (str): Name of the animation
+            priority (AnimationPriority): Priority of the animation
+            layer (Layer): Layer of the animation, None for a loop animation
+
+        Returns:
+        -------
+            AnimationHandle: Handle of the new animation
+        """
+        handle = AnimationHandle(name, priority, self.compositor, layer, self.clock)
+        for running in self.running:
+            if running.layer is None and running.priority.value < priority.value:
+                running.cancel()
+        with self._lock:
+            self._handles.append(handle)
+        return handle
+
+    @contextmanager
+    def run(
+        self,
+        name: str,
+        priority: AnimationPriority = AnimationPriority.NORMAL,
+    ) -> Iterator[AnimationHandle]:
+        """Register a loop animation for the duration of a `with` block.
+
+        Args:
+        ----
+            name (str): Name of the animation
+            priority (AnimationPriority): Priority of the animation
+
+        Yields:
+        ------
+            AnimationHandle: Handle to check between frames
+        """
+        handle = self.start(name, priority)
+        try:
+            yield handle
+        finally:
+            handle.finish()
+
+    def cancel(self, name: str | None = None) -> int:
+        """Cancel running animations.
+
+        Args:
+        ----
+            name (str): Only cancel the animations with this name
+
+        Returns:
+        -------
+            int: Number of cancelled animations
+        """
+        return sum(
+            handle.cancel()
+            for handle in self.running
+            if name is None or handle.name == name
+        )
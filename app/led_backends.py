@@ -0,0 +1,371 @@
+"""LED output backends."""
+from __future__ import annotations
+
+import errno
+import os
+import stat
+from abc import ABC, abstractmethod
+from contextlib import suppress
+from pathlib import Path
+from typing import Final
+
+import numpy as np
+from rpi_ws281x import PixelStrip
+
+from app.exceptions import StairChalllengeInitializationError
+from app.led_effects import FRAME_DTYPE, unpack_rgb
+
+# GPIO pins of the three outputs of rpi_ws281x. PWM and PCM output is sent
+# by DMA in the background, SPI output blocks until the frame is sent.
+OUTPUT_PINS: Final[dict[str, frozenset[int]]] = {
+    "pwm": frozenset({12, 13, 18, 19, 40, 41, 45, 52, 53}),
+    "pcm": frozenset({21, 31}),
+    "spi": frozenset({10, 38}),
+}
+
+
+def output_type(pin: int) -> str:
+    """Return the output of rpi_ws281x that drives a GPIO pin.
+
+    Args:
+    ----
+        pin (int): GPIO pin connected to the pixels
+
+    Returns:
+    -------
+        str: "pwm", "pcm" or "spi"
+
+    Raises:
+    ------
+        ValueError: If no output can drive the pin
+    """
+    for output, pins in OUTPUT_PINS.items():
+        if pin in pins:
+            return output
+    msg = f"GPIO pin {pin} cannot drive WS281x LEDs"
+    raise ValueError(msg)
+
+
+class LEDBackend(ABC):
+    """Base class for the output of the LED render engine."""
+
+    name: str = "backend"
+
+    def __init__(self, count: int) -> None:
+        """Initialize the backend.
+
+        Args:
+        ----
+            count (int): Number of LED pixels
+        """
+        self.count = count
+        self.frames_written: int = 0
+
+    def begin(self) -> None:  # noqa: B027
+        """Prepare the output, called once before the first frame."""
+
+    @abstractmethod
+    def write(self, frame: np.ndarray) -> None:
+        """Output one complete frame.
+
+        Args:
+        ----
+            frame (np.ndarray): One packed color per LED pixel
+        """
+
+    def close(self) -> None:  # noqa: B027
+        """Release the output."""
+
+
+class WS281xBackend(LEDBackend):
+    """Backend that drives a real WS281x strip through `rpi_ws281x`."""
+
+    name = "ws281x"
+
+    def __init__(
+        self,
+        count: int,
+        pin: int,
+        freq_hz: int,
+        dma: int,
+        invert: bool,  # noqa: FBT001
+        brightness: int,
+        channel: int,
+    ) -> None:
+        """Initialize the WS281x backend.
+
+        Args:
+        ----
+            count (int): Number of LED pixels
+            pin (int): GPIO pin connected to the pixels
+            freq_hz (int): LED signal frequency in hertz
+            dma (int): DMA channel to use for generating signal
+            invert (bool): True to invert the signal
+            brightness (int): Set to 0 for darkest and 255 for brightest
+            channel (int): PWM channel to use
+        """
+        super().__init__(count)
+        self.pin = pin
+        self.freq_hz = freq_hz
+        self.dma = dma
+        self.invert = invert
+        self.brightness = brightness
+        self.channel = channel
+        self.strip: PixelStrip | None = None
+
+    @property
+    def blocks(self) -> bool:
+        """Return True if showing a frame waits until it is sent (SPI)."""
+        return output_type(self.pin) == "spi"
+
+    def begin(self) -> None:
+        """Initialize the LED strip.
+
+        Raises
+        ------
+            StairChalllengeInitializationError: If the LED strip cannot be initialized
+        """
+        self.strip = PixelStrip(
+            self.count,
+            self.pin,
+            self.freq_hz,
+            self.dma,
+            self.invert,
+            self.brightness,
+            self.channel,
+        )
+        try:
+            self.strip.begin()
+        except RuntimeError as error:
+            raise StairChalllengeInitializationError(str(error)) from error
+
+    def load(self, frame: np.ndarray) -> None:
+        """Copy the frame into the strip buffer without showing it.
+
+        Args:
+        ----
+            frame (np.ndarray): One packed color per LED pixel
+        """
+        for index, color in enumerate(frame.tolist()):
+            self.strip.setPixelColor(index, color)
+
+    def show(self) -> None:
+        """Send the strip buffer to the LEDs."""
+        self.strip.show()
+        self.frames_written += 1
+
+    def write(self, frame: np.ndarray) -> None:
+        """Copy the frame into the strip buffer and show it."""
+        self.load(frame)
+        self.show()
+
+    def close(self) -> None:
+        """Release the strip and its DMA channel, `begin` can start it again."""
+        if self.strip is not None:
+            self.strip._cleanup()  # noqa: SLF001
+            self.strip = None
+
+
+class MultiChannelBackend(LEDBackend):
+    """Backend that splits the stair over several WS281x outputs.
+
+    The channels form one logical strip in the order they are given, each
+    channel takes the next `count` pixels of the frame. A channel that is
+    wired in the opposite direction is reversed. All channel buffers are
+    loaded before any of them is shown.
+
+    Every channel is a separate `PixelStrip`, so every channel needs its
+    own output (PWM, PCM or SPI) and DMA channel. The two PWM channels
+    share one peripheral and cannot be split over two strips. PWM and PCM
+    channels send the frame by DMA in the background, SPI blocks until the
+    frame is sent, so the SPI channel is shown last and the transfers of
+    one frame run side by side.
+    """
+
+    name = "multi"
+
+    def __init__(
+        self,
+        channels: list[WS281xBackend],
+        reversed_channels: list[bool] | None = None,
+    ) -> None:
+        """Initialize the multi channel backend.
+
+        Args:
+        ----
+            channels (list[WS281xBackend]): The channels, in pixel order
+            reversed_channels (list[bool]): Per channel True if it is reversed
+
+        Raises:
+        ------
+            ValueError: If two channels use the same output or DMA channel
+        """
+        outputs = [output_type(channel.pin) for channel in channels]
+        for output in set(outputs):
+            if outputs.count(output) > 1:
+                msg = (
+                    f"More than one LED channel uses the {output.upper()} output, "
+                    "use one PWM, PCM or SPI pin per channel"
+                )
+                raise ValueError(msg)
+        if len({channel.dma for channel in channels}) < len(channels):
+            msg = "Every LED channel needs its own DMA channel"
+            raise ValueError(msg)
+        super().__init__(sum(channel.count for channel in channels))
+        self.channels = channels
+        self.reversed_channels = reversed_channels or [False] * len(channels)
+        bounds = np.cumsum([0] + [channel.count for channel in channels])
+        self.spans = list(zip(bounds[:-1].tolist(), bounds[1:].tolist()))
+
+    def begin(self) -> None:
+        """Initialize all channels."""
+        for channel in self.channels:
+            channel.begin()
+
+    def write(self, frame: np.ndarray) -> None:
+        """Load every channel with its part of the frame, then show them all."""
+        for channel, (start, end), reverse in zip(
+            self.channels,
+            self.spans,
+            self.reversed_channels,
+        ):
+            channel.load(frame[start:end][::-1] if reverse else frame[start:end])
+        # Start the DMA transfers before the blocking SPI transfer
+        for channel in sorted(self.channels, key=lambda channel: channel.blocks):
+            channel.show()
+        self.frames_written += 1
+
+    def close(self) -> None:
+        """Release all channels."""
+        for channel in self.channels:
+            channel.close()
+
+
+class VirtualBackend(LEDBackend):
+    """In-memory strip, used for tests, benchmarks and headless runs."""
+
+    name = "virtual"
+
+    def __init__(self, count: int, history: int = 0) -> None:
+        """Initialize the virtual strip.
+
+        Args:
+        ----
+            count (int): Number of LED pixels
+            history (int): Number of previous frames to keep as RGB bytes
+        """
+        super().__init__(count)
+        self.frame = np.zeros(count, dtype=FRAME_DTYPE)
+        self.history = np.zeros((history, count, 3), dtype=np.uint8)
+
+    def write(self, frame: np.ndarray) -> None:
+        """Store the frame."""
+        self.frame[:] = frame
+        if len(self.history):
+            self.history[self.frames_written % len(self.history)] = unpack_rgb(frame)
+        self.frames_written += 1
+
+    def recent_frames(self) -> np.ndarray:
+        """Return the frames in the history, oldest first.
+
+        Returns
+        -------
+            np.ndarray: Array of shape (frames, count, 3) with RGB bytes
+        """
+        size = min(self.frames_written, len(self.history))
+        start = (self.frames_written - size) % len(self.history) if size else 0
+        return np.roll(self.history, -start, axis=0)[:size]
+
+
+class FileSinkBackend(LEDBackend):
+    """Backend that writes raw RGB frame bytes to a file or FIFO.
+
+    Every frame is `count * 3` bytes. A FIFO is opened without blocking, so
+    the renderer never waits on a missing or slow reader. Frames written
+    while no reader is attached, or while the pipe is full, are dropped.
+    A frame larger than the pipe buffer can be taken in part, its rest is
+    written before the next frame so the reader never loses the frame
+    boundaries.
+    """
+
+    name = "file"
+
+    def __init__(self, count: int, path: str) -> None:
+        """Initialize the file sink.
+
+        Args:
+        ----
+            count (int): Number of LED pixels
+            path (str): Path of the file or FIFO to write to
+        """
+        super().__init__(count)
+        self.path = Path(path)
+        self.frames_dropped: int = 0
+        self._fd: int | None = None
+        self._pending = b""
+        self._is_fifo = False
+
+    def begin(self) -> None:
+        """Open the file, or try to open the FIFO."""
+        self._is_fifo = self.path.exists() and stat.S_ISFIFO(self.path.stat().st_mode)
+        if not self._is_fifo:
+            self._fd = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC)
+        else:
+            self._open_fifo()
+
+    def _open_fifo(self) -> None:
+        """Open the FIFO for writing if a reader is attached."""
+        try:
+            self._fd = os.open(self.path, os.O_WRONLY | os.O_NONBLOCK)
+        except OSError as error:
+            if error.errno != errno.ENXIO:
+                raise
+            self._fd = None
+
+    def write(self, frame: np.ndarray) -> None:
+        """Write the frame as raw RGB bytes."""
+        if self._fd is None and self._is_fifo:
+            self._open_fifo()
+        if self._fd is None:
+            self.frames_dropped += 1
+            return
+
+        data = unpack_rgb(frame).tobytes()
+        try:
+            self._pending = self._send(self._pending)
+            rest = self._send(data) if not self._pending else data
+        except BrokenPipeError:
+            # The reader went away, reopen the FIFO when a new one attaches
+            self.close()
+            self.frames_dropped += 1
+            return
+        if len(rest) == len(data):
+            # Nothing of the frame fit into the pipe
+            self.frames_dropped += 1
+            return
+        self._pending = rest
+        self.frames_written += 1
+
+    def _send(self, data: bytes) -> bytes:
+        """Write as much of the data as fits without blocking.
+
+        Args:
+        ----
+            data (bytes): The bytes to write
+
+        Returns:
+        -------
+            bytes: The part of the data that is not written yet
+        """
+        view = memoryview(data)
+        with suppress(BlockingIOError):
+            while view:
+                view = view[os.write(self._fd, view) :]
+        return bytes(view)
+
+    def close(self) -> None:
+        """Close the file or FIFO."""
+        self._pending = b""
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
@@ -0,0 +1,76 @@
+"""Benchmark of the LED render pipeline on the virtual clock."""
+from __future__ import annotations
+
+import time
+from typing import TYPE_CHECKING
+
+from rpi_ws281x import Color
+
+from app.led_clock import VirtualClock
+
+if TYPE_CHECKING:
+    from app.led_controller import LEDController
+
+
+def run_benchmark(controller: LEDController, seconds: float = 60.0) -> dict:
+    """Play a busy workout on the stair as fast as possible.
+
+    The rainbow runs in the frame buffer while a sandglass runs on top and
+    every second a walker triggers the next sensor, which drops a ripple
+    and moves the Meeloper segment. The frames are committed one after the
+    other without waiting, the virtual clock moves one frame interval per
+    frame, so an hour of stair time takes as long as rendering it.
+
+    Args:
+    ----
+        controller (LEDController): Started controller with a virtual clock
+        seconds (float): Seconds of stair time to render
+
+    Returns:
+    -------
+        dict: The profiler stats with the number of frames and the real time
+
+    Raises:
+    ------
+        TypeError: If the controller does not run on a virtual clock
+    """
+    clock = controller.clock
+    if not isinstance(clock, VirtualClock):
+        msg = "The LED benchmark needs a controller with a virtual clock"
+        raise TypeError(msg)
+
+    renderer = controller.renderer
+    renderer.stop()
+    renderer.profiler.reset()
+    rainbow = controller.rainbow_sequence()
+    positions = sorted(controller.geometry.sensor_positions.values())
+    # Walk up and down the stair, one sensor per second
+    walk = positions + positions[-2:0:-1]
+    color = Color(255, 0, 0)
+
+    started = time.perf_counter()
+    controller.sandglass(seconds, Color(0, 0, 255))
+    frames = round(seconds * renderer.fps)
+    for index in range(frames):
+        if index % renderer.fps == 0:
+            position = walk[index // renderer.fps % len(walk)]
+            controller.ripple_drop(position, color)
+            controller.follow_step(position, color)
+
+        frame_started = time.perf_counter()
+        renderer.set_frame(rainbow.frame(index % len(rainbow)), "rainbow")
+        renderer.profiler.record_compute(
+            "rainbow",
+            time.perf_counter() - frame_started,
+        )
+        renderer.commit()
+        clock.advance(renderer.frame_interval)
+    elapsed = time.perf_counter() - started
+    controller.cancel_animations()
+    renderer.compositor.clear()
+
+    return {
+        **renderer.profiler.stats(),
+        "frames": frames,
+        "elapsed_s": round(elapsed, 3),
+    }
@@ -0,0 +1,199 @@
+"""Cache of pre-rendered LED frame sequences."""
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from app.led_effects import pack_rgb, unpack_rgb
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Hashable, Iterable
+
+
+class FrameSequence:
+    """Read-only sequence of frames stored as RGB bytes.
+
+    Three bytes per pixel instead of the four of a packed frame keeps the
+    cache small, unpacking one frame for playback is a single array op.
+    """
+
+    def __init__(self, frames: np.ndarray) -> None:
+        """Initialize the frame sequence.
+
+        Args:
+        ----
+            frames (np.ndarray): uint8 array of shape (frames, count, 3)
+        """
+        self.frames = np.ascontiguousarray(frames, dtype=np.uint8)
+        self.frames.setflags(write=False)
+
+    @classmethod
+    def from_packed(
+        cls: type[FrameSequence],
+        frames: Iterable[np.ndarray],
+    ) -> FrameSequence:
+        """Create a sequence from packed frames.
+
+        Args:
+        ----
+            frames (Iterable[np.ndarray]): Packed frames of equal length
+
+        Returns:
+        -------
+            FrameSequence: The sequence
+        """
+        return cls(unpack_rgb(np.stack(list(frames))))
+
+    def __len__(self) -> int:
+        """Return the number of frames."""
+        return len(self.frames)
+
+    @property
+    def nbytes(self) -> int:
+        """Return the memory used by the frames."""
+        return self.frames.nbytes
+
+    def frame(self, index: int) -> np.ndarray:
+        """Return one frame as packed colors.
+
+        Args:
+        ----
+            index (int): Index of the frame
+
+        Returns:
+        -------
+            np.ndarray: Packed frame
+        """
+        rgb = self.frames[index]
+        return pack_rgb(rgb[:, 0], rgb[:, 1], rgb[:, 2])
+
+
+class FrameCache:
+    """LRU cache of frame sequences with a memory budget.
+
+    Sequences are keyed by effect name, effect parameters and strip length.
+    When the budget is exceeded the least recently used sequences are
+    evicted. A sequence larger than the whole budget is not cached.
+    """
+
+    def __init__(self, max_bytes: int = 8 * 1024 * 1024) -> None:
+        """Initialize the frame cache.
+
+        Args:
+        ----
+            max_bytes (int): Memory budget of all cached frames
+        """
+        self.max_bytes = max_bytes
+        self.nbytes: int = 0
+        self.counters: dict[str, int] = dict.fromkeys(
+            ("hits", "misses", "evictions"),
+            0,
+        )
+        self._sequences: OrderedDict[Hashable, FrameSequence] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Return the number of cached sequences."""
+        return len(self._sequences)
+
+    def __contains__(self, key: Hashable) -> bool:
+        """Return True if a sequence is cached for the key."""
+        return key in self._sequences
+
+    @property
+    def stats(self) -> dict[str, int]:
+        """Return a snapshot of the counters and the memory use."""
+        with self._lock:
+            return {
+                **self.counters,
+                "sequences": len(self._sequences),
+                "bytes": self.nbytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    def get(self, key: Hashable) -> FrameSequence | None:
+        """Return the cached sequence for a key.
+
+        Args:
+        ----
+            key (Hashable): Key of the sequence
+
+        Returns:
+        -------
+            FrameSequence: The sequence, or None if it is not cached
+        """
+        with self._lock:
+            sequence = self._sequences.get(key)
+            if sequence is None:
+                self.counters["misses"] += 1
+                return None
+            self._sequences.move_to_end(key)
+            self.counters["hits"] += 1
+            return sequence
+
+    def put(self, key: Hashable, sequence: FrameSequence) -> None:
+        """Cache a sequence, evicting the least recently used ones.
+
+        Args:
+        ----
+            key (Hashable): Key of the sequence
+            sequence (FrameSequence): The sequence to cache
+        """
+        with self._lock:
+            previous = self._sequences.pop(key, None)
+            if previous is not None:
+                self.nbytes -= previous.nbytes
+            if sequence.nbytes > self.max_bytes:
+                return
+            self._sequences[key] = sequence
+            self.nbytes += sequence.nbytes
+            self._evict()
+
+    def get_or_render(
+        self,
+        key: Hashable,
+        render: Callable[[], FrameSequence],
+    ) -> FrameSequence:
+        """Return the cached sequence, rendering and caching it on a miss.
+
+        Args:
+        ----
+            key (Hashable): Key of the sequence
+            render (Callable): Function that renders the sequence
+
+        Returns:
+        -------
+            FrameSequence: The sequence
+        """
+        sequence = self.get(key)
+        if sequence is None:
+            sequence = render()
+            self.put(key, sequence)
+        return sequence
+
+    def resize(self, max_bytes: int) -> None:
+        """Change the memory budget.
+
+        Args:
+        ----
+            max_bytes (int): Memory budget of all cached frames
+        """
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def clear(self) -> None:
+        """Remove all sequences."""
+        with self._lock:
+            self._sequences.clear()
+            self.nbytes = 0
+
+    def _evict(self) -> None:
+        """Drop the least recently used sequences until the budget fits."""
+        while self.nbytes > self.max_bytes and self._sequences:
+            _, sequence = self._sequences.popitem(last=False)
+            self.nbytes -= sequence.nbytes
+            self.counters["evictions"] += 1
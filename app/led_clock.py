@@ -0,0 +1,190 @@
+"""Clocks that drive the LED animations."""
+from __future__ import annotations
+
+import threading
+import time
+from typing import Final
+
+# Real seconds between two checks of the event of a waiting virtual clock
+VIRTUAL_EVENT_POLL: Final = 0.01
+
+
+class Clock:
+    """Real time clock, the base of the other clocks.
+
+    Animations never call `time` directly, they read the time with `now`
+    and wait with `wait`, so the same effect code runs in real time on the
+    stair and faster than real time in tests and benchmarks.
+    """
+
+    name = "real"
+
+    def now(self) -> float:
+        """Return the current time in seconds."""
+        return time.monotonic()
+
+    def wait(self, event: threading.Event, timeout: float | None) -> bool:
+        """Wait until the event is set or the timeout passed.
+
+        Args:
+        ----
+            event (threading.Event): Event that ends the wait early
+            timeout (float): Seconds to wait, None to wait for the event
+
+        Returns:
+        -------
+            bool: True if the event was set
+        """
+        return event.wait(timeout)
+
+    def sleep(self, seconds: float) -> None:
+        """Wait for a number of seconds.
+
+        Args:
+        ----
+            seconds (float): Seconds to wait
+        """
+        self.wait(threading.Event(), seconds)
+
+    def real_timeout(self, seconds: float) -> float:
+        """Return the real seconds that pass at most while the clock runs.
+
+        Args:
+        ----
+            seconds (float): Seconds on this clock
+        """
+        return seconds
+
+
+class ScaledClock(Clock):
+    """Clock that runs a fixed factor faster or slower than real time."""
+
+    name = "scaled"
+
+    def __init__(self, speed: float) -> None:
+        """Initialize the scaled clock.
+
+        Args:
+        ----
+            speed (float): Clock seconds per real second, 2.0 runs twice as
+                fast, 0.5 in slow motion
+
+        Raises:
+        ------
+            ValueError: If the speed is not positive
+        """
+        if speed <= 0:
+            msg = f"Clock speed must be positive, got {speed}"
+            raise ValueError(msg)
+        self.speed = speed
+        self._origin = time.monotonic()
+
+    def now(self) -> float:
+        """Return the scaled time since the clock was created."""
+        return self._origin + (time.monotonic() - self._origin) * self.speed
+
+    def wait(self, event: threading.Event, timeout: float | None) -> bool:
+        """Wait the scaled timeout, see `Clock.wait`."""
+        return event.wait(None if timeout is None else timeout / self.speed)
+
+    def real_timeout(self, seconds: float) -> float:
+        """Return the real seconds that `seconds` on this clock take."""
+        return seconds / self.speed
+
+
+class VirtualClock(Clock):
+    """Clock that only moves when somebody waits on it.
+
+    A wait moves the clock forward to its deadline instead of sleeping, so
+    an animation plays all its frames without sleeping while it still sees
+    the time pass as in real life. With several threads waiting, the
+    thread with the earliest deadline moves the clock to that deadline and
+    the others keep waiting until theirs is the earliest, so the threads
+    see the time pass in the order of their deadlines.
+    """
+
+    name = "virtual"
+
+    def __init__(self, start: float = 0.0) -> None:
+        """Initialize the virtual clock.
+
+        Args:
+        ----
+            start (float): Time to start at
+        """
+        self._now = start
+        self._deadlines: list[float] = []
+        self._condition = threading.Condition()
+
+    def now(self) -> float:
+        """Return the virtual time."""
+        return self._now
+
+    def advance(self, seconds: float) -> float:
+        """Move the clock forward.
+
+        Args:
+        ----
+            seconds (float): Seconds to move forward
+
+        Returns:
+        -------
+            float: The new time
+        """
+        with self._condition:
+            self._now = max(self._now, self._now + seconds)
+            self._condition.notify_all()
+            return self._now
+
+    def wait(self, event: threading.Event, timeout: float | None) -> bool:
+        """Move the clock to the deadline unless the event is set.
+
+        Without a timeout nothing moves the clock, so this blocks in real
+        time until the event is set.
+        """
+        if timeout is None:
+            return event.wait()
+        with self._condition:
+            deadline = self._now + timeout
+            self._deadlines.append(deadline)
+            try:
+                while not event.is_set() and self._now < deadline:
+                    if deadline <= min(self._deadlines):
+                        self._now = deadline
+                        break
+                    # Setting the event does not notify the condition
+                    self._condition.wait(VIRTUAL_EVENT_POLL)
+            finally:
+                self._deadlines.remove(deadline)
+                self._condition.notify_all()
+        # Give the other threads a chance to run, like a real sleep would
+        time.sleep(0)
+        return event.is_set()
+
+
+def create_clock(mode: str = "real", speed: float = 1.0) -> Clock:
+    """Create the clock that drives the LED animations.
+
+    Args:
+    ----
+        mode (str): "real", "scaled" or "virtual"
+        speed (float): Speed of the "scaled" clock
+
+    Returns:
+    -------
+        Clock: The clock
+
+    Raises:
+    ------
+        ValueError: If the mode is unknown
+    """
+    match mode:
+        case "real":
+            return Clock()
+        case "scaled":
+            return ScaledClock(speed)
+        case "virtual":
+            return VirtualClock()
+        case _:
+            msg = f"Unknown LED clock: {mode}"
+            raise ValueError(msg)
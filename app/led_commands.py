@@ -0,0 +1,136 @@
+"""LED commands queued by the HTTP routes."""
+from __future__ import annotations
+
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import wait
+from typing import TYPE_CHECKING, Any
+
+from app.const import CommandStatus
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Hashable
+    from concurrent.futures import Future
+
+    from app.effect_executor import EffectExecutor
+
+
+class LEDCommandQueue:
+    """Run LED commands on the effect executor and remember their status.
+
+    A route submits a command and answers right away with its id, the
+    command runs on an effect worker. The status of the most recent
+    commands can be looked up by id afterwards.
+    """
+
+    def __init__(self, executor: EffectExecutor, history: int = 256) -> None:
+        """Initialize the command queue.
+
+        Args:
+        ----
+            executor (EffectExecutor): Executor that runs the commands
+            history (int): Number of commands to remember
+        """
+        self.executor = executor
+        self.history = history
+        self._commands: OrderedDict[
+            str, tuple[str, float, Future | None]
+        ] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(
+        self,
+        name: str,
+        func: Callable[..., Any],
+        *args: Any,
+        key: Hashable | None = None,
+    ) -> str:
+        """Queue a command.
+
+        Args:
+        ----
+            name (str): Name of the command, shown in the status
+            func (Callable): Function that runs the command
+            args: Positional arguments for the function
+            key (Hashable): Coalescing key, a waiting command with the same
+                key is replaced
+
+        Returns:
+        -------
+            str: Id of the command
+        """
+        command_id = secrets.token_hex(8)
+        future = self.executor.submit(func, *args, key=key)
+        with self._lock:
+            self._commands[command_id] = (name, time.time(), future)
+            while len(self._commands) > self.history:
+                self._commands.popitem(last=False)
+        return command_id
+
+    def status(self, command_id: str) -> dict[str, str | float] | None:
+        """Return the status of a command.
+
+        Args:
+        ----
+            command_id (str): Id of the command
+
+        Returns:
+        -------
+            dict: Id, name, submit time and status of the command, or None
+                if the command is unknown
+        """
+        with self._lock:
+            command = self._commands.get(command_id)
+        if command is None:
+            return None
+        name, submitted_at, future = command
+        status = {
+            "id": command_id,
+            "command": name,
+            "submitted_at": submitted_at,
+            "status": self._status(future).value,
+        }
+        if future is not None and future.done() and not future.cancelled():
+            error = future.exception()
+            if error is not None:
+                status["error"] = str(error)
+        return status
+
+    def wait(
+        self,
+        command_id: str,
+        timeout: float | None = None,
+    ) -> dict[str, str | float] | None:
+        """Wait until a command ended and return its status.
+
+        Args:
+        ----
+            command_id (str): Id of the command
+            timeout (float): Seconds to wait at most
+
+        Returns:
+        -------
+            dict: The status of the command, see `status`
+        """
+        with self._lock:
+            command = self._commands.get(command_id)
+        if command is not None and command[2] is not None:
+            wait([command[2]], timeout)
+        return self.status(command_id)
+
+    @staticmethod
+    def _status(future: Future | None) -> CommandStatus:
+        """Translate the future of a command into its status."""
+        if future is None:
+            return CommandStatus.DROPPED
+        if future.cancelled():
+            return CommandStatus.CANCELLED
+        if future.done():
+            if future.exception() is not None:
+                return CommandStatus.FAILED
+            return CommandStatus.DONE
+        if future.running():
+            return CommandStatus.RUNNING
+        return CommandStatus.QUEUED
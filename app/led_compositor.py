@@ -0,0 +1,223 @@
+"""LED effect compositor module."""
+from __future__ import annotations
+
+import threading
+import time
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from app.const import BlendMode
+from app.led_effects import pack_rgb, unpack_rgb
+
+if TYPE_CHECKING:
+    from app.led_effects import Effect
+    from app.led_flight_recorder import FlightRecorder
+    from app.led_profiler import RenderProfiler
+
+
+class Layer:
+    """One effect on the compositor stack."""
+
+    def __init__(
+        self,
+        effect: Effect,
+        blend: BlendMode,
+        opacity: float,
+        started_at: float,
+        ttl: float | None = None,
+    ) -> None:
+        """Initialize the layer.
+
+        Args:
+        ----
+            effect (Effect): The effect rendered by this layer
+            blend (BlendMode): How the layer is blended onto the layers below
+            opacity (float): Opacity of the whole layer (0.0-1.0)
+            started_at (float): Monotonic time the layer was added
+            ttl (float): Seconds until the layer expires, defaults to the
+                duration of the effect
+        """
+        self.effect = effect
+        self.blend = blend
+        self.opacity = opacity
+        self.started_at = started_at
+        self.ttl = effect.duration if ttl is None else ttl
+        self.finished = threading.Event()
+
+    @property
+    def name(self) -> str:
+        """Return the name of the effect on this layer."""
+        return self.effect.name
+
+    def is_expired(self, now: float) -> bool:
+        """Return True if the layer outlived its time to live or its effect ended.
+
+        Args:
+        ----
+            now (float): Current monotonic time
+        """
+        elapsed = now - self.started_at
+        if self.ttl is not None and elapsed >= self.ttl:
+            return True
+        return self.effect.is_finished(elapsed)
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Wait until the layer is removed from the compositor.
+
+        Args:
+        ----
+            timeout (float): Seconds to wait at most
+
+        Returns:
+        -------
+            bool: True if the layer finished within the timeout
+        """
+        return self.finished.wait(timeout)
+
+
+class Compositor:
+    """Stack of effect layers blended into one frame per tick.
+
+    A layer whose effect raises is removed from the stack and the error is
+    kept in the flight recorder, the other layers keep rendering.
+    """
+
+    def __init__(self, count: int) -> None:
+        """Initialize the compositor.
+
+        Args:
+        ----
+            count (int): Number of LED pixels
+        """
+        self.count = count
+        self.layers: list[Layer] = []
+        # Measures the render time of every layer when set
+        self.profiler: RenderProfiler | None = None
+        # Keeps the errors of failing effects when set
+        self.flight_recorder: FlightRecorder | None = None
+        self._lock = threading.Lock()
+
+    def __contains__(self, layer: Layer) -> bool:
+        """Return True if the layer is still on the stack."""
+        with self._lock:
+            return layer in self.layers
+
+    @property
+    def is_active(self) -> bool:
+        """Return True if there is at least one layer to render."""
+        return bool(self.layers)
+
+    def add(
+        self,
+        effect: Effect,
+        now: float,
+        blend: BlendMode = BlendMode.OVER,
+        opacity: float = 1.0,
+        ttl: float | None = None,
+    ) -> Layer:
+        """Put a new effect on top of the layer stack.
+
+        Args:
+        ----
+            effect (Effect): The effect to render
+            now (float): Current monotonic time
+            blend (BlendMode): How the layer is blended onto the layers below
+            opacity (float): Opacity of the whole layer (0.0-1.0)
+            ttl (float): Seconds until the layer expires
+
+        Returns:
+        -------
+            Layer: The new layer
+        """
+        layer = Layer(effect, blend, opacity, now, ttl)
+        with self._lock:
+            self.layers.append(layer)
+        return layer
+
+    def remove(self, layer: Layer) -> None:
+        """Remove a layer from the stack.
+
+        Args:
+        ----
+            layer (Layer): The layer to remove
+        """
+        with self._lock:
+            if layer in self.layers:
+                self.layers.remove(layer)
+        layer.finished.set()
+
+    def clear(self) -> None:
+        """Remove all layers."""
+        with self._lock:
+            layers, self.layers = self.layers, []
+        for layer in layers:
+            layer.finished.set()
+
+    def compose(self, base: np.ndarray, now: float) -> np.ndarray:
+        """Blend all layers onto a base frame.
+
+        Expired layers are dropped before rendering.
+
+        Args:
+        ----
+            base (np.ndarray): Packed frame below all layers
+            now (float): Current monotonic time
+
+        Returns:
+        -------
+            np.ndarray: The merged packed frame
+        """
+        with self._lock:
+            layers = self.layers.copy()
+        expired = []
+        for layer in layers:
+            try:
+                if layer.is_expired(now):
+                    expired.append(layer)
+            except Exception as error:  # noqa: BLE001, PERF203
+                self._fail(layer, error)
+        for layer in expired:
+            self.remove(layer)
+        with self._lock:
+            layers = self.layers.copy()
+
+        if not layers:
+            return base
+
+        profiler = self.profiler
+        out = unpack_rgb(base).astype(np.float32)
+        for layer in layers:
+            started = time.perf_counter()
+            try:
+                colors, alpha = layer.effect.render(now - layer.started_at, self.count)
+                source = unpack_rgb(colors).astype(np.float32)
+                alpha = (np.asarray(alpha, dtype=np.float32) * layer.opacity)[:, None]
+                match layer.blend:
+                    case BlendMode.ADD:
+                        out += source * alpha
+                    case BlendMode.MAX:
+                        np.maximum(out, source * alpha, out=out)
+                    case _:
+                        out += (source - out) * alpha
+            except Exception as error:  # noqa: BLE001
+                self._fail(layer, error)
+                continue
+            if profiler is not None:
+                profiler.record_compute(layer.name, time.perf_counter() - started)
+        rgb = np.clip(np.rint(out), 0, 255).astype(np.uint32)
+        return pack_rgb(rgb[:, 0], rgb[:, 1], rgb[:, 2])
+
+    def _fail(self, layer: Layer, error: Exception) -> None:
+        """Remove a layer whose effect raised and keep the error.
+
+        Args:
+        ----
+            layer (Layer): The failing layer
+            error (Exception): What the effect raised
+        """
+        self.remove(layer)
+        message = f"Effect {layer.name} failed: {type(error).__name__}: {error!s}"
+        print(message)
+        if self.flight_recorder is not None:
+            self.flight_recorder.record_event(time.time(), message)
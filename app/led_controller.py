@@ -3,12 +3,37 @@
 from __future__ import annotations
 
 import secrets
+import threading
 import time
 
-from rpi_ws281x import Color, PixelStrip
+from rpi_ws281x import Color
 
-from app.const import THREAD_STOP_EVENT, Direction, SensorLedZone
+from app.const import STAIR_GEOMETRY, AnimationPriority, BlendMode, Direction
 from app.exceptions import StairChalllengeInitializationError
+from app.led_animations import AnimationHandle, AnimationManager
+from app.led_backends import (
+    FileSinkBackend,
+    LEDBackend,
+    MultiChannelBackend,
+    VirtualBackend,
+    WS281xBackend,
+)
+from app.led_cache import FrameCache, FrameSequence
+from app.led_clock import Clock
+from app.led_effects import (
+    WHEEL,
+    RippleEffect,
+    SandglassEffect,
+    frame_from_bytes,
+    rainbow_frame,
+)
+from app.led_follow import FollowEffect
+from app.led_programs import EffectProgram
+from app.led_recording import AnimationFile
+from app.led_renderer import LEDRenderer
+from app.led_scenes import SceneCache
+from app.led_waves import RippleField
+from app.stair_geometry import StairGeometry
 
 
 class Colors:
@@ -119,7 +144,10 @@ class Colors:
 class LEDController:
     """LED strip configuration."""
 
-    strip: PixelStrip
+    backend: LEDBackend
+    renderer: LEDRenderer | None = None
+    animations: AnimationManager
+    ripple_field: RippleField
 
     def __init__(
         self,
@@ -130,6 +158,8 @@ class LEDController:
         brightness: int,
         invert: bool,  # noqa: FBT001
         channel: int,
+        fps: int = 60,
+        geometry: StairGeometry | None = None,
     ) -> None:
         """Initialize LED strip.
 
@@ -142,6 +172,9 @@ class LEDController:
             led_brightness (int): Set to 0 for darkest and 255 for brightest
             led_invert (bool): True to invert the signal (using level shift)
             led_channel (int): set to '1' for GPIOs 13, 19, 41, 45 or 53
+            fps (int): Number of frames per second committed to the strip
+            geometry (StairGeometry): Layout of the steps and sensors on the
+                strip, defaults to the layout in `app.const.STAIR_GEOMETRY`
         """
         self.count = count
         self.pin = pin
@@ -150,29 +183,165 @@ class LEDController:
         self.brightness = brightness
         self.invert = invert
         self.channel = channel
+        self.fps = fps
+        self.geometry = geometry or StairGeometry.from_dict(STAIR_GEOMETRY)
+        self.frame_cache = FrameCache()
+        self.scene_cache = SceneCache()
+        self.clock = Clock()
+
+        self._ripple_animation: AnimationHandle | None = None
+        self._follow: FollowEffect | None = None
+        self._follow_animation: AnimationHandle | None = None
+        self._program: EffectProgram | None = None
+        self._program_animation: AnimationHandle | None = None
+        self._layer_lock = threading.Lock()
+
+    def create_backend(
+        self,
+        backend: str,
+        sink_path: str | None = None,
+        channels: list[dict] | None = None,
+    ) -> LEDBackend:
+        """Create the LED output backend.
+
+        Args:
+        ----
+            backend (str): Name of the backend: "ws281x", "multi", "virtual"
+                or "file"
+            sink_path (str): Path of the file or FIFO for the "file" backend
+            channels (list[dict]): Channels of the "multi" backend
 
-    def start(self) -> None:
-        """Initialize the LED strip.
+        Returns:
+        -------
+            LEDBackend: The LED output backend
+        """
+        match backend:
+            case "ws281x":
+                return WS281xBackend(
+                    self.count,
+                    self.pin,
+                    self.freq_hz,
+                    self.dma,
+                    self.invert,
+                    self.brightness,
+                    self.channel,
+                )
+            case "multi":
+                return self.create_multi_channel_backend(channels or [])
+            case "virtual":
+                return VirtualBackend(self.count)
+            case "file":
+                if not sink_path:
+                    msg = "The file LED backend needs a sink path"
+                    raise ValueError(msg)
+                return FileSinkBackend(self.count, sink_path)
+            case _:
+                msg = f"Unknown LED backend: {backend}"
+                raise ValueError(msg)
+
+    def create_multi_channel_backend(
+        self,
+        channels: list[dict],
+    ) -> MultiChannelBackend:
+        """Create a backend that splits the stair over several channels.
 
-        Raises
+        Every channel needs a `count`, `pin`, `dma` and `channel`, and can
+        override `freq_hz`, `invert` and `brightness` of the controller. Set
+        `reverse` for a strip that is wired in the opposite direction.
+
+        Args:
+        ----
+            channels (list[dict]): The channels, in pixel order
+
+        Returns:
+        -------
+            MultiChannelBackend: The backend
+
+        Raises:
         ------
-            StairChalllengeInitializationError: If the LED strip cannot be initialized
+            ValueError: If the channels do not add up to the strip length, or
+                share an output or DMA channel
         """
-        self.strip = PixelStrip(
-            self.count,
-            self.pin,
-            self.freq_hz,
-            self.dma,
-            self.invert,
-            self.brightness,
-            self.channel,
+        if sum(channel["count"] for channel in channels) != self.count:
+            msg = f"The LED channels do not add up to {self.count} LEDs"
+            raise ValueError(msg)
+        return MultiChannelBackend(
+            [
+                WS281xBackend(
+                    channel["count"],
+                    channel["pin"],
+                    channel.get("freq_hz", self.freq_hz),
+                    channel["dma"],
+                    channel.get("invert", self.invert),
+                    channel.get("brightness", self.brightness),
+                    channel["channel"],
+                )
+                for channel in channels
+            ],
+            [channel.get("reverse", False) for channel in channels],
         )
+
+    def set_geometry(self, geometry: StairGeometry) -> None:
+        """Use another stair layout, the strip length changes on the next start.
+
+        Args:
+        ----
+            geometry (StairGeometry): Layout of the steps and sensors
+        """
+        self.geometry = geometry
+        self.count = geometry.led_count
+        self.scene_cache.clear()
+
+    def set_clock(self, clock: Clock) -> None:
+        """Drive the animations with another clock from the next start.
+
+        Args:
+        ----
+            clock (Clock): Real, scaled or virtual clock
+        """
+        self.clock = clock
+
+    def start(
+        self,
+        backend: str = "ws281x",
+        sink_path: str | None = None,
+        channels: list[dict] | None = None,
+    ) -> None:
+        """Initialize the LED output backend and start the render thread.
+
+        When the backend cannot be initialized, for example because the app
+        does not run on a Raspberry Pi, the frames go to a virtual strip.
+
+        Args:
+        ----
+            backend (str): Name of the backend: "ws281x", "multi", "virtual"
+                or "file"
+            sink_path (str): Path of the file or FIFO for the "file" backend
+            channels (list[dict]): Channels of the "multi" backend
+        """
+        self.stop()
+        self.backend = self.create_backend(backend, sink_path, channels)
         try:
-            self.strip.begin()
-            # self.set_color(Color(0, 0, 0))
-            print("LED strip initialized successfully")
-        except StairChalllengeInitializationError as error:
+            self.backend.begin()
+            print(f"LED strip initialized successfully ({self.backend.name})")
+        except (StairChalllengeInitializationError, OSError) as error:
             print(f"Error initializing the LED strip: {error!s}")
+            self.backend = VirtualBackend(self.count)
+
+        self.renderer = LEDRenderer(self.backend, self.count, self.fps, self.clock)
+        self.animations = AnimationManager(self.renderer.compositor, self.clock)
+        self.ripple_field = RippleField(self.count)
+        self._ripple_animation = None
+        self._follow_animation = None
+        self._program_animation = None
+        self.renderer.start()
+
+    def stop(self) -> None:
+        """Stop the running animations and the render thread."""
+        if self.renderer is not None:
+            self.animations.cancel()
+            self.renderer.stop()
+            self.backend.close()
 
     def set_color(self, color: Color) -> None:
         """Set the color of the LED strip.
@@ -181,10 +350,61 @@ class LEDController:
         ----
             color (Color): Color object with RGB values
         """
-        for i in range(self.strip.numPixels()):
-            self.strip.setPixelColor(i, color)
-        self.strip.show()
-        # print(f"LED strip set to {color}")
+        self.renderer.fill(color, source="set_color")
+
+    def show_frame(self, data: bytes, source: str = "external") -> None:
+        """Show a complete frame sent by an external controller.
+
+        The frame replaces the frame buffer right away, the render thread
+        commits the latest one at the next tick, so a sender that runs
+        faster than the strip only drops frames.
+
+        Args:
+        ----
+            data (bytes): The red, green and blue byte of every pixel
+            source (str): Name of the sender, for the flight recorder
+
+        Raises:
+        ------
+            ValueError: If the data is not exactly one byte triplet per pixel
+        """
+        self.renderer.set_frame(frame_from_bytes(data, self.count), source)
+
+    def show_scene(self, scene_id: int, spec: dict) -> None:
+        """Show a stored scene.
+
+        The scene is compiled into a frame the first time it is shown, after
+        that showing it is a copy into the frame buffer.
+
+        Args:
+        ----
+            scene_id (int): Database id of the scene
+            spec (dict): Description of the scene, see `app.led_scenes`
+
+        Raises:
+        ------
+            ValueError: If the description is invalid
+        """
+        frame = self.scene_cache.get_or_compile(
+            scene_id,
+            spec,
+            self.count,
+            self.geometry,
+        )
+        self.renderer.set_frame(frame, f"scene-{scene_id}")
+
+    def invalidate_scene(self, scene_id: int) -> bool:
+        """Forget the compiled frame of a scene after it was edited.
+
+        Args:
+        ----
+            scene_id (int): Database id of the scene
+
+        Returns:
+        -------
+            bool: True if the scene was compiled
+        """
+        return self.scene_cache.invalidate(scene_id)
 
     def wheel(self, pos: int) -> Color:
         """Generate rainbow colors across 0-255 positions.
@@ -197,19 +417,14 @@ class LEDController:
         -------
             Color: Color object with RGB values
         """
-        if pos < 85:
-            return Color(pos * 3, 255 - pos * 3, 0)
-        if pos < 170:
-            pos -= 85
-            return Color(255 - pos * 3, 0, pos * 3)
-        pos -= 170
-        return Color(0, pos * 3, 255 - pos * 3)
+        return Color(int(WHEEL[pos & 255]))
 
     def color_wipe(
         self,
         color: Color,
         wait_ms: int = 50,
         direction: Direction = Direction.TOP_TO_BOTTOM,
+        priority: AnimationPriority = AnimationPriority.NORMAL,
     ) -> None:
         """Wipe color across display a pixel at a time.
 
@@ -218,33 +433,126 @@ class LEDController:
             color (Color): Color object with RGB values
             wait_ms (int): milliseconds to wait between pixels
             direction (Direction): direction of the color wipe
+            priority (AnimationPriority): priority of the animation
         """
-        num_puxels = self.strip.numPixels()
-        if direction == Direction.TOP_TO_BOTTOM:
-            range_start, range_end, range_step = 0, num_puxels, 1
-        else:
-            range_start, range_end, range_step = num_puxels - 1, -1, -1
-        for i in range(range_start, range_end, range_step):
-            self.strip.setPixelColor(i, color)
-            self.strip.show()
-            time.sleep(wait_ms / 1000.0)
-
-    def rainbow(self, wait_ms: int = 20, iterations: int = 1) -> None:
+        num_pixels = self.count
+        with self.animations.run("color_wipe", priority) as animation:
+            for i in range(1, num_pixels + 1):
+                if direction == Direction.TOP_TO_BOTTOM:
+                    self.renderer.fill(color, 0, i, source=animation.name)
+                else:
+                    self.renderer.fill(color, num_pixels - i, source=animation.name)
+                if not animation.sleep(wait_ms / 1000.0):
+                    return
+
+    def rainbow(
+        self,
+        wait_ms: int = 20,
+        iterations: int = 1,
+        priority: AnimationPriority = AnimationPriority.BACKGROUND,
+    ) -> bool:
         """Draw rainbow that fades across all pixels at once.
 
         Args:
         ----
             wait_ms (int): milliseconds to wait between pixels
             iterations (int): number of iterations
+            priority (AnimationPriority): priority of the animation
+
+        Returns:
+        -------
+            bool: True if the rainbow played to the end, False if cancelled
+        """
+        sequence = self.rainbow_sequence()
+        with self.animations.run("rainbow", priority) as animation:
+            return self.play_sequence(sequence, wait_ms, animation, iterations)
+
+    def rainbow_sequence(self) -> FrameSequence:
+        """Return the 256 rainbow frames, rendered once and then cached."""
+        return self.frame_cache.get_or_render(
+            ("rainbow", (), self.count),
+            lambda: FrameSequence.from_packed(
+                rainbow_frame(self.count, j) for j in range(256)
+            ),
+        )
+
+    def play_sequence(
+        self,
+        sequence: FrameSequence | AnimationFile,
+        wait_ms: float,
+        animation: AnimationHandle,
+        loops: int = 1,
+    ) -> bool:
+        """Replay pre-rendered frames into the frame buffer.
+
+        Frames are scheduled against the start of the playback instead of
+        sleeping a fixed time after each frame, so the playback does not
+        drift.
+
+        Args:
+        ----
+            sequence (FrameSequence): The frames to show
+            wait_ms (float): milliseconds between two frames
+            animation (AnimationHandle): Handle of the running animation
+            loops (int): number of times to play the sequence
+
+        Returns:
+        -------
+            bool: True if the sequence played to the end, False if cancelled
         """
-        for j in range(256 * iterations):
-            for i in range(self.strip.numPixels()):
-                self.strip.setPixelColor(
-                    i,
-                    self.wheel((int(i * 256 / self.strip.numPixels()) + j) & 255),
+        next_frame = self.clock.now()
+        for _ in range(loops):
+            for index in range(len(sequence)):
+                started = time.perf_counter()
+                self.renderer.set_frame(sequence.frame(index), animation.name)
+                self.renderer.profiler.record_compute(
+                    animation.name,
+                    time.perf_counter() - started,
+                )
+                next_frame += wait_ms / 1000.0
+                if not animation.sleep(max(next_frame - self.clock.now(), 0)):
+                    return False
+        return True
+
+    def play_animation(
+        self,
+        path: str,
+        loops: int = 1,
+        priority: AnimationPriority = AnimationPriority.NORMAL,
+    ) -> bool:
+        """Play an animation file at the frame rate it was recorded with.
+
+        The file is memory-mapped, frames are copied straight from the file
+        into the frame buffer.
+
+        Args:
+        ----
+            path (str): Path of the animation file
+            loops (int): number of times to play the animation
+            priority (AnimationPriority): priority of the animation
+
+        Returns:
+        -------
+            bool: True if the animation played to the end, False if cancelled
+
+        Raises:
+        ------
+            ValueError: If the animation was recorded for another strip length
+        """
+        with AnimationFile(path) as recording:
+            if recording.count != self.count:
+                msg = (
+                    f"Animation {path} has {recording.count} LEDs, "
+                    f"the strip has {self.count}"
+                )
+                raise ValueError(msg)
+            with self.animations.run("animation_file", priority) as animation:
+                return self.play_sequence(
+                    recording,
+                    1000 / recording.fps,
+                    animation,
+                    loops,
                 )
-            self.strip.show()
-            time.sleep(wait_ms / 1000.0)
 
     def one_led(self, color: Color, led: int) -> None:
         """Set the color of one LED.
@@ -254,8 +562,7 @@ class LEDController:
             color (Color): Color object with RGB values
             led (int): LED number
         """
-        self.strip.setPixelColor(led, color)
-        self.strip.show()
+        self.renderer.set_pixel(led, color)
 
     def set_sensor_led(self, color: Color, sensor_id: int) -> None:
         """Set the color of one sensor LED.
@@ -265,39 +572,21 @@ class LEDController:
             color (Color): Color object with RGB values
             sensor_id (int): Sensor ID
         """
-        match sensor_id:
-            case 3:
-                self.set_led_range(
-                    color,
-                    SensorLedZone.SENSOR_3.value["start"],
-                    SensorLedZone.SENSOR_3.value["end"],
-                )
-            case 4:
-                self.set_led_range(
-                    color,
-                    SensorLedZone.SENSOR_4.value["start"],
-                    SensorLedZone.SENSOR_4.value["end"],
-                )
-            case 5:
-                self.set_led_range(
-                    color,
-                    SensorLedZone.SENSOR_5.value["start"],
-                    SensorLedZone.SENSOR_5.value["end"],
-                )
-            case 6:
-                self.set_led_range(
-                    color,
-                    SensorLedZone.SENSOR_6.value["start"],
-                    SensorLedZone.SENSOR_6.value["end"],
-                )
-            case _:
-                print(f"Invalid sensor ID: {sensor_id}")
+        zone = self.geometry.sensor_zone(sensor_id)
+        if zone is None:
+            print(f"Invalid sensor ID: {sensor_id}")
+            return
+        self.set_led_range(color, *zone)
 
     def ripple_effect(
         self, start_position: int, ripple_length: int, color: Color, wait_ms: int = 50
     ) -> None:
         """Wipe color across display a pixel at a time.
 
+        De ripple draait als eigen laag in de compositor, zodat overlappende
+        ripples met elkaar mengen in plaats van elkaars pixels te overschrijven.
+        Deze functie blokkeert tot de ripple is afgelopen.
+
         Args:
         ----
             start_position: Startpositie van het ripple-effect
@@ -305,34 +594,81 @@ class LEDController:
             color: Kleur van het ripple-effect
             wait_ms: Wachttijd tussen het aansturen van de leds
         """
-        num_pixels = self.strip.numPixels()
+        if start_position is None:
+            print("Ripple effect has no start position")
+            return
 
-        for i in range(ripple_length):
-            # Bereken de positie van de leds voor het ripple-effect
-            left_led = start_position - i
-            right_led = start_position + i
+        layer = self.renderer.add_layer(
+            RippleEffect(start_position, ripple_length, color, wait_ms / 1000.0),
+            blend=BlendMode.MAX,
+        )
+        animation = self.animations.start("ripple", AnimationPriority.TRIGGER, layer)
+        # Wacht op de render thread, maar ruim de laag zelf op als die niet draait
+        timeout = layer.ttl + 2 * self.renderer.frame_interval
+        if not animation.join(self.clock.real_timeout(timeout)):
+            animation.cancel()
+
+    def ripple_drop(self, position: int, color: Color) -> None:
+        """Drop a wave into the shared ripple field.
 
-            # Zorg ervoor dat de leds binnen de grenzen vallen
-            if 0 <= left_led < num_pixels:
-                self.strip.setPixelColor(left_led, color)
-            if 0 <= right_led < num_pixels:
-                self.strip.setPixelColor(right_led, color)
+        Returns immediately. All drops are simulated together in one wave
+        field, so overlapping ripples interfere instead of overwriting each
+        other, and the cost per frame does not grow with the number of drops.
 
-            self.strip.show()
-            time.sleep(wait_ms / 1000.0)
+        Args:
+        ----
+            position (int): LED where the drop lands
+            color (Color): Color object with RGB values
+        """
+        if position is None:
+            print("Ripple drop has no position")
+            return
+
+        with self._layer_lock:
+            shown = self.ripple_field.add_drop(position, color)
+            # The layer ends when the waves faded out, start a new one if needed.
+            # The field retires itself under its own lock, so a drop that races
+            # with the expiry of the layer still gets a new one.
+            animation = self._ripple_animation
+            if not shown and animation is not None:
+                # The compositor is about to drop the old layer, do it now so
+                # the field is not simulated twice per frame
+                self.renderer.compositor.remove(animation.layer)
+            if not shown or animation is None or animation.is_done:
+                self.ripple_field.rewind()
+                self._ripple_animation = self.animations.start(
+                    "ripple_field",
+                    AnimationPriority.TRIGGER,
+                    self.renderer.add_layer(self.ripple_field, blend=BlendMode.MAX),
+                )
 
-        # Wis de pixels na het voltooien van het ripple-effect
-        for i in range(ripple_length):
-            left_led = start_position - i
-            right_led = start_position + i
+    def follow_step(self, position: int, color: Color) -> None:
+        """Move the Meeloper segment to a sensor that was triggered.
 
-            if 0 <= left_led < num_pixels:
-                self.strip.setPixelColor(left_led, Color(0, 0, 0))
-            if 0 <= right_led < num_pixels:
-                self.strip.setPixelColor(right_led, Color(0, 0, 0))
+        Returns immediately. The segment keeps moving with the estimated
+        speed of the walker on every frame until the next trigger corrects
+        it, and fades out when nobody triggers a sensor for a while.
 
-            self.strip.show()
-            time.sleep(wait_ms / 1000.0)
+        Args:
+        ----
+            position (int): LED of the sensor that triggered
+            color (Color): Color object with RGB values
+        """
+        if position is None:
+            print("Meeloper step has no position")
+            return
+
+        with self._layer_lock:
+            if self._follow_animation is None or self._follow_animation.is_done:
+                self._follow = FollowEffect(color)
+                self._follow_animation = self.animations.start(
+                    "meeloper",
+                    AnimationPriority.TRIGGER,
+                    self.renderer.add_layer(self._follow, blend=BlendMode.MAX),
+                )
+            self._follow.color = color
+            started_at = self._follow_animation.layer.started_at
+            self._follow.trigger(position, self.clock.now() - started_at)
 
     def set_led_range(self, color: Color, start: int, end: int) -> None:
         """Set the color of a range of LEDs.
@@ -343,59 +679,155 @@ class LEDController:
             start (int): start LED number
             end (int): end LED number
         """
-        for i in range(start, end):
-            self.strip.setPixelColor(i, color)
-        self.strip.show()
+        self.renderer.fill(color, start, end)
 
-    def sandglass(self, duration: int, color: Color) -> None:
+    def sandglass(
+        self,
+        duration: int,
+        color: Color,
+        fade: bool = True,  # noqa: FBT001, FBT002
+    ) -> AnimationHandle:
         """Display a sandglass animation for a specified duration.
 
+        The sandglass runs as a compositor layer and is computed from the
+        monotonic clock on every frame, so it finishes exactly after
+        `duration` seconds. Returns immediately, use the handle to wait for
+        the sandglass or to stop it.
+
         Args:
         ----
             duration (int): Duration of the sandglass animation in seconds.
             color (Color): Color object with RGB values
+            fade (bool): Fade out the boundary LED instead of switching it off
+
+        Returns:
+        -------
+            AnimationHandle: Handle of the sandglass animation
         """
-        # Reset the stop event
-        THREAD_STOP_EVENT.clear()
+        return self.animations.start(
+            "sandglass",
+            AnimationPriority.NORMAL,
+            self.renderer.add_layer(SandglassEffect(duration, color, fade=fade)),
+        )
 
-        num_leds = self.strip.numPixels()
-        self.set_color(color)
+    def play_program(
+        self,
+        program: dict | EffectProgram,
+        priority: AnimationPriority = AnimationPriority.NORMAL,
+    ) -> AnimationHandle:
+        """Run an effect program as a compositor layer.
 
-        # Calculate the time interval for each LED to turn off
-        interval_seconds: int = (duration - 1) / num_leds
+        Returns immediately. The program runs until its duration passed or
+        it is cancelled, sensors that fire in the meantime are passed on
+        with `trigger_program`. A program that is still running is
+        cancelled, only the newest program receives the triggers.
 
-        # Wait for the first interval
-        time.sleep(1)
+        Args:
+        ----
+            program (dict | EffectProgram): Description of the program, see
+                `app.led_programs`, or an already compiled program
+            priority (AnimationPriority): priority of the animation
+
+        Returns:
+        -------
+            AnimationHandle: Handle of the program
+
+        Raises:
+        ------
+            ValueError: If the description is invalid
+        """
+        if isinstance(program, dict):
+            program = EffectProgram(program, self.count, self.geometry)
+        with self._layer_lock:
+            if self._program_animation is not None:
+                self._program_animation.cancel()
+            self._program = program
+            self._program_animation = self.animations.start(
+                program.name,
+                priority,
+                self.renderer.add_layer(program, blend=program.blend),
+            )
+            return self._program_animation
+
+    def trigger_program(self, sensor_id: int) -> bool:
+        """Start the layers the running effect program binds to a sensor.
+
+        Args:
+        ----
+            sensor_id (int): Sensor that fired
+
+        Returns:
+        -------
+            bool: True if a running program reacts to the sensor
+        """
+        with self._layer_lock:
+            animation = self._program_animation
+            if animation is None or animation.is_done:
+                return False
+            elapsed = self.clock.now() - animation.layer.started_at
+            return self._program.trigger(sensor_id, elapsed)
+
+    def cancel_animations(self, name: str | None = None) -> int:
+        """Stop running animations.
+
+        Args:
+        ----
+            name (str): Only stop the animations with this name
+
+        Returns:
+        -------
+            int: Number of stopped animations
+        """
+        return self.animations.cancel(name)
+
+    def profiler_report(self) -> dict:
+        """Return the frame times of the effects and the counters of the renderer.
+
+        Returns
+        -------
+            dict: `stats` of the profiler and `renderer` with its counters
+        """
+        return {
+            "stats": self.renderer.profiler.stats(),
+            "renderer": self.renderer.stats,
+        }
 
-        for i in range(num_leds):
-            remaining_time = duration - (i * interval_seconds)
+    def flight_recorder_log(self) -> dict:
+        """Return when and by which source the recorded frames were written.
 
-            if THREAD_STOP_EVENT.is_set():
-                print("Force stopping sandglass animation")
-                THREAD_STOP_EVENT.clear()
-                break
+        Returns
+        -------
+            dict: The fps, the time and source of every frame and the last
+                render errors
+        """
+        recorder = self.renderer.flight_recorder
+        _, timestamps, sources = recorder.snapshot()
+        return {
+            "fps": self.renderer.fps,
+            "frames": [
+                {"time": timestamp, "source": source}
+                for timestamp, source in zip(timestamps.tolist(), sources, strict=True)
+            ],
+            "events": [
+                {"time": timestamp, "message": message}
+                for timestamp, message in recorder.events
+            ],
+        }
 
-            # Turn off the current LED
-            self.one_led(Color(0, 0, 0), i)
+    def dump_flight_recorder(self, path: str) -> int:
+        """Write the recorded frames to an animation file.
 
-            # Turn off the LED after its corresponding time interval
-            if remaining_time < 0:
-                print("Time is up, stop sandglass animation")
-                self.stop_sandglass_thread()
-                break
+        Args:
+        ----
+            path (str): Path of the animation file
 
-            # Wait for the interval
-            time.sleep(interval_seconds)
+        Returns:
+        -------
+            int: Number of frames written
+        """
+        return self.renderer.flight_recorder.dump(path, self.renderer.fps)
 
     def turn_off(self) -> None:
         """Turn off the LED strip."""
         self.set_color(Color(0, 0, 0))
         # print('LED strip turned off')
-
-    def stop_sandglass_thread(self) -> None:
-        """Stop the sandglass thread."""
-        THREAD_STOP_EVENT.set()
-
-    def reset_stop_event(self) -> None:
-        """Reset the stop event."""
-        THREAD_STOP_EVENT.clear()
@@ -0,0 +1,426 @@
+"""LED daemon that owns the strip, and the client the web workers use.
+
+The daemon runs the complete LED pipeline (controller, animations and
+render thread) in its own process, so the frame timing does not compete
+with requests, MQTT and garbage collection of the web workers. It runs in
+an app of its own, `create_app(led_daemon=True)`, that does not connect to
+MQTT, so every trigger is only handled by the web worker.
+
+Commands go over a unix socket as one JSON object per line, frames of the
+binary frame API go through a shared memory file instead.
+"""
+from __future__ import annotations
+
+import fcntl
+import json
+import mmap
+import os
+import secrets
+import socket
+import socketserver
+import threading
+from functools import partial
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from app.const import AnimationPriority
+from app.led_animations import AnimationHandle
+from app.led_effects import FRAME_DTYPE, frame_from_bytes
+
+if TYPE_CHECKING:
+    from typing import BinaryIO
+
+    from app.led_controller import LEDController
+    from app.stair_geometry import StairGeometry
+
+# Controller methods a web worker may call on the daemon
+DAEMON_COMMANDS = frozenset(
+    {
+        "cancel_animations",
+        "color_wipe",
+        "dump_flight_recorder",
+        "flight_recorder_log",
+        "follow_step",
+        "invalidate_scene",
+        "one_led",
+        "play_program",
+        "profiler_report",
+        "rainbow",
+        "ripple_drop",
+        "sandglass",
+        "set_color",
+        "set_led_range",
+        "set_sensor_led",
+        "show_scene",
+        "trigger_program",
+        "turn_off",
+    },
+)
+HEADER_SIZE = 8
+
+
+class SharedFrameBuffer:
+    """One frame in a memory mapped file, shared between processes.
+
+    The file starts with a sequence number followed by one packed color
+    per pixel. Writers take an exclusive lock on the file and make the
+    sequence odd while they copy the frame, readers copy the frame without
+    locking and retry when the sequence was odd or changed underneath.
+    """
+
+    def __init__(self, path: str | Path, count: int, create: bool = False) -> None:  # noqa: FBT001, FBT002
+        """Open the frame buffer.
+
+        Args:
+        ----
+            path (str): Path of the file, preferably in /dev/shm
+            count (int): Number of LED pixels
+            create (bool): Create or reset the file, done by the daemon
+
+        Raises:
+        ------
+            ValueError: If the file does not hold a frame of `count` pixels
+        """
+        self.count = count
+        size = HEADER_SIZE + count * np.dtype(FRAME_DTYPE).itemsize
+        self._file = Path(path).open("w+b" if create else "r+b")  # noqa: SIM115
+        if create:
+            self._file.truncate(size)
+        elif os.fstat(self._file.fileno()).st_size != size:
+            self._file.close()
+            msg = f"Shared frame buffer {path} does not hold {count} pixels"
+            raise ValueError(msg)
+        self._map = mmap.mmap(self._file.fileno(), size)
+        self._sequence = np.frombuffer(self._map, np.uint64, 1)
+        self._frame = np.frombuffer(self._map, FRAME_DTYPE, count, HEADER_SIZE)
+
+    @property
+    def sequence(self) -> int:
+        """Return the number of changes, odd while a frame is written."""
+        return int(self._sequence[0])
+
+    def write(self, frame: np.ndarray) -> None:
+        """Replace the frame.
+
+        Args:
+        ----
+            frame (np.ndarray): One packed color per LED pixel
+        """
+        fcntl.flock(self._file, fcntl.LOCK_EX)
+        try:
+            self._sequence[0] += 1
+            self._frame[:] = frame[: self.count]
+            self._sequence[0] += 1
+        finally:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+
+    def read(self) -> tuple[int, np.ndarray]:
+        """Return a consistent copy of the frame.
+
+        Returns
+        -------
+            tuple: The sequence number and the frame
+        """
+        while True:
+            sequence = self.sequence
+            frame = self._frame.copy()
+            if not sequence % 2 and sequence == self.sequence:
+                return sequence, frame
+
+    def close(self) -> None:
+        """Unmap and close the file."""
+        del self._sequence, self._frame
+        self._map.close()
+        self._file.close()
+
+
+def _encode(value: object) -> object:
+    """Encode the values JSON does not know."""
+    if isinstance(value, AnimationPriority):
+        return {"__priority__": value.value}
+    msg = f"Cannot send {type(value).__name__} to the LED daemon"
+    raise TypeError(msg)
+
+
+def _decode_priority(value: dict) -> object:
+    """Decode the priorities sent by `_encode`."""
+    if "__priority__" in value:
+        return AnimationPriority(value["__priority__"])
+    return value
+
+
+class LEDDaemon(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Unix socket server that runs the commands of the web workers.
+
+    Every connection is served by its own thread, so a blocking command
+    like `color_wipe` only holds up the worker thread that sent it, the
+    same as when the controller runs inside the web worker.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        controller: LEDController,
+        socket_path: str,
+        frames_path: str,
+    ) -> None:
+        """Initialize the daemon.
+
+        Args:
+        ----
+            controller (LEDController): Started controller that owns the strip
+            socket_path (str): Path of the unix socket to listen on
+            frames_path (str): Path of the shared frame buffer
+        """
+        self.controller = controller
+        self.frames_path = frames_path
+        self.frames = SharedFrameBuffer(frames_path, controller.count, create=True)
+        self._animations: dict[str, AnimationHandle] = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._watcher = threading.Thread(
+            target=self._watch_frames,
+            name="led-daemon-frames",
+            daemon=True,
+        )
+        Path(socket_path).unlink(missing_ok=True)
+        super().__init__(socket_path, _CommandHandler)
+        self._watcher.start()
+
+    def execute(self, command: str, args: list) -> object:
+        """Run one command on the controller.
+
+        Args:
+        ----
+            command (str): Name of the controller method, or
+                "cancel_animation" with the id of a returned animation
+            args (list): Positional arguments of the method
+
+        Returns:
+        -------
+            object: The result of the method, animations are replaced by
+                an id to cancel them with
+
+        Raises:
+        ------
+            ValueError: If the command is unknown
+        """
+        if command == "cancel_animation":
+            with self._lock:
+                animation = self._animations.pop(args[0], None)
+            return animation is not None and animation.cancel()
+        if command not in DAEMON_COMMANDS:
+            msg = f"Unknown LED daemon command: {command}"
+            raise ValueError(msg)
+
+        result = getattr(self.controller, command)(*args)
+        if isinstance(result, AnimationHandle):
+            animation_id = secrets.token_hex(8)
+            with self._lock:
+                # Forget the animations that ended on their own
+                for key in [k for k, a in self._animations.items() if a.is_done]:
+                    del self._animations[key]
+                self._animations[animation_id] = result
+            return {"__animation__": animation_id}
+        return result
+
+    def _watch_frames(self) -> None:
+        """Show every new frame of the shared frame buffer."""
+        renderer = self.controller.renderer
+        last = self.frames.sequence
+        while not self._stop_event.wait(renderer.frame_interval):
+            if self.frames.sequence != last:
+                last, frame = self.frames.read()
+                renderer.set_frame(frame, "external")
+
+    def server_close(self) -> None:
+        """Stop watching the frame buffer and remove the socket."""
+        self._stop_event.set()
+        self._watcher.join()
+        super().server_close()
+        Path(self.server_address).unlink(missing_ok=True)
+        self.frames.close()
+
+
+class _CommandHandler(socketserver.StreamRequestHandler):
+    """Connection of one web worker thread to the daemon."""
+
+    server: LEDDaemon
+
+    def handle(self) -> None:
+        """Answer every command line with a result line."""
+        for line in self.rfile:
+            try:
+                request = json.loads(line, object_hook=_decode_priority)
+                reply = {
+                    "result": self.server.execute(
+                        request["command"],
+                        request.get("args", []),
+                    ),
+                }
+            except Exception as error:  # noqa: BLE001
+                # Report every failure, the connection keeps serving
+                reply = {"error": str(error), "type": type(error).__name__}
+            self.wfile.write(json.dumps(reply, default=_encode).encode() + b"\n")
+
+
+class RemoteAnimation:
+    """Handle of an animation that runs in the LED daemon."""
+
+    def __init__(self, client: LEDDaemonClient, animation_id: str) -> None:
+        """Initialize the handle.
+
+        Args:
+        ----
+            client (LEDDaemonClient): Client that started the animation
+            animation_id (str): Id the daemon gave the animation
+        """
+        self.client = client
+        self.animation_id = animation_id
+
+    def cancel(self) -> bool:
+        """Stop the animation.
+
+        Returns
+        -------
+            bool: True if the animation was still running
+        """
+        return bool(self.client.call("cancel_animation", self.animation_id))
+
+
+class LEDDaemonClient:
+    """Stand-in for the `LEDController` in a web worker.
+
+    The commands in `DAEMON_COMMANDS` are sent to the daemon and block
+    until it answered, like the controller methods they replace. Frames
+    of the binary frame API are written to the shared frame buffer. Every
+    thread keeps its own connection, so commands of different threads do
+    not wait for each other. The frame times and the flight recorder are
+    read from the daemon as well, it writes the flight recorder file to a
+    path of the web worker.
+    """
+
+    def __init__(
+        self,
+        geometry: StairGeometry,
+        socket_path: str,
+        frames_path: str,
+    ) -> None:
+        """Initialize the client, it connects on the first command.
+
+        Args:
+        ----
+            geometry (StairGeometry): Steps and sensors on the strip
+            socket_path (str): Path of the unix socket of the daemon
+            frames_path (str): Path of the shared frame buffer
+        """
+        self.socket_path = socket_path
+        self.frames_path = frames_path
+        self._frames: SharedFrameBuffer | None = None
+        self._local = threading.local()
+        self.set_geometry(geometry)
+
+    def __getattr__(self, name: str) -> partial:
+        """Return the remote version of a controller command."""
+        if name in DAEMON_COMMANDS:
+            return partial(self.call, name)
+        raise AttributeError(name)
+
+    def set_geometry(self, geometry: StairGeometry) -> None:
+        """Use another stair geometry to look up the sensors.
+
+        Args:
+        ----
+            geometry (StairGeometry): Steps and sensors on the strip
+        """
+        self.geometry = geometry
+        self.count = geometry.led_count
+
+    def _connection(self) -> BinaryIO:
+        """Return the connection of this thread, connect if needed."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                sock.connect(self.socket_path)
+                connection = sock.makefile("rwb")
+            finally:
+                # The file keeps the connection open until it is closed
+                sock.close()
+            self._local.connection = connection
+        return connection
+
+    def call(self, command: str, *args: object) -> object:
+        """Run a command in the daemon and wait for the result.
+
+        Args:
+        ----
+            command (str): Name of the command
+            *args (object): Arguments of the command
+
+        Returns:
+        -------
+            object: The result, None if the daemon cannot be reached
+
+        Raises:
+        ------
+            ValueError: If the daemon rejected the arguments
+        """
+        request = {"command": command, "args": args}
+        try:
+            connection = self._connection()
+            connection.write(json.dumps(request, default=_encode).encode() + b"\n")
+            connection.flush()
+            line = connection.readline()
+            reason = "connection closed"
+        except OSError as error:
+            line, reason = b"", error
+        if not line:
+            self.close()
+            print(f"LED daemon unavailable: {reason}")
+            return None
+
+        reply = json.loads(line, object_hook=self._decode_animation)
+        if "error" not in reply:
+            return reply["result"]
+        if reply["type"] == "ValueError":
+            raise ValueError(reply["error"])
+        print(f"LED daemon could not run {command}: {reply['type']}: {reply['error']}")
+        return None
+
+    def _decode_animation(self, value: dict) -> object:
+        """Decode the animations returned by the daemon."""
+        if "__animation__" in value:
+            return RemoteAnimation(self, value["__animation__"])
+        return value
+
+    def show_frame(self, data: bytes, source: str = "external") -> None:  # noqa: ARG002
+        """Hand a complete frame to the daemon through shared memory.
+
+        Args:
+        ----
+            data (bytes): The red, green and blue byte of every pixel
+            source (str): Name of the sender, the daemon shows "external"
+
+        Raises:
+        ------
+            ValueError: If the data is not exactly one byte triplet per pixel
+        """
+        frame = frame_from_bytes(data, self.count)
+        if self._frames is None:
+            try:
+                self._frames = SharedFrameBuffer(self.frames_path, self.count)
+            except OSError as error:
+                print(f"LED daemon unavailable: {error}")
+                return
+        self._frames.write(frame)
+
+    def close(self) -> None:
+        """Close the connection of this thread."""
+        connection = getattr(self._local, "connection", None)
+        self._local.connection = None
+        if connection is not None:
+            connection.close()
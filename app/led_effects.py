@@ -0,0 +1,289 @@
+"""Vectorized LED effect kernels.
+
+Frames are NumPy arrays with one packed 0xRRGGBB `uint32` value per pixel,
+the same layout `rpi_ws281x.Color` uses. Kernels compute complete frames
+with array operations instead of per-pixel Python loops.
+"""
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from typing import Final
+
+import numpy as np
+
+FRAME_DTYPE: Final = np.uint32
+
+
+def pack_rgb(red: np.ndarray, green: np.ndarray, blue: np.ndarray) -> np.ndarray:
+    """Pack separate color channels into 0xRRGGBB values.
+
+    Args:
+    ----
+        red (np.ndarray): Red channel values (0-255)
+        green (np.ndarray): Green channel values (0-255)
+        blue (np.ndarray): Blue channel values (0-255)
+
+    Returns:
+    -------
+        np.ndarray: Packed colors
+    """
+    return (
+        (np.asarray(red, dtype=FRAME_DTYPE) << 16)
+        | (np.asarray(green, dtype=FRAME_DTYPE) << 8)
+        | np.asarray(blue, dtype=FRAME_DTYPE)
+    )
+
+
+def unpack_rgb(frame: np.ndarray) -> np.ndarray:
+    """Split packed 0xRRGGBB values into an (N, 3) array of channels.
+
+    Args:
+    ----
+        frame (np.ndarray): Packed colors
+
+    Returns:
+    -------
+        np.ndarray: uint8 array with the red, green and blue columns
+    """
+    frame = np.asarray(frame, dtype=FRAME_DTYPE)
+    return np.stack(
+        ((frame >> 16) & 0xFF, (frame >> 8) & 0xFF, frame & 0xFF),
+        axis=-1,
+    ).astype(np.uint8)
+
+
+def frame_from_bytes(data: bytes, count: int) -> np.ndarray:
+    """Pack a raw frame of RGB bytes, three bytes per pixel.
+
+    Args:
+    ----
+        data (bytes): The red, green and blue byte of every pixel
+        count (int): Number of LED pixels
+
+    Returns:
+    -------
+        np.ndarray: Packed colors
+
+    Raises:
+    ------
+        ValueError: If the data is not exactly one byte triplet per pixel
+    """
+    if len(data) != count * 3:
+        msg = f"Expected {count * 3} bytes for {count} pixels, got {len(data)}"
+        raise ValueError(msg)
+    channels = np.frombuffer(data, dtype=np.uint8).reshape(count, 3)
+    return pack_rgb(channels[:, 0], channels[:, 1], channels[:, 2])
+
+
+def _build_wheel() -> np.ndarray:
+    """Build the 256-entry rainbow lookup table used by `LEDController.wheel`."""
+    pos = np.arange(256, dtype=np.int64)
+    red = np.select(
+        [pos < 85, pos < 170],
+        [pos * 3, 255 - (pos - 85) * 3],
+        0,
+    )
+    green = np.select(
+        [pos < 85, pos < 170],
+        [255 - pos * 3, 0],
+        (pos - 170) * 3,
+    )
+    blue = np.select(
+        [pos < 85, pos < 170],
+        [0, (pos - 85) * 3],
+        255 - (pos - 170) * 3,
+    )
+    table = pack_rgb(red, green, blue)
+    table.setflags(write=False)
+    return table
+
+
+WHEEL: Final = _build_wheel()
+
+
+@lru_cache(maxsize=8)
+def rainbow_offsets(count: int) -> np.ndarray:
+    """Return the per-pixel wheel offsets for a rainbow over `count` pixels.
+
+    Args:
+    ----
+        count (int): Number of LED pixels
+
+    Returns:
+    -------
+        np.ndarray: Read-only array with the wheel offset of every pixel
+    """
+    offsets = np.arange(count, dtype=np.int64) * 256 // count
+    offsets.setflags(write=False)
+    return offsets
+
+
+def rainbow_frame(count: int, step: int) -> np.ndarray:
+    """Compute one frame of the rainbow animation.
+
+    Args:
+    ----
+        count (int): Number of LED pixels
+        step (int): Animation step, the rainbow shifts one wheel position per step
+
+    Returns:
+    -------
+        np.ndarray: Packed frame
+    """
+    return WHEEL[(rainbow_offsets(count) + step) & 255]
+
+
+def solid_frame(count: int, color: int) -> np.ndarray:
+    """Compute a frame with every pixel set to the same color.
+
+    Args:
+    ----
+        count (int): Number of LED pixels
+        color (int): Packed color
+
+    Returns:
+    -------
+        np.ndarray: Packed frame
+    """
+    return np.full(count, color, dtype=FRAME_DTYPE)
+
+
+def span_mask(count: int, center: int, radius: int) -> np.ndarray:
+    """Return a mask of the pixels within `radius` of `center`.
+
+    Args:
+    ----
+        count (int): Number of LED pixels
+        center (int): Center pixel of the span
+        radius (int): Number of pixels on each side, the center included
+
+    Returns:
+    -------
+        np.ndarray: Boolean mask with one entry per pixel
+    """
+    return np.abs(np.arange(count) - center) < radius
+
+
+class Effect(ABC):
+    """Base class for effects rendered as a compositor layer.
+
+    An effect is a pure function of the time since it started, so it can be
+    blended with other effects and rendered once per frame by the renderer.
+    """
+
+    name: str = "effect"
+    duration: float | None = None
+
+    @abstractmethod
+    def render(self, elapsed: float, count: int) -> tuple[np.ndarray, np.ndarray]:
+        """Render the effect.
+
+        Args:
+        ----
+            elapsed (float): Seconds since the effect started
+            count (int): Number of LED pixels
+
+        Returns:
+        -------
+            tuple: Packed colors and the alpha (0.0-1.0) of every pixel
+        """
+
+    def is_finished(self, elapsed: float) -> bool:  # noqa: ARG002
+        """Return True if the effect ended before its duration.
+
+        Args:
+        ----
+            elapsed (float): Seconds since the effect started
+        """
+        return False
+
+
+class RippleEffect(Effect):
+    """Ripple that expands from a position and then clears from the center."""
+
+    name = "ripple"
+
+    def __init__(
+        self,
+        start_position: int,
+        ripple_length: int,
+        color: int,
+        step_seconds: float,
+    ) -> None:
+        """Initialize the ripple.
+
+        Args:
+        ----
+            start_position (int): Center pixel of the ripple
+            ripple_length (int): Number of pixels the ripple grows on each side
+            color (int): Packed color of the ripple
+            step_seconds (float): Seconds between two growth steps
+        """
+        self.start_position = start_position
+        self.ripple_length = ripple_length
+        self.color = color
+        self.step_seconds = step_seconds
+        self.duration = 2 * ripple_length * step_seconds
+
+    def render(self, elapsed: float, count: int) -> tuple[np.ndarray, np.ndarray]:
+        """Render the ripple at the given time."""
+        step = int(elapsed / self.step_seconds) + 1 if self.step_seconds else 0
+        lit = span_mask(count, self.start_position, min(step, self.ripple_length))
+        if step > self.ripple_length:
+            cleared = step - self.ripple_length
+            lit &= ~span_mask(count, self.start_position, cleared)
+        return solid_frame(count, self.color), lit.astype(np.float32)
+
+
+class SandglassEffect(Effect):
+    """Sandglass that drains the strip from the first pixel to the last.
+
+    The number of lit pixels is computed from the elapsed time on every
+    frame, so the animation ends exactly after `duration` seconds no matter
+    how long a frame takes to render.
+    """
+
+    name = "sandglass"
+
+    def __init__(
+        self,
+        duration: float,
+        color: int,
+        hold: float = 1.0,
+        fade: bool = True,  # noqa: FBT001, FBT002
+    ) -> None:
+        """Initialize the sandglass.
+
+        Args:
+        ----
+            duration (float): Total duration of the sandglass in seconds
+            color (int): Packed color of the lit pixels
+            hold (float): Seconds the full strip stays lit before draining
+            fade (bool): Fade the boundary pixel out instead of switching it off
+        """
+        self.duration = duration
+        self.color = color
+        self.hold = hold if duration > hold else 0.0
+        self.fade = fade
+
+    def progress(self, elapsed: float) -> float:
+        """Return how far the sandglass drained (0.0-1.0).
+
+        Args:
+        ----
+            elapsed (float): Seconds since the sandglass started
+        """
+        if elapsed >= self.duration:
+            return 1.0
+        return max(elapsed - self.hold, 0.0) / (self.duration - self.hold)
+
+    def render(self, elapsed: float, count: int) -> tuple[np.ndarray, np.ndarray]:
+        """Render the sandglass at the given time."""
+        drained = self.progress(elapsed) * count
+        pixels = np.arange(count, dtype=np.float32)
+        if self.fade:
+            alpha = np.clip(pixels + 1 - drained, 0, 1)
+        else:
+            alpha = (pixels >= np.ceil(drained)).astype(np.float32)
+        return solid_frame(count, self.color), alpha
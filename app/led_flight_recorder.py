@@ -0,0 +1,138 @@
+"""Flight recorder that keeps the last committed LED frames in memory."""
+from __future__ import annotations
+
+import threading
+from collections import deque
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from app.led_effects import FRAME_DTYPE
+from app.led_recording import AnimationRecorder
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+class FlightRecorder:
+    """Fixed-size ring buffer of the last committed frames.
+
+    All frames live in one preallocated slab of shape (capacity, count), so
+    recording a frame is a single copy into the next row and never
+    allocates. Next to every frame the wall clock time and the effect that
+    produced it are kept, so the buffer can be dumped after the fact to see
+    what the stair was showing. Errors of the render thread are kept as
+    events next to the frames.
+    """
+
+    def __init__(self, count: int, capacity: int = 600) -> None:
+        """Initialize the flight recorder.
+
+        Args:
+        ----
+            count (int): Number of LED pixels per frame
+            capacity (int): Number of frames to keep
+        """
+        self.count = count
+        # Wall clock time and message of the last render errors
+        self.events: deque[tuple[float, str]] = deque(maxlen=100)
+        self._lock = threading.Lock()
+        self._allocate(capacity)
+
+    def _allocate(self, capacity: int) -> None:
+        """Allocate an empty ring buffer."""
+        self.capacity = max(capacity, 0)
+        self.frames_recorded: int = 0
+        self._frames = np.zeros((self.capacity, self.count), dtype=FRAME_DTYPE)
+        self._timestamps = np.zeros(self.capacity, dtype=np.float64)
+        self._sources: list[str] = [""] * self.capacity
+
+    def __len__(self) -> int:
+        """Return the number of frames in the buffer."""
+        return min(self.frames_recorded, self.capacity)
+
+    @property
+    def nbytes(self) -> int:
+        """Return the memory used by the buffer."""
+        return self._frames.nbytes + self._timestamps.nbytes
+
+    def record(self, frame: np.ndarray, timestamp: float, source: str) -> None:
+        """Store a frame, overwriting the oldest one when the buffer is full.
+
+        Args:
+        ----
+            frame (np.ndarray): One packed color per LED pixel
+            timestamp (float): Wall clock time the frame was committed
+            source (str): Name of the effect that produced the frame
+        """
+        with self._lock:
+            if not self.capacity:
+                return
+            index = self.frames_recorded % self.capacity
+            self._frames[index] = frame[: self.count]
+            self._timestamps[index] = timestamp
+            self._sources[index] = source
+            self.frames_recorded += 1
+
+    def record_event(self, timestamp: float, message: str) -> None:
+        """Store an error of the render thread, dropping the oldest event.
+
+        Args:
+        ----
+            timestamp (float): Wall clock time of the error
+            message (str): What went wrong
+        """
+        self.events.append((timestamp, message))
+
+    def snapshot(self) -> tuple[np.ndarray, np.ndarray, list[str]]:
+        """Return a copy of the buffer, oldest frame first.
+
+        Returns
+        -------
+            tuple: The frames, their timestamps and their sources
+        """
+        with self._lock:
+            order = np.arange(len(self))
+            if self.frames_recorded > self.capacity:
+                order = (order + self.frames_recorded) % self.capacity
+            return (
+                self._frames[order],
+                self._timestamps[order],
+                [self._sources[index] for index in order],
+            )
+
+    def dump(self, path: str | Path, fps: int, max_gap: float = 1.0) -> int:
+        """Write the buffer to an animation file.
+
+        Frames are only committed when they change, so every frame is
+        repeated until the next one to replay at the original pace. Quiet
+        periods longer than `max_gap` seconds are shortened to `max_gap`.
+
+        Args:
+        ----
+            path (str): Path of the animation file
+            fps (int): Frames per second of the animation file
+            max_gap (float): Longest time in seconds a frame is held
+
+        Returns:
+        -------
+            int: Number of frames written
+        """
+        frames, timestamps, _ = self.snapshot()
+        holds = np.diff(timestamps, append=timestamps[-1:] + 1 / fps)
+        repeats = np.maximum(np.rint(np.minimum(holds, max_gap) * fps), 1)
+        with AnimationRecorder(path, self.count, fps) as recorder:
+            for frame, repeat in zip(frames, repeats.astype(int), strict=True):
+                for _ in range(repeat):
+                    recorder.write(frame)
+        return recorder.frames_recorded
+
+    def resize(self, capacity: int) -> None:
+        """Change the number of frames to keep, dropping the recorded frames.
+
+        Args:
+        ----
+            capacity (int): Number of frames to keep
+        """
+        with self._lock:
+            self._allocate(capacity)
@@ -0,0 +1,142 @@
+"""Meeloper effect: a light segment that follows the person on the stair."""
+from __future__ import annotations
+
+import numpy as np
+
+from app.led_effects import Effect, solid_frame
+
+
+class FollowEffect(Effect):
+    """Light segment that tracks a walker between sensor triggers.
+
+    Sensors are far apart, so the position of the walker is estimated with
+    an alpha-beta filter on the trigger positions and extrapolated with the
+    estimated speed on every frame. The segment moves smoothly between the
+    sensors instead of jumping from one trigger to the next, and ends after
+    `timeout` seconds without a trigger.
+
+    A trigger replaces the whole estimate with one tuple assignment, so the
+    render thread never sees a half updated state and needs no lock.
+    """
+
+    name = "meeloper"
+    # Seconds to fade out at the end of the timeout
+    fade: float = 0.5
+
+    def __init__(
+        self,
+        color: int,
+        length: float = 10.0,
+        alpha: float = 0.85,
+        beta: float = 0.5,
+        max_speed: float = 60.0,
+        horizon: float = 1.5,
+        timeout: float = 4.0,
+    ) -> None:
+        """Initialize the follow effect.
+
+        Args:
+        ----
+            color (int): Packed color of the segment
+            length (float): Length of the segment in pixels
+            alpha (float): How much a trigger corrects the predicted position
+            beta (float): How much a trigger corrects the estimated speed
+            max_speed (float): Fastest believable speed in pixels per second
+            horizon (float): Seconds to extrapolate after the last trigger
+            timeout (float): Seconds without trigger until the effect ends
+        """
+        self.color = color
+        self.length = length
+        self.alpha = alpha
+        self.beta = beta
+        self.max_speed = max_speed
+        self.horizon = horizon
+        self.timeout = timeout
+        # Position, speed and time of the last trigger, the speed is None
+        # until a second trigger measured it
+        self._state: tuple[float, float | None, float] | None = None
+        self._pixels: np.ndarray | None = None
+
+    @property
+    def speed(self) -> float:
+        """Return the estimated speed in pixels per second."""
+        if self._state is None or self._state[1] is None:
+            return 0.0
+        return self._state[1]
+
+    def trigger(self, position: float, elapsed: float) -> None:
+        """Correct the estimate with a sensor trigger.
+
+        Args:
+        ----
+            position (float): Pixel of the sensor that triggered
+            elapsed (float): Seconds since the effect started
+        """
+        state = self._state
+        if state is None or elapsed - state[2] > self.timeout:
+            self._state = (float(position), None, elapsed)
+            return
+
+        last_position, speed, last_time = state
+        delta = max(elapsed - last_time, 1e-3)
+        if speed is None:
+            # Second trigger, the first speed estimate is the plain difference
+            speed = (position - last_position) / delta
+            estimate = float(position)
+        else:
+            predicted = last_position + speed * min(delta, self.horizon)
+            residual = position - predicted
+            speed += self.beta * residual / delta
+            estimate = predicted + self.alpha * residual
+        speed = min(max(speed, -self.max_speed), self.max_speed)
+        self._state = (estimate, speed, elapsed)
+
+    def position_at(self, elapsed: float) -> float | None:
+        """Return the predicted position of the walker.
+
+        Args:
+        ----
+            elapsed (float): Seconds since the effect started
+        """
+        state = self._state
+        if state is None:
+            return None
+        position, speed, last_time = state
+        if speed is None:
+            return position
+        return position + speed * min(max(elapsed - last_time, 0.0), self.horizon)
+
+    def _brightness(self, idle: float) -> float:
+        """Return the brightness of the segment after `idle` seconds."""
+        if idle <= self.timeout - self.fade:
+            return 1.0
+        return max(self.timeout - idle, 0.0) / self.fade
+
+    def render(self, elapsed: float, count: int) -> tuple[np.ndarray, np.ndarray]:
+        """Render the segment at the predicted position."""
+        if self._pixels is None or len(self._pixels) != count:
+            self._pixels = np.arange(count, dtype=np.float32)
+
+        state = self._state
+        if state is None:
+            return solid_frame(count, self.color), np.zeros(count, dtype=np.float32)
+
+        position, speed, last_time = state
+        idle = max(elapsed - last_time, 0.0)
+        if speed is not None:
+            position += speed * min(idle, self.horizon)
+        position = min(max(position, 0.0), count - 1.0)
+        # Anti-aliased edges, so the segment moves in sub-pixel steps
+        alpha = np.clip(
+            self.length / 2 + 0.5 - np.abs(self._pixels - np.float32(position)),
+            0,
+            1,
+        )
+        return solid_frame(count, self.color), alpha * np.float32(
+            self._brightness(idle),
+        )
+
+    def is_finished(self, elapsed: float) -> bool:
+        """Return True once the walker has not triggered for `timeout` seconds."""
+        state = self._state
+        return state is not None and elapsed - state[2] >= self.timeout
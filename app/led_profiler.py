@@ -0,0 +1,128 @@
+"""Frame time instrumentation of the LED render pipeline."""
+from __future__ import annotations
+
+import numpy as np
+
+# Histogram bucket edges in milliseconds, the last bucket is open ended
+HISTOGRAM_EDGES_MS = (0, 0.05, 0.1, 0.2, 0.5, 1, 2, 5, 10, 20, 50, np.inf)
+
+
+class FrameTimer:
+    """Rolling window of the most recent durations of one pipeline stage.
+
+    Recording is a single store into a preallocated array, the percentiles
+    and the histogram are only computed when the stats are read.
+    """
+
+    def __init__(self, window: int = 1024) -> None:
+        """Initialize the timer.
+
+        Args:
+        ----
+            window (int): Number of recent durations to keep
+        """
+        self.count: int = 0
+        self.total: float = 0.0
+        self._samples = np.zeros(window, dtype=np.float64)
+
+    def record(self, seconds: float) -> None:
+        """Add one duration.
+
+        Args:
+        ----
+            seconds (float): Duration in seconds
+        """
+        self._samples[self.count % len(self._samples)] = seconds
+        self.count += 1
+        self.total += seconds
+
+    @property
+    def samples(self) -> np.ndarray:
+        """Return the durations in the window in milliseconds."""
+        return self._samples[: min(self.count, len(self._samples))] * 1000
+
+    def stats(self, budget: float | None = None) -> dict[str, int | float | list]:
+        """Return the percentiles and the histogram of the window.
+
+        Args:
+        ----
+            budget (float): Frame budget in seconds, durations above it are
+                counted as `over_budget`
+
+        Returns:
+        -------
+            dict: Count, mean, p50, p95, p99 and max in milliseconds and the
+                bucket counts of `HISTOGRAM_EDGES_MS`
+        """
+        samples = self.samples
+        if not len(samples):
+            p50 = p95 = p99 = peak = 0.0
+        else:
+            p50, p95, p99 = np.percentile(samples, (50, 95, 99)).tolist()
+            peak = float(samples.max())
+        stats = {
+            "count": self.count,
+            "mean_ms": round(self.total * 1000 / max(self.count, 1), 3),
+            "p50_ms": round(p50, 3),
+            "p95_ms": round(p95, 3),
+            "p99_ms": round(p99, 3),
+            "max_ms": round(peak, 3),
+            "histogram": np.histogram(samples, HISTOGRAM_EDGES_MS)[0].tolist(),
+        }
+        if budget is not None:
+            stats["over_budget"] = int((samples > budget * 1000).sum())
+        return stats
+
+
+class RenderProfiler:
+    """Frame times of the render pipeline, split per effect.
+
+    Three stages are measured: the compute time of every effect (rendering
+    and blending a layer, or unpacking a frame of a pre-rendered animation),
+    the commit time of the backend write (`show()` on the strip) and the
+    total time of a frame. Compare them to the frame budget to see which
+    effect does not fit the frame rate.
+    """
+
+    def __init__(self, budget: float, window: int = 1024) -> None:
+        """Initialize the profiler.
+
+        Args:
+        ----
+            budget (float): Seconds available per frame
+            window (int): Number of recent frames to compute percentiles over
+        """
+        self.budget = budget
+        self.window = window
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget all measurements."""
+        self.effects: dict[str, FrameTimer] = {}
+        self.commit = FrameTimer(self.window)
+        self.frame = FrameTimer(self.window)
+
+    def record_compute(self, name: str, seconds: float) -> None:
+        """Add the time an effect took to produce one frame.
+
+        Args:
+        ----
+            name (str): Name of the effect
+            seconds (float): Duration in seconds
+        """
+        timer = self.effects.get(name)
+        if timer is None:
+            timer = self.effects.setdefault(name, FrameTimer(self.window))
+        timer.record(seconds)
+
+    def stats(self) -> dict[str, float | dict]:
+        """Return the frame time statistics of every stage and effect."""
+        return {
+            "budget_ms": round(self.budget * 1000, 3),
+            "frame": self.frame.stats(self.budget),
+            "commit": self.commit.stats(self.budget),
+            "effects": {
+                name: timer.stats(self.budget)
+                for name, timer in sorted(self.effects.copy().items())
+            },
+        }
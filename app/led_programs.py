@@ -0,0 +1,534 @@
+"""Declarative LED effects compiled into vectorized frame programs.
+
+An effect program is described with plain data, for example JSON sent with
+a workout, instead of Python code:
+
+    {
+        "name": "sunrise",
+        "duration": 30,
+        "blend": "over",
+        "layers": [
+            {"type": "gradient", "colors": ["#ff4000", "#ffd000"], "speed": 5,
+             "fade_in": 2, "easing": "ease_in"},
+            {"type": "segment", "color": "#ffffff", "length": 8, "from": 0,
+             "to": 103, "travel": 4, "repeat": "bounce", "motion": "ease_in_out"}
+        ],
+        "triggers": [
+            {"sensor": "any", "layers": [
+                {"type": "solid", "color": "#00ff00", "zone": {"sensor": "trigger"},
+                 "duration": 1, "fade_out": 1}
+            ]}
+        ]
+    }
+
+Every layer has a `type` ("solid", "gradient", "segment" or "pulse"), an
+optional `zone` (`{"start": 0, "end": 20}`, `{"steps": [1, 2]}` or
+`{"sensor": 3}`), `delay`, `duration`, `fade_in`, `fade_out`, `easing` and
+`opacity`. Layers are stacked in order, later layers on top.
+
+Triggers start their layers when a sensor fires. Positions in trigger
+layers are relative to the LED of the sensor that fired, and the zone
+`{"sensor": "trigger"}` is the zone of that sensor.
+
+All colors, zone masks and gradients are computed when the program is
+compiled. A frame only evaluates a few scalars per layer and blends the
+layers with array operations.
+"""
+from __future__ import annotations
+
+import math
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Final
+
+import numpy as np
+
+from app.const import BlendMode, Easing, MotionRepeat
+from app.led_effects import Effect, pack_rgb
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from app.stair_geometry import StairGeometry
+
+EASINGS: Final[dict[Easing, Callable[[float], float]]] = {
+    Easing.LINEAR: lambda t: t,
+    Easing.EASE_IN: lambda t: t * t,
+    Easing.EASE_OUT: lambda t: 1 - (1 - t) * (1 - t),
+    Easing.EASE_IN_OUT: lambda t: t * t * (3 - 2 * t),
+}
+# Most triggered layer sets that run at the same time
+MAX_TRIGGERS: Final = 16
+
+
+def parse_color(value: str | list | int) -> np.ndarray:
+    """Convert a color of an effect program to red, green and blue.
+
+    Args:
+    ----
+        value (str | list | int): "#rrggbb", [red, green, blue] or a packed
+            0xRRGGBB value
+
+    Returns:
+    -------
+        np.ndarray: float32 array with the red, green and blue value
+
+    Raises:
+    ------
+        ValueError: If the value is not a color
+    """
+    if isinstance(value, str) and len(value.lstrip("#")) == 6:
+        value = int(value.lstrip("#"), 16)
+    if isinstance(value, int) and 0 <= value <= 0xFFFFFF:
+        return np.array(
+            [(value >> 16) & 0xFF, (value >> 8) & 0xFF, value & 0xFF],
+            dtype=np.float32,
+        )
+    if isinstance(value, list | tuple) and len(value) == 3:
+        return np.clip(np.asarray(value, dtype=np.float32), 0, 255)
+    msg = f"Invalid color in effect program: {value!r}"
+    raise ValueError(msg)
+
+
+def _enum(enum: type, value: str, field: str) -> Easing | MotionRepeat | BlendMode:
+    """Look up a DSL keyword, with a readable error for unknown values."""
+    try:
+        return enum(value)
+    except ValueError:
+        options = ", ".join(member.value for member in enum)
+        msg = f"Invalid {field} {value!r} in effect program, use one of: {options}"
+        raise ValueError(msg) from None
+
+
+def _number(
+    spec: dict,
+    field: str,
+    default: float | None = None,
+    minimum: float | None = None,
+    *,
+    positive: bool = False,
+) -> float | None:
+    """Read a number of the description, with a readable error if it is not.
+
+    Args:
+    ----
+        spec (dict): Description of a layer or program
+        field (str): Key of the number
+        default (float): Value if the key is missing
+        minimum (float): Lowest allowed value
+        positive (bool): True if the number must be above zero
+
+    Returns:
+    -------
+        float: The number, the default if the key is missing
+
+    Raises:
+    ------
+        ValueError: If the value is not a finite number in range
+    """
+    value = spec.get(field)
+    if value is None:
+        return default
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        number = math.nan
+    if not math.isfinite(number):
+        msg = f"Invalid {field} {value!r} in effect program, use a number"
+        raise ValueError(msg)
+    if positive and number <= 0:
+        msg = f"The {field} in an effect program must be above 0, not {value!r}"
+        raise ValueError(msg)
+    if minimum is not None and number < minimum:
+        msg = f"The {field} in an effect program must be {minimum} or more"
+        raise ValueError(msg)
+    return number
+
+
+class ProgramLayer(ABC):
+    """One compiled layer of an effect program.
+
+    The base class handles the zone, the timing and the fades, the
+    subclasses compute the colors and the shape of the layer.
+    """
+
+    def __init__(
+        self,
+        spec: dict,
+        count: int,
+        geometry: StairGeometry | None,
+        origin: int = 0,
+        sensor_id: int | None = None,
+    ) -> None:
+        """Compile the common part of a layer.
+
+        Args:
+        ----
+            spec (dict): Description of the layer
+            count (int): Number of LED pixels
+            geometry (StairGeometry): Layout of the steps and sensors
+            origin (int): LED that positions in the layer are relative to
+            sensor_id (int): Sensor that started the layer, for triggers
+        """
+        self.count = count
+        self.origin = origin
+        self.pixels = np.arange(count, dtype=np.float32)
+        self.mask = self._compile_zone(spec.get("zone"), geometry, sensor_id)
+        lit = np.flatnonzero(self.mask)
+        self.start, self.end = (int(lit[0]), int(lit[-1]) + 1) if len(lit) else (0, 0)
+
+        self.delay = _number(spec, "delay", 0, 0)
+        self.duration = _number(spec, "duration", positive=True)
+        self.fade_in = _number(spec, "fade_in", 0, 0)
+        self.fade_out = _number(spec, "fade_out", 0, 0)
+        self.easing = EASINGS[_enum(Easing, spec.get("easing", "linear"), "easing")]
+        self.opacity = _number(spec, "opacity", 1, 0)
+
+    @property
+    def ends_at(self) -> float | None:
+        """Return the time the layer ends, None if it never ends."""
+        return None if self.duration is None else self.delay + self.duration
+
+    def _compile_zone(
+        self,
+        zone: dict | None,
+        geometry: StairGeometry | None,
+        sensor_id: int | None,
+    ) -> np.ndarray:
+        """Compile the zone of the layer into a float32 mask."""
+        if zone is None:
+            return np.ones(self.count, dtype=np.float32)
+        if "steps" in zone or "sensor" in zone:
+            if geometry is None:
+                msg = "Effect program zones of steps and sensors need a stair geometry"
+                raise ValueError(msg)
+            if "steps" in zone:
+                mask = np.zeros(self.count, dtype=bool)
+                for step in zone["steps"]:
+                    if (
+                        not isinstance(step, int)
+                        or not 1 <= step <= geometry.step_count
+                    ):
+                        msg = (
+                            f"Unknown step {step!r} in effect program, "
+                            f"use 1 to {geometry.step_count}"
+                        )
+                        raise ValueError(msg)
+                    mask |= geometry.step_mask(step)[: self.count]
+                return mask.astype(np.float32)
+            sensor = sensor_id if zone["sensor"] == "trigger" else zone["sensor"]
+            mask = geometry.sensor_mask(sensor)
+            if mask is None:
+                msg = f"Unknown sensor {sensor} in effect program"
+                raise ValueError(msg)
+            return mask[: self.count].astype(np.float32)
+        start = self.origin + int(_number(zone, "start", -self.origin))
+        end = self.origin + int(_number(zone, "end", self.count - self.origin))
+        mask = (self.pixels >= start) & (self.pixels < end)
+        return mask.astype(np.float32)
+
+    def level(self, elapsed: float) -> float:
+        """Return the opacity of the layer after the delay and the fades.
+
+        Args:
+        ----
+            elapsed (float): Seconds since the program or trigger started
+        """
+        local = elapsed - self.delay
+        if local < 0 or (self.duration is not None and local >= self.duration):
+            return 0.0
+        level = self.opacity
+        if self.fade_in and local < self.fade_in:
+            level *= self.easing(local / self.fade_in)
+        if self.duration is not None and self.fade_out:
+            remaining = self.duration - local
+            if remaining < self.fade_out:
+                level *= self.easing(remaining / self.fade_out)
+        return level
+
+    @abstractmethod
+    def shape(self, local: float) -> tuple[np.ndarray, np.ndarray | float]:
+        """Return the colors and the alpha of the layer.
+
+        Args:
+        ----
+            local (float): Seconds since the layer started
+
+        Returns:
+        -------
+            tuple: float32 (count, 3) colors and the alpha per pixel
+        """
+
+    def evaluate(self, elapsed: float) -> tuple[np.ndarray, np.ndarray] | None:
+        """Return the colors and alpha of the layer, None while it is hidden.
+
+        Args:
+        ----
+            elapsed (float): Seconds since the program or trigger started
+        """
+        level = self.level(elapsed)
+        if level <= 0:
+            return None
+        colors, alpha = self.shape(elapsed - self.delay)
+        return colors, self.mask * alpha * np.float32(level)
+
+
+class SolidLayer(ProgramLayer):
+    """Layer with one color."""
+
+    def __init__(self, spec: dict, *args: object, **kwargs: object) -> None:
+        """Compile a solid layer, see `ProgramLayer`."""
+        super().__init__(spec, *args, **kwargs)
+        self.colors = np.broadcast_to(parse_color(spec["color"]), (self.count, 3))
+
+    def shape(self, local: float) -> tuple[np.ndarray, float]:  # noqa: ARG002
+        """Return the color of the layer."""
+        return self.colors, 1.0
+
+
+class PulseLayer(SolidLayer):
+    """Layer with one color that breathes in and out."""
+
+    def __init__(self, spec: dict, *args: object, **kwargs: object) -> None:
+        """Compile a pulse layer, see `ProgramLayer`."""
+        super().__init__(spec, *args, **kwargs)
+        self.period = _number(spec, "period", 1, positive=True)
+        self.floor = _number(spec, "min", 0, 0)
+
+    def shape(self, local: float) -> tuple[np.ndarray, float]:
+        """Return the color of the layer at the brightness of the pulse."""
+        wave = 0.5 - 0.5 * np.cos(2 * np.pi * local / self.period)
+        return self.colors, self.floor + (1 - self.floor) * wave
+
+
+class GradientLayer(ProgramLayer):
+    """Layer with a color gradient over the zone, optionally scrolling."""
+
+    def __init__(self, spec: dict, *args: object, **kwargs: object) -> None:
+        """Compile a gradient layer, see `ProgramLayer`."""
+        super().__init__(spec, *args, **kwargs)
+        stops = np.stack([parse_color(color) for color in spec["colors"]])
+        self.width = max(int(_number(spec, "width", self.end - self.start)), 1)
+        self.speed = _number(spec, "speed", 0)
+        # One color per pixel of the gradient, interpolated between the stops
+        positions = np.linspace(0, len(stops) - 1, self.width)
+        self.palette = np.stack(
+            [
+                np.interp(positions, np.arange(len(stops)), stops[:, i])
+                for i in range(3)
+            ],
+            axis=-1,
+        ).astype(np.float32)
+        self.offsets = self.pixels - self.start
+        self._static = self.palette[self.offsets.astype(np.int64) % self.width]
+
+    def shape(self, local: float) -> tuple[np.ndarray, float]:
+        """Return the gradient, moved `speed` pixels per second."""
+        if not self.speed:
+            return self._static, 1.0
+        position = (self.offsets - local * self.speed) % self.width
+        index = position.astype(np.int64)
+        fraction = (position - index)[:, None]
+        after = self.palette[(index + 1) % self.width]
+        return self.palette[index] * (1 - fraction) + after * fraction, 1.0
+
+
+class SegmentLayer(SolidLayer):
+    """Layer with a segment that moves between two positions."""
+
+    def __init__(self, spec: dict, *args: object, **kwargs: object) -> None:
+        """Compile a segment layer, see `ProgramLayer`."""
+        super().__init__(spec, *args, **kwargs)
+        self.length = _number(spec, "length", 5, 0)
+        self.source = self.origin + _number(spec, "from", 0)
+        self.target = self.origin + _number(spec, "to", self.count - 1)
+        self.travel = _number(spec, "travel", self.duration or 1, positive=True)
+        self.repeat = _enum(MotionRepeat, spec.get("repeat", "none"), "repeat")
+        self.motion = EASINGS[_enum(Easing, spec.get("motion", "linear"), "motion")]
+
+    def position(self, local: float) -> float:
+        """Return the center of the segment.
+
+        Args:
+        ----
+            local (float): Seconds since the layer started
+        """
+        progress = local / self.travel
+        match self.repeat:
+            case MotionRepeat.LOOP:
+                progress %= 1
+            case MotionRepeat.BOUNCE:
+                progress = 1 - abs(progress % 2 - 1)
+            case _:
+                progress = min(progress, 1.0)
+        return self.source + (self.target - self.source) * self.motion(progress)
+
+    def shape(self, local: float) -> tuple[np.ndarray, np.ndarray]:
+        """Return the anti-aliased segment at its current position."""
+        distance = np.abs(self.pixels - np.float32(self.position(local)))
+        return self.colors, np.clip(self.length / 2 + 0.5 - distance, 0, 1)
+
+
+LAYER_TYPES: Final[dict[str, type[ProgramLayer]]] = {
+    "solid": SolidLayer,
+    "pulse": PulseLayer,
+    "gradient": GradientLayer,
+    "segment": SegmentLayer,
+}
+
+
+def compile_layer(
+    spec: dict,
+    count: int,
+    geometry: StairGeometry | None = None,
+    origin: int = 0,
+    sensor_id: int | None = None,
+) -> ProgramLayer:
+    """Compile the description of one layer.
+
+    Args:
+    ----
+        spec (dict): Description of the layer
+        count (int): Number of LED pixels
+        geometry (StairGeometry): Layout of the steps and sensors
+        origin (int): LED that positions in the layer are relative to
+        sensor_id (int): Sensor that started the layer, for triggers
+
+    Returns:
+    -------
+        ProgramLayer: The compiled layer
+
+    Raises:
+    ------
+        ValueError: If the description is invalid
+    """
+    if not isinstance(spec, dict):
+        msg = f"Invalid layer {spec!r} in effect program, use a JSON object"
+        raise ValueError(msg)  # noqa: TRY004
+    layer_type = LAYER_TYPES.get(spec.get("type"))
+    if layer_type is None:
+        msg = (
+            f"Invalid layer type {spec.get('type')!r} in effect program, "
+            f"use one of: {', '.join(LAYER_TYPES)}"
+        )
+        raise ValueError(msg)
+    try:
+        return layer_type(spec, count, geometry, origin, sensor_id)
+    except KeyError as error:
+        msg = f"Missing {error} in {spec['type']} layer of effect program"
+        raise ValueError(msg) from None
+    except (AttributeError, TypeError) as error:
+        msg = f"Invalid {spec['type']} layer of effect program: {error}"
+        raise ValueError(msg) from None
+
+
+class EffectProgram(Effect):
+    """Effect compiled from a declarative description.
+
+    The triggered layers are compiled for every sensor up front, a trigger
+    only records when it happened. Like the Meeloper, the running triggers
+    are replaced with one assignment, so the render thread needs no lock.
+    """
+
+    def __init__(
+        self,
+        spec: dict,
+        count: int,
+        geometry: StairGeometry | None = None,
+    ) -> None:
+        """Compile an effect program.
+
+        Args:
+        ----
+            spec (dict): Description of the program, see the module docstring
+            count (int): Number of LED pixels
+            geometry (StairGeometry): Layout of the steps and sensors
+
+        Raises:
+        ------
+            ValueError: If the description is invalid
+        """
+        if not isinstance(spec, dict) or not all(
+            isinstance(spec.get(key, []), list) for key in ("layers", "triggers")
+        ):
+            msg = "An effect program must be a JSON object with lists of layers and triggers"
+            raise ValueError(msg)
+        self.spec = spec
+        self.count = count
+        self.name = spec.get("name", "program")
+        self.duration = _number(spec, "duration", positive=True)
+        self.blend = _enum(BlendMode, spec.get("blend", "over"), "blend")
+        self.layers = [
+            compile_layer(layer, count, geometry) for layer in spec.get("layers", [])
+        ]
+
+        self.triggers: dict[int, list[ProgramLayer]] = {}
+        sensors = geometry.sensor_positions if geometry is not None else {}
+        for trigger in spec.get("triggers", []):
+            if not isinstance(trigger, dict):
+                msg = f"Invalid trigger {trigger!r} in effect program"
+                raise ValueError(msg)  # noqa: TRY004
+            sensor_ids = (
+                list(sensors)
+                if trigger.get("sensor", "any") == "any"
+                else [trigger["sensor"]]
+            )
+            for sensor_id in sensor_ids:
+                if not isinstance(sensor_id, int) or sensor_id not in sensors:
+                    msg = f"Unknown sensor {sensor_id} in effect program trigger"
+                    raise ValueError(msg)
+                layers = [
+                    compile_layer(layer, count, geometry, sensors[sensor_id], sensor_id)
+                    for layer in trigger.get("layers", [])
+                ]
+                if any(layer.ends_at is None for layer in layers):
+                    msg = "Every layer of an effect program trigger needs a duration"
+                    raise ValueError(msg)
+                self.triggers.setdefault(sensor_id, []).extend(layers)
+
+        # Start time, end time and layers of every running trigger
+        self._running: tuple[tuple[float, float, list[ProgramLayer]], ...] = ()
+
+    def trigger(self, sensor_id: int, elapsed: float) -> bool:
+        """Start the layers bound to a sensor.
+
+        Args:
+        ----
+            sensor_id (int): Sensor that fired
+            elapsed (float): Seconds since the program started
+
+        Returns:
+        -------
+            bool: True if the program reacts to the sensor
+        """
+        layers = self.triggers.get(sensor_id)
+        if not layers:
+            return False
+        ends_at = elapsed + max(layer.ends_at for layer in layers)
+        running = tuple(item for item in self._running if item[1] > elapsed)
+        self._running = (*running[-(MAX_TRIGGERS - 1) :], (elapsed, ends_at, layers))
+        return True
+
+    def render(self, elapsed: float, count: int) -> tuple[np.ndarray, np.ndarray]:
+        """Blend all layers of the program, later layers on top."""
+        # Premultiplied colors, so stacking layers is a multiply and an add
+        colors = np.zeros((count, 3), dtype=np.float32)
+        alpha = np.zeros(count, dtype=np.float32)
+        evaluations = [(layer, elapsed) for layer in self.layers] + [
+            (layer, elapsed - started)
+            for started, ends_at, layers in self._running
+            if ends_at > elapsed
+            for layer in layers
+        ]
+        for layer, local in evaluations:
+            result = layer.evaluate(local)
+            if result is None:
+                continue
+            layer_colors, layer_alpha = result
+            colors *= (1 - layer_alpha)[:, None]
+            colors += layer_colors * layer_alpha[:, None]
+            alpha *= 1 - layer_alpha
+            alpha += layer_alpha
+
+        colors /= np.maximum(alpha, 1e-6)[:, None]
+        rgb = np.clip(np.rint(colors), 0, 255).astype(np.uint32)
+        return pack_rgb(rgb[:, 0], rgb[:, 1], rgb[:, 2]), alpha
@@ -0,0 +1,209 @@
+"""Binary LED animation files.
+
+An animation file starts with a fixed header followed by the raw frames:
+
+    magic      4 bytes   b"STAN"
+    version    uint16
+    count      uint32    number of LED pixels per frame
+    fps        uint16    frames per second
+    frames     uint32    number of frames
+
+All numbers are little endian. Every frame is `count` packed 0xRRGGBB
+values stored as little endian uint32, the same layout as the frame buffer,
+so a memory-mapped file can be played back without decoding or copying.
+"""
+from __future__ import annotations
+
+import mmap
+import struct
+from contextlib import suppress
+from pathlib import Path
+from typing import TYPE_CHECKING, Final
+
+import numpy as np
+
+from app.led_compositor import Compositor
+
+if TYPE_CHECKING:
+    from typing import Self
+
+    from app.led_effects import Effect
+
+MAGIC: Final = b"STAN"
+VERSION: Final = 1
+HEADER: Final = struct.Struct("<4sHIHI")
+FILE_DTYPE: Final = np.dtype("<u4")
+
+
+class AnimationFile:
+    """Memory-mapped animation file."""
+
+    def __init__(self, path: str | Path) -> None:
+        """Open and memory-map an animation file.
+
+        Args:
+        ----
+            path (str): Path of the animation file
+
+        Raises:
+        ------
+            ValueError: If the file is not a valid animation file
+        """
+        self.path = Path(path)
+        with self.path.open("rb") as file:
+            header = file.read(HEADER.size)
+            if len(header) < HEADER.size:
+                msg = f"Not an LED animation file: {self.path}"
+                raise ValueError(msg)
+            magic, version, self.count, self.fps, frames = HEADER.unpack(header)
+            if magic != MAGIC or version != VERSION:
+                msg = f"Not an LED animation file: {self.path}"
+                raise ValueError(msg)
+            if self.fps <= 0:
+                msg = f"LED animation file has no frame rate: {self.path}"
+                raise ValueError(msg)
+            if self.path.stat().st_size < HEADER.size + frames * self.count * 4:
+                msg = f"LED animation file is truncated: {self.path}"
+                raise ValueError(msg)
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        self.frames = np.frombuffer(
+            self._mmap,
+            dtype=FILE_DTYPE,
+            count=frames * self.count,
+            offset=HEADER.size,
+        ).reshape(frames, self.count)
+
+    def __len__(self) -> int:
+        """Return the number of frames."""
+        return len(self.frames)
+
+    def __enter__(self) -> Self:
+        """Return the open file."""
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        """Close the file."""
+        self.close()
+
+    @property
+    def duration(self) -> float:
+        """Return the playback time in seconds."""
+        return len(self.frames) / self.fps
+
+    def frame(self, index: int) -> np.ndarray:
+        """Return one frame without copying it out of the file.
+
+        Args:
+        ----
+            index (int): Index of the frame
+
+        Returns:
+        -------
+            np.ndarray: Packed frame
+        """
+        return self.frames[index]
+
+    def close(self) -> None:
+        """Unmap the file."""
+        # Release our view first, the mmap cannot close while it is exported
+        self.frames = self.frames[:0].copy()
+        # If a caller still holds a frame, the map is released along with it
+        with suppress(BufferError):
+            self._mmap.close()
+
+
+class AnimationRecorder:
+    """Write frames to an animation file."""
+
+    def __init__(self, path: str | Path, count: int, fps: int) -> None:
+        """Create the animation file.
+
+        Args:
+        ----
+            path (str): Path of the animation file
+            count (int): Number of LED pixels per frame
+            fps (int): Frames per second of the recording
+        """
+        self.path = Path(path)
+        self.count = count
+        self.fps = fps
+        self.frames_recorded: int = 0
+        self._file = self.path.open("wb")
+        self._file.write(HEADER.pack(MAGIC, VERSION, count, fps, 0))
+
+    def __enter__(self) -> Self:
+        """Return the recorder."""
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        """Finish the file."""
+        self.close()
+
+    @property
+    def closed(self) -> bool:
+        """Return True if the recording is finished."""
+        return self._file.closed
+
+    def write(self, frame: np.ndarray) -> None:
+        """Append one frame.
+
+        Args:
+        ----
+            frame (np.ndarray): One packed color per LED pixel
+        """
+        self._file.write(np.asarray(frame[: self.count], dtype=FILE_DTYPE).tobytes())
+        self.frames_recorded += 1
+
+    def close(self) -> None:
+        """Write the number of frames into the header and close the file."""
+        if self._file.closed:
+            return
+        self._file.seek(0)
+        self._file.write(
+            HEADER.pack(MAGIC, VERSION, self.count, self.fps, self.frames_recorded),
+        )
+        self._file.close()
+
+
+def record_effect(
+    effect: Effect,
+    path: str | Path,
+    count: int,
+    fps: int,
+    duration: float | None = None,
+) -> int:
+    """Render an effect offline into an animation file.
+
+    The effect is rendered frame by frame on a black background without
+    waiting in between, so long shows are recorded much faster than they
+    play.
+
+    Args:
+    ----
+        effect (Effect): The effect to record
+        path (str): Path of the animation file
+        count (int): Number of LED pixels
+        fps (int): Frames per second of the recording
+        duration (float): Seconds to record, defaults to the effect duration
+
+    Returns:
+    -------
+        int: Number of recorded frames
+
+    Raises:
+    ------
+        ValueError: If neither the effect nor the call sets a duration
+    """
+    duration = effect.duration if duration is None else duration
+    if duration is None:
+        msg = f"Effect {effect.name} has no duration to record"
+        raise ValueError(msg)
+
+    compositor = Compositor(count)
+    compositor.add(effect, now=0, ttl=duration)
+    base = np.zeros(count, dtype=FILE_DTYPE)
+    with AnimationRecorder(path, count, fps) as recorder:
+        for index in range(round(duration * fps)):
+            recorder.write(compositor.compose(base, index / fps))
+    return recorder.frames_recorded
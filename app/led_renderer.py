@@ -0,0 +1,329 @@
+"""LED render engine module."""
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from app.const import BlendMode
+from app.led_clock import Clock
+from app.led_compositor import Compositor, Layer
+from app.led_effects import FRAME_DTYPE
+from app.led_flight_recorder import FlightRecorder
+from app.led_profiler import RenderProfiler
+from app.led_recording import AnimationRecorder
+
+if TYPE_CHECKING:
+    from rpi_ws281x import Color
+
+    from app.led_backends import LEDBackend
+    from app.led_effects import Effect
+
+
+class LEDRenderer:
+    """Render engine that owns the LED output backend.
+
+    Effects never talk to the strip directly, they write into the in-memory
+    frame buffer or run as a compositor layer on top of it. A single render
+    thread blends both and commits the result to the backend with one write
+    per frame at a fixed frame rate.
+
+    Frames that did not change are not written again. When no layer is
+    active and the frame buffer is not touched, the render thread sleeps
+    until the next change instead of ticking at the target frame rate.
+    While a recording runs every tick is recorded, changed or not, so the
+    recording plays back at the frame rate of the renderer.
+
+    Every committed frame is also kept in a small flight recorder, together
+    with the name of the animation that wrote the frame buffer and the
+    active layers, so the last seconds on the stair can be dumped later.
+    The time every effect and every backend write takes is kept in
+    `profiler`.
+    """
+
+    def __init__(
+        self,
+        backend: LEDBackend,
+        count: int,
+        fps: int = 60,
+        clock: Clock | None = None,
+    ) -> None:
+        """Initialize the render engine.
+
+        Args:
+        ----
+            backend (LEDBackend): The initialized LED output backend
+            count (int): Number of LED pixels in the frame buffer
+            fps (int): Number of frames committed to the backend per second
+            clock (Clock): Clock that times the frames, defaults to real time
+        """
+        self.backend = backend
+        self.count = count
+        self.fps = fps
+        self.clock = clock or Clock()
+        self.frame = np.zeros(count, dtype=FRAME_DTYPE)
+        self.compositor = Compositor(count)
+        self.profiler = RenderProfiler(self.frame_interval)
+        self.compositor.profiler = self.profiler
+        self.frames_committed: int = 0
+        self.frames_skipped: int = 0
+        self.flight_recorder = FlightRecorder(count)
+        self.compositor.flight_recorder = self.flight_recorder
+        # Name of whatever wrote the frame buffer last
+        self.frame_source = "frame"
+
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._wake_event = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._dirty = True
+        self._last_frame: np.ndarray | None = None
+        self._recorder: AnimationRecorder | None = None
+        self._recorder_lock = threading.Lock()
+        self._commit_times: deque[float] = deque(maxlen=max(fps, 1) * 2)
+
+    @property
+    def frame_interval(self) -> float:
+        """Return the time between two frames in seconds."""
+        return 1.0 / self.fps
+
+    @property
+    def is_running(self) -> bool:
+        """Return True if the render thread is running."""
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def is_idle(self) -> bool:
+        """Return True if there is nothing to render until the next change."""
+        return (
+            not self._dirty and not self.compositor.is_active and self._recorder is None
+        )
+
+    @property
+    def current_fps(self) -> int:
+        """Return the number of frames written during the last second."""
+        since = self.clock.now() - 1.0
+        return sum(1 for committed_at in self._commit_times if committed_at > since)
+
+    @property
+    def stats(self) -> dict[str, int | bool]:
+        """Return the frame rate and frame counters of the renderer."""
+        return {
+            "fps": self.current_fps,
+            "target_fps": self.fps,
+            "frames_committed": self.frames_committed,
+            "frames_skipped": self.frames_skipped,
+            "idle": self.is_idle,
+        }
+
+    def _mark_dirty(self) -> None:
+        """Flag the frame buffer as changed and wake up the render thread."""
+        self._dirty = True
+        self._wake_event.set()
+
+    def set_pixel(self, index: int, color: Color) -> None:
+        """Set the color of one pixel in the frame buffer.
+
+        Args:
+        ----
+            index (int): LED number
+            color (Color): Color object with RGB values
+        """
+        if 0 <= index < self.count:
+            with self._lock:
+                self.frame[index] = color
+            self._mark_dirty()
+
+    def fill(
+        self,
+        color: Color,
+        start: int = 0,
+        end: int | None = None,
+        source: str = "frame",
+    ) -> None:
+        """Fill a range of the frame buffer with one color.
+
+        Args:
+        ----
+            color (Color): Color object with RGB values
+            start (int): start LED number
+            end (int): end LED number (exclusive), defaults to the strip length
+            source (str): Name of the animation, for the flight recorder
+        """
+        with self._lock:
+            self.frame[max(start, 0) : end] = color
+            self.frame_source = source
+        self._mark_dirty()
+
+    def paint(self, mask: np.ndarray, color: Color) -> None:
+        """Set every pixel selected by a mask to one color.
+
+        Args:
+        ----
+            mask (np.ndarray): Boolean mask with one entry per pixel
+            color (Color): Color object with RGB values
+        """
+        with self._lock:
+            self.frame[mask] = color
+        self._mark_dirty()
+
+    def set_frame(self, frame: np.ndarray, source: str = "frame") -> None:
+        """Replace the complete frame buffer.
+
+        Args:
+        ----
+            frame (np.ndarray): One packed color per LED pixel
+            source (str): Name of the animation, for the flight recorder
+        """
+        with self._lock:
+            self.frame[:] = frame[: self.count]
+            self.frame_source = source
+        self._mark_dirty()
+
+    def add_layer(
+        self,
+        effect: Effect,
+        blend: BlendMode = BlendMode.OVER,
+        opacity: float = 1.0,
+        ttl: float | None = None,
+    ) -> Layer:
+        """Start an effect as a new layer on top of the frame buffer.
+
+        Args:
+        ----
+            effect (Effect): The effect to render
+            blend (BlendMode): How the layer is blended onto the layers below
+            opacity (float): Opacity of the whole layer (0.0-1.0)
+            ttl (float): Seconds until the layer expires
+
+        Returns:
+        -------
+            Layer: The new layer
+        """
+        layer = self.compositor.add(effect, self.clock.now(), blend, opacity, ttl)
+        self._wake_event.set()
+        return layer
+
+    def commit(self) -> bool:
+        """Push the merged frame to the backend in a single write.
+
+        Returns
+        -------
+            bool: True if the frame was written, False if it did not change
+        """
+        started = time.perf_counter()
+        with self._lock:
+            frame = self.frame.copy()
+            source = self.frame_source
+            self._dirty = False
+        layers = [layer.name for layer in self.compositor.layers]
+        frame = self.compositor.compose(frame, self.clock.now())
+        with self._recorder_lock:
+            if self._recorder is not None:
+                self._recorder.write(frame)
+        if self._last_frame is not None and np.array_equal(frame, self._last_frame):
+            self.frames_skipped += 1
+            return False
+
+        write_started = time.perf_counter()
+        self.backend.write(frame)
+        self.profiler.commit.record(time.perf_counter() - write_started)
+        self._last_frame = frame
+        self.flight_recorder.record(frame, time.time(), "+".join([source, *layers]))
+        self.frames_committed += 1
+        self._commit_times.append(self.clock.now())
+        self.profiler.frame.record(time.perf_counter() - started)
+        return True
+
+    def start_recording(self, path: str) -> AnimationRecorder:
+        """Record every frame into an animation file until stopped.
+
+        Args:
+        ----
+            path (str): Path of the animation file
+
+        Returns:
+        -------
+            AnimationRecorder: The running recorder
+        """
+        recorder = AnimationRecorder(path, self.count, self.fps)
+        with self._recorder_lock:
+            previous, self._recorder = self._recorder, recorder
+        if previous is not None:
+            previous.close()
+        self._wake_event.set()
+        return recorder
+
+    def stop_recording(self) -> int:
+        """Stop the recording and finish the animation file.
+
+        Returns
+        -------
+            int: Number of recorded frames
+        """
+        with self._recorder_lock:
+            recorder, self._recorder = self._recorder, None
+        if recorder is None:
+            return 0
+        recorder.close()
+        return recorder.frames_recorded
+
+    def start(self) -> None:
+        """Start the render thread."""
+        if self.is_running:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run,
+            name="led-renderer",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float | None = 1.0) -> None:
+        """Stop the render thread after committing the last frame.
+
+        Args:
+        ----
+            timeout (float): Seconds to wait for the render thread to finish
+        """
+        self._stop_event.set()
+        self._wake_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self) -> None:
+        """Commit frames at a fixed rate until the renderer is stopped."""
+        next_tick = self.clock.now()
+        while True:
+            try:
+                self.commit()
+            except Exception as error:  # noqa: BLE001
+                # Failing effects are removed by the compositor, this keeps
+                # the thread alive when the backend fails
+                print(f"Error rendering LED frame: {error!s}")
+                self.flight_recorder.record_event(time.time(), str(error))
+            if self._stop_event.is_set():
+                break
+
+            # Nothing is animating, sleep until the frame buffer or the
+            # compositor changes. The event is cleared before the check, so a
+            # change made in between still wakes us up.
+            self._wake_event.clear()
+            if self.is_idle:
+                self._wake_event.wait()
+                next_tick = self.clock.now()
+                continue
+
+            # Schedule against the previous deadline so the rate does not drift,
+            # but resync instead of bursting frames when we fell behind.
+            next_tick += self.frame_interval
+            delay = next_tick - self.clock.now()
+            if delay < 0:
+                next_tick = self.clock.now()
+                delay = 0
+            self.clock.wait(self._stop_event, delay)
@@ -0,0 +1,176 @@
+"""Stored LED scenes compiled into frames once.
+
+A scene is a static look of the stair stored in the database:
+
+    {
+        "frame": ["#ff0000", "#00ff00", [0, 0, 255]],
+        "layers": [
+            {"type": "gradient", "colors": ["#ff4000", "#ffd000"],
+             "zone": {"steps": [1, 2, 3]}},
+            {"type": "solid", "color": "#0000ff", "zone": {"sensor": 2}}
+        ]
+    }
+
+The optional `frame` gives the color of the first pixels, the others are
+black. The `layers` are the layers of an effect program (see
+`app.led_programs`) stacked on top of the frame. A scene does not move, so
+the timing of the layers is ignored and they show their first frame.
+"""
+from __future__ import annotations
+
+import threading
+from typing import TYPE_CHECKING, Final
+
+import numpy as np
+
+from app.led_compositor import Compositor
+from app.led_effects import FRAME_DTYPE, pack_rgb
+from app.led_programs import EffectProgram, parse_color
+
+if TYPE_CHECKING:
+    from collections.abc import Hashable
+
+    from app.stair_geometry import StairGeometry
+
+# Layer keys that only matter for moving effects
+SCENE_IGNORED_KEYS: Final = frozenset({"delay", "duration", "fade_in", "fade_out"})
+
+
+def compile_scene(
+    spec: dict,
+    count: int,
+    geometry: StairGeometry | None = None,
+) -> np.ndarray:
+    """Compile a scene into one packed frame.
+
+    Args:
+    ----
+        spec (dict): Description of the scene, see the module docstring
+        count (int): Number of LED pixels
+        geometry (StairGeometry): Layout of the steps and sensors
+
+    Returns:
+    -------
+        np.ndarray: Read-only packed frame
+
+    Raises:
+    ------
+        ValueError: If the description is invalid
+    """
+    if not isinstance(spec, dict):
+        msg = "A scene must be a JSON object"
+        raise ValueError(msg)  # noqa: TRY004
+    pixels = spec.get("frame", [])
+    if not isinstance(pixels, list):
+        msg = "The frame of a scene must be a list of colors"
+        raise ValueError(msg)  # noqa: TRY004
+    if len(pixels) > count:
+        msg = f"Scene frame has {len(pixels)} pixels, the stair has {count}"
+        raise ValueError(msg)
+
+    frame = np.zeros(count, dtype=FRAME_DTYPE)
+    if pixels:
+        rgb = np.stack([parse_color(pixel) for pixel in pixels]).astype(np.uint32)
+        frame[: len(pixels)] = pack_rgb(rgb[:, 0], rgb[:, 1], rgb[:, 2])
+
+    layers = spec.get("layers", [])
+    if not isinstance(layers, list) or not all(
+        isinstance(layer, dict) for layer in layers
+    ):
+        msg = "The layers of a scene must be a list of JSON objects"
+        raise ValueError(msg)
+    layers = [
+        {key: value for key, value in layer.items() if key not in SCENE_IGNORED_KEYS}
+        for layer in layers
+    ]
+    if layers:
+        program = EffectProgram({"name": "scene", "layers": layers}, count, geometry)
+        compositor = Compositor(count)
+        compositor.add(program, 0.0)
+        frame = compositor.compose(frame, 0.0)
+
+    frame.setflags(write=False)
+    return frame
+
+
+class SceneCache:
+    """Compiled frames of the scenes that were shown before.
+
+    Scenes are keyed by their database id. Editing or deleting a scene
+    must invalidate it, the next activation compiles the new description.
+    Scenes compile outside of the lock. Every invalidation bumps the
+    generation of the scene and `clear` bumps all of them, so a compile
+    that overlapped one returns its frame without caching it.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the scene cache."""
+        self.counters: dict[str, int] = dict.fromkeys(("hits", "misses"), 0)
+        self._frames: dict[Hashable, np.ndarray] = {}
+        self._generations: dict[Hashable, int] = {}
+        self._cleared: int = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Return the number of compiled scenes."""
+        return len(self._frames)
+
+    def __contains__(self, key: Hashable) -> bool:
+        """Return True if the scene is compiled."""
+        return key in self._frames
+
+    def get_or_compile(
+        self,
+        key: Hashable,
+        spec: dict,
+        count: int,
+        geometry: StairGeometry | None = None,
+    ) -> np.ndarray:
+        """Return the compiled frame, compiling the scene on a miss.
+
+        Args:
+        ----
+            key (Hashable): Id of the scene
+            spec (dict): Description of the scene
+            count (int): Number of LED pixels
+            geometry (StairGeometry): Layout of the steps and sensors
+
+        Returns:
+        -------
+            np.ndarray: Read-only packed frame
+
+        Raises:
+        ------
+            ValueError: If the description is invalid
+        """
+        with self._lock:
+            frame = self._frames.get(key)
+            self.counters["misses" if frame is None else "hits"] += 1
+            generation = (self._cleared, self._generations.get(key, 0))
+        if frame is None:
+            frame = compile_scene(spec, count, geometry)
+            with self._lock:
+                if (self._cleared, self._generations.get(key, 0)) == generation:
+                    self._frames[key] = frame
+        return frame
+
+    def invalidate(self, key: Hashable) -> bool:
+        """Forget the compiled frame of a scene.
+
+        Args:
+        ----
+            key (Hashable): Id of the scene
+
+        Returns:
+        -------
+            bool: True if the scene was compiled
+        """
+        with self._lock:
+            self._generations[key] = self._generations.get(key, 0) + 1
+            return self._frames.pop(key, None) is not None
+
+    def clear(self) -> None:
+        """Forget all compiled frames."""
+        with self._lock:
+            self._cleared += 1
+            self._frames.clear()
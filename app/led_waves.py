@@ -0,0 +1,141 @@
+"""Wave simulation for the Waterdruppel ripples."""
+from __future__ import annotations
+
+import math
+import threading
+
+import numpy as np
+
+from app.led_effects import Effect, pack_rgb, unpack_rgb
+
+
+class RippleField(Effect):
+    """Damped 1D wave field in which every trigger drops a wave.
+
+    All drops share one amplitude field per color channel, so concurrent
+    waves superimpose and interfere. The field is advanced with a fixed time
+    step once per rendered frame, which costs O(pixels) no matter how many
+    drops are active. Once `is_finished` told the compositor that the waves
+    faded out, the field is retired until `rewind` starts a new layer.
+    """
+
+    name = "ripple_field"
+
+    def __init__(
+        self,
+        count: int,
+        speed: float = 40.0,
+        decay: float = 1.5,
+        width: float = 2.0,
+        interference: float = 0.5,
+        sim_rate: int = 120,
+    ) -> None:
+        """Initialize the wave field.
+
+        Args:
+        ----
+            count (int): Number of LED pixels
+            speed (float): Wave speed in pixels per second
+            decay (float): Amplitude decay rate per second
+            width (float): Width of a drop in pixels
+            interference (float): Depth of the troughs around a drop (0.0-1.0).
+                0 drops a plain bump, 1 a zero-mean wavelet whose troughs
+                cancel the crests of other waves where they meet
+            sim_rate (int): Simulation steps per second
+        """
+        self.count = count
+        self.speed = speed
+        self.decay = decay
+        self.width = width
+        self.interference = interference
+        self.step_seconds = 1.0 / max(sim_rate, math.ceil(speed))
+        self.courant = speed * self.step_seconds
+        self.damping = math.exp(-decay * self.step_seconds)
+        self.max_steps = math.ceil(0.1 / self.step_seconds)
+
+        self._field = np.zeros((3, count), dtype=np.float32)
+        self._previous = np.zeros((3, count), dtype=np.float32)
+        self._positions = np.arange(count, dtype=np.float32)
+        self._sim_time = 0.0
+        self._retired = False
+        self._lock = threading.Lock()
+
+    @property
+    def energy(self) -> float:
+        """Return the largest amplitude in the field."""
+        return float(max(np.abs(self._field).max(), np.abs(self._previous).max()))
+
+    def rewind(self) -> None:
+        """Restart the simulation clock for a new compositor layer."""
+        with self._lock:
+            self._sim_time = 0.0
+            self._retired = False
+
+    def add_drop(self, position: int, color: int, amplitude: float = 2.0) -> bool:
+        """Drop a new wave into the field.
+
+        The drop starts at rest and splits into two waves of half the
+        amplitude that travel in both directions.
+
+        Args:
+        ----
+            position (int): Pixel where the drop lands
+            color (int): Packed color of the wave
+            amplitude (float): Peak amplitude of the drop
+
+        Returns:
+        -------
+            bool: False if the field is retired and needs a new layer
+        """
+        distance = (self._positions - position) / self.width
+        shape = np.exp(-0.5 * distance**2) * (1 - self.interference * distance**2)
+        channels = unpack_rgb(np.array([color]))[0].astype(np.float32) / 255
+        drop = amplitude * channels[:, None] * shape[None, :]
+        with self._lock:
+            self._field += drop
+            self._previous += drop
+            return not self._retired
+
+    def step(self) -> None:
+        """Advance the field by one simulation step."""
+        field, previous, courant = self._field, self._previous, self.courant
+        laplacian = np.empty_like(field)
+        laplacian[:, 1:-1] = field[:, :-2] + field[:, 2:] - 2 * field[:, 1:-1]
+        laplacian[:, 0] = field[:, 1] - field[:, 0]
+        laplacian[:, -1] = field[:, -2] - field[:, -1]
+        following = (2 * field - previous + courant**2 * laplacian) * self.damping
+
+        # Absorb the waves at both ends of the strip instead of reflecting them
+        absorb = (courant - 1) / (courant + 1)
+        following[:, 0] = field[:, 1] + absorb * (following[:, 1] - field[:, 0])
+        following[:, -1] = field[:, -2] + absorb * (following[:, -2] - field[:, -1])
+
+        self._previous, self._field = field, following
+
+    def render(self, elapsed: float, count: int) -> tuple[np.ndarray, np.ndarray]:
+        """Advance the simulation to `elapsed` and render the wave crests."""
+        with self._lock:
+            steps = int((elapsed - self._sim_time) / self.step_seconds)
+            if steps > self.max_steps:
+                # Fell behind, skip ahead instead of simulating a backlog
+                self._sim_time = elapsed - self.max_steps * self.step_seconds
+                steps = self.max_steps
+            for _ in range(max(steps, 0)):
+                self.step()
+            self._sim_time += max(steps, 0) * self.step_seconds
+            crests = np.maximum(self._field[:, :count], 0)
+
+        # The strongest channel sets the alpha, the color keeps its hue even
+        # where the crests of several waves add up beyond full brightness
+        peak = crests.max(axis=0)
+        visible = peak >= 0.5 / 255
+        scale = np.divide(255, peak, out=np.zeros_like(peak), where=visible)
+        rgb = np.rint(crests * scale).astype(np.uint32)
+        alpha = np.where(visible, np.minimum(peak, 1), 0).astype(np.float32)
+        return pack_rgb(rgb[0], rgb[1], rgb[2]), alpha
+
+    def is_finished(self, elapsed: float) -> bool:  # noqa: ARG002
+        """Return True once all waves faded below one color step."""
+        with self._lock:
+            self._retired = self._retired or self.energy < 0.5 / 255
+            return self._retired
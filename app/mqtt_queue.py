@@ -0,0 +1,200 @@
+"""Queues that take the MQTT messages off the paho network thread."""
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from typing import TYPE_CHECKING
+
+from app.const import QueuePolicy
+from app.led_profiler import FrameTimer
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Hashable
+
+
+class MessageQueue:
+    """Bounded queue of parsed MQTT messages drained by one worker thread.
+
+    The paho callbacks only parse a message and put it here, so reading the
+    network never waits on the database, Socket.IO or the LEDs. One worker
+    keeps the messages in order. With `QueuePolicy.LATEST_WINS` a message
+    with the same key as a waiting one replaces it, so a chatty sensor only
+    ever has its newest status waiting.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        policy: QueuePolicy = QueuePolicy.DROP_OLDEST,
+        max_queue: int = 256,
+    ) -> None:
+        """Initialize the message queue.
+
+        Args:
+        ----
+            name (str): Name of the queue, for the worker thread and logs
+            policy (QueuePolicy): What to do with new messages when the queue
+                is full, or with the same key as a waiting message
+            max_queue (int): Maximum number of waiting messages
+        """
+        self.name = name
+        self.policy = policy
+        self.max_queue = max_queue
+        self.counters: dict[str, int] = dict.fromkeys(
+            ("queued", "coalesced", "dropped", "handled", "failed"),
+            0,
+        )
+        self.max_depth: int = 0
+        # Seconds between putting a message and its handler starting
+        self.lag = FrameTimer()
+
+        self._handler: Callable[[dict], None] | None = None
+        self._queue: deque[tuple[Hashable | None, float, dict]] = deque()
+        self._condition = threading.Condition()
+        self._thread: threading.Thread | None = None
+        self._busy = False
+        self._stop_event = threading.Event()
+        self._stop_event.set()
+
+    @property
+    def depth(self) -> int:
+        """Return the number of messages waiting for the worker."""
+        return len(self._queue)
+
+    @property
+    def stats(self) -> dict[str, int | dict]:
+        """Return the counters, the queue depth and the lag percentiles."""
+        with self._condition:
+            return {
+                **self.counters,
+                "depth": len(self._queue),
+                "max_depth": self.max_depth,
+                "lag": self.lag.stats(),
+            }
+
+    def start(
+        self,
+        handler: Callable[[dict], None],
+        max_queue: int | None = None,
+    ) -> None:
+        """Start the worker, stopping a previous one first.
+
+        Args:
+        ----
+            handler (Callable): Function that handles one message
+            max_queue (int): Maximum number of waiting messages
+        """
+        self.stop()
+        self._handler = handler
+        if max_queue is not None:
+            self.max_queue = max_queue
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(
+            target=self._worker,
+            args=(self._stop_event,),
+            name=self.name,
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float | None = 1.0) -> None:
+        """Stop the worker and drop the waiting messages.
+
+        Args:
+        ----
+            timeout (float): Seconds to wait for the running handler
+        """
+        with self._condition:
+            self._stop_event.set()
+            self._queue.clear()
+            self._condition.notify_all()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+        self._thread = None
+
+    def put(self, message: dict, key: Hashable | None = None) -> bool:
+        """Queue a message for the worker, never blocks.
+
+        Args:
+        ----
+            message (dict): The parsed message
+            key (Hashable): Coalescing key, for example the client ID
+
+        Returns:
+        -------
+            bool: True if the message was queued, False if it was dropped
+        """
+        item = (key, time.monotonic(), message)
+        with self._condition:
+            if self._stop_event.is_set():
+                self.counters["dropped"] += 1
+                return False
+
+            if self.policy == QueuePolicy.LATEST_WINS and key is not None:
+                for index, (waiting_key, _, _) in enumerate(self._queue):
+                    if waiting_key == key:
+                        self._queue[index] = item
+                        self.counters["coalesced"] += 1
+                        return True
+
+            if len(self._queue) >= self.max_queue:
+                self.counters["dropped"] += 1
+                if self.policy == QueuePolicy.DROP_NEWEST:
+                    return False
+                self._queue.popleft()
+
+            self._queue.append(item)
+            self.counters["queued"] += 1
+            self.max_depth = max(self.max_depth, len(self._queue))
+            self._condition.notify_all()
+        return True
+
+    def join(self, timeout: float = 5.0) -> bool:
+        """Wait until the queue is empty, for tests and shutdown.
+
+        Args:
+        ----
+            timeout (float): Seconds to wait at most
+
+        Returns:
+        -------
+            bool: True if all messages were handled in time
+        """
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while self._queue or self._busy:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+        return True
+
+    def _worker(self, stop_event: threading.Event) -> None:
+        """Handle queued messages until the queue stops.
+
+        Args:
+        ----
+            stop_event (threading.Event): Event that stops this worker
+        """
+        while True:
+            with self._condition:
+                self._busy = False
+                self._condition.notify_all()
+                while not self._queue and not stop_event.is_set():
+                    self._condition.wait()
+                if stop_event.is_set():
+                    return
+                _, queued_at, message = self._queue.popleft()
+                self._busy = True
+                self.lag.record(time.monotonic() - queued_at)
+
+            try:
+                self._handler(message)
+            except Exception as error:  # noqa: BLE001
+                print(f"MQTT {self.name} message failed: {error!s}")
+                with self._condition:
+                    self.counters["failed"] += 1
+            else:
+                with self._condition:
+                    self.counters["handled"] += 1
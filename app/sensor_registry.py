@@ -0,0 +1,115 @@
+"""In-memory registry of the sensors stored in the database."""
+from __future__ import annotations
+
+import threading
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from app.blueprints.backend.models import Sensor
+
+
+def parse_client_id(client_id: str | int) -> int | None:
+    """Return the numeric client ID of a sensor.
+
+    Args:
+    ----
+        client_id (str | int): "sensor-3", "3" or 3
+
+    Returns:
+    -------
+        int: The number of the sensor, None if it is not a sensor ID
+    """
+    try:
+        return int(str(client_id).removeprefix("sensor-"))
+    except ValueError:
+        return None
+
+
+class SensorRegistry:
+    """The sensors in the database, by numeric client ID.
+
+    Triggers are checked against this registry instead of the database. It
+    is loaded when the app starts and the routes that add or delete sensors
+    keep it up to date. Lookups read one dict without locking, changes
+    replace the whole dict, so a reader never sees a half updated registry.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty registry."""
+        self._sensors: dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Return the number of registered sensors."""
+        return len(self._sensors)
+
+    def __contains__(self, client_id: str | int) -> bool:
+        """Return True if the sensor is in the database."""
+        return parse_client_id(client_id) in self._sensors
+
+    def get(self, client_id: str | int) -> int | None:
+        """Return the database id of a sensor.
+
+        Args:
+        ----
+            client_id (str | int): Client ID of the sensor
+
+        Returns:
+        -------
+            int: The primary key of the sensor, None if it is unknown
+        """
+        return self._sensors.get(parse_client_id(client_id))
+
+    def load(self, sensors: Iterable[Sensor]) -> None:
+        """Replace the registry with the sensors of the database.
+
+        Args:
+        ----
+            sensors (Iterable[Sensor]): All sensors
+        """
+        registry = {}
+        for sensor in sensors:
+            client_id = parse_client_id(sensor.client_id)
+            if client_id is not None:
+                registry[client_id] = sensor.id
+        with self._lock:
+            self._sensors = registry
+
+    def add(self, client_id: str | int, sensor_id: int) -> None:
+        """Register a sensor that was added to the database.
+
+        Args:
+        ----
+            client_id (str | int): Client ID of the sensor
+            sensor_id (int): Primary key of the sensor
+        """
+        key = parse_client_id(client_id)
+        if key is None:
+            return
+        with self._lock:
+            self._sensors = {**self._sensors, key: sensor_id}
+
+    def remove(self, client_id: str | int) -> bool:
+        """Forget a sensor that was deleted from the database.
+
+        Args:
+        ----
+            client_id (str | int): Client ID of the sensor
+
+        Returns:
+        -------
+            bool: True if the sensor was registered
+        """
+        key = parse_client_id(client_id)
+        with self._lock:
+            if key not in self._sensors:
+                return False
+            self._sensors = {k: v for k, v in self._sensors.items() if k != key}
+        return True
+
+    def clear(self) -> None:
+        """Forget all sensors."""
+        with self._lock:
+            self._sensors = {}
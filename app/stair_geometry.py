@@ -0,0 +1,173 @@
+"""Geometry of the stair: which LEDs belong to which step and sensor."""
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import numpy as np
+
+
+class StairGeometry:
+    """Stair layout compiled into index arrays and masks.
+
+    Steps are numbered from the top of the stair, which is the end of the
+    LED strip. Step `n` covers `step_length` LEDs that end `(n - 1) *
+    step_length` LEDs before the last LED, the bottom step is cut off at
+    the first LED. Every sensor sits on a step, at one LED, and has a small
+    zone of LEDs that shows its state.
+
+    All lookups are done on arrays compiled once, so effects and counters
+    address a step or sensor in constant time and get ready-made masks.
+    """
+
+    def __init__(
+        self,
+        led_count: int,
+        step_count: int,
+        step_length: int,
+        sensors: dict[int, dict],
+    ) -> None:
+        """Compile the stair geometry.
+
+        Args:
+        ----
+            led_count (int): Number of LED pixels on the stair
+            step_count (int): Number of steps
+            step_length (int): Number of LEDs per step
+            sensors (dict): Sensor ID mapped to the `led` it sits at, its
+                `step` and the `[start, end)` LED `zone` that shows its state
+
+        Raises:
+        ------
+            ValueError: If a step or sensor lies outside of the LED strip
+        """
+        if step_count * step_length < led_count:
+            msg = f"{step_count} steps of {step_length} LEDs leave LEDs unused"
+            raise ValueError(msg)
+        if (step_count - 1) * step_length >= led_count:
+            msg = f"{step_count} steps of {step_length} LEDs exceed the LED strip"
+            raise ValueError(msg)
+        self.led_count = led_count
+        self.step_count = step_count
+        self.step_length = step_length
+
+        ends = led_count - np.arange(step_count) * step_length
+        starts = np.maximum(ends - step_length, 0)
+        # Row n holds step n, row 0 is unused so steps index directly
+        self.step_spans = np.zeros((step_count + 1, 2), dtype=np.int32)
+        self.step_spans[1:, 0] = starts
+        self.step_spans[1:, 1] = ends
+
+        pixels = np.arange(led_count)
+        self.led_steps = ((led_count - 1 - pixels) // step_length + 1).astype(np.int32)
+        self.led_steps.setflags(write=False)
+        self.step_masks = (pixels >= self.step_spans[:, :1]) & (
+            pixels < self.step_spans[:, 1:]
+        )
+        self.step_masks.setflags(write=False)
+
+        self.sensor_positions: dict[int, int] = {}
+        self.sensor_steps: dict[int, int] = {}
+        self.sensor_zones: dict[int, tuple[int, int]] = {}
+        self.sensor_masks: dict[int, np.ndarray] = {}
+        for sensor_id, sensor in sensors.items():
+            led, step = sensor["led"], sensor["step"]
+            start, end = sensor.get("zone", (led, led + 1))
+            if not 0 <= led < led_count or not 0 <= start < end <= led_count:
+                msg = f"Sensor {sensor_id} lies outside of the LED strip"
+                raise ValueError(msg)
+            if not 1 <= step <= step_count:
+                msg = f"Sensor {sensor_id} is on step {step} of {step_count}"
+                raise ValueError(msg)
+            self.sensor_positions[int(sensor_id)] = led
+            self.sensor_steps[int(sensor_id)] = step
+            self.sensor_zones[int(sensor_id)] = (start, end)
+            mask = (pixels >= start) & (pixels < end)
+            mask.setflags(write=False)
+            self.sensor_masks[int(sensor_id)] = mask
+
+    @classmethod
+    def from_dict(cls: type[StairGeometry], data: dict) -> StairGeometry:
+        """Create the geometry from a dictionary, for example parsed JSON.
+
+        Args:
+        ----
+            data (dict): Dictionary with `led_count`, `step_count`,
+                `step_length` and `sensors`
+
+        Returns:
+        -------
+            StairGeometry: The compiled geometry
+        """
+        return cls(
+            data["led_count"],
+            data["step_count"],
+            data["step_length"],
+            {int(sensor_id): sensor for sensor_id, sensor in data["sensors"].items()},
+        )
+
+    @classmethod
+    def load(cls: type[StairGeometry], path: str | Path) -> StairGeometry:
+        """Load the geometry from a JSON file.
+
+        Args:
+        ----
+            path (str): Path of the JSON file
+
+        Returns:
+        -------
+            StairGeometry: The compiled geometry
+        """
+        return cls.from_dict(json.loads(Path(path).read_text(encoding="utf-8")))
+
+    def sensor_position(self, sensor_id: int) -> int | None:
+        """Return the LED a sensor sits at, or None for an unknown sensor."""
+        return self.sensor_positions.get(sensor_id)
+
+    def sensor_step(self, sensor_id: int) -> int | None:
+        """Return the step a sensor sits on, or None for an unknown sensor."""
+        return self.sensor_steps.get(sensor_id)
+
+    def sensor_zone(self, sensor_id: int) -> tuple[int, int] | None:
+        """Return the `[start, end)` LEDs of a sensor zone, or None if unknown."""
+        return self.sensor_zones.get(sensor_id)
+
+    def sensor_mask(self, sensor_id: int) -> np.ndarray | None:
+        """Return the read-only mask of a sensor zone, or None if unknown."""
+        return self.sensor_masks.get(sensor_id)
+
+    def step_span(self, step: int) -> tuple[int, int]:
+        """Return the `[start, end)` LEDs of a step.
+
+        Args:
+        ----
+            step (int): Step number, 1 is the top step
+
+        Raises:
+        ------
+            IndexError: If the stair has no such step
+        """
+        if not 1 <= step <= self.step_count:
+            msg = f"Step {step} does not exist"
+            raise IndexError(msg)
+        start, end = self.step_spans[step]
+        return int(start), int(end)
+
+    def step_mask(self, step: int) -> np.ndarray:
+        """Return the read-only mask of the LEDs of a step.
+
+        Args:
+        ----
+            step (int): Step number, 1 is the top step
+        """
+        self.step_span(step)
+        return self.step_masks[step]
+
+    def led_step(self, index: int) -> int:
+        """Return the step an LED belongs to.
+
+        Args:
+        ----
+            index (int): LED number
+        """
+        return int(self.led_steps[index])
@@ -1,4 +1,5 @@
 """Flask App configuration."""
+import json
 from os import environ
 from pathlib import Path
 
@@ -22,6 +23,49 @@ class Config:
     # MQTT
     MQTT_BROKER_PORT = int(environ.get("MQTT_BROKER_PORT"))
     MQTT_KEEPALIVE = int(environ.get("MQTT_KEEPALIVE"))
+    # Messages waiting per MQTT worker (triggers and statuses) before the
+    # oldest are dropped
+    MQTT_QUEUE_SIZE = int(environ.get("MQTT_QUEUE_SIZE", "256"))
+
+    # LED output: "ws281x", "multi", "virtual" or "file" (raw RGB frames to
+    # LED_SINK_PATH). The "multi" backend splits the stair over the channels in
+    # LED_CHANNELS, a JSON list like [{"count": 52, "pin": 18, "dma": 10,
+    # "channel": 0}, {"count": 52, "pin": 10, "dma": 11, "channel": 0}]. Every
+    # channel needs its own output: PWM (pin 12, 13, 18 or 19), PCM (pin 21)
+    # or SPI (pin 10). PWM and PCM are sent in the background, SPI blocks
+    # until the frame is sent
+    LED_BACKEND = environ.get("LED_BACKEND", "ws281x")
+    LED_SINK_PATH = environ.get("LED_SINK_PATH")
+    LED_CHANNELS = json.loads(environ.get("LED_CHANNELS") or "[]")
+    # Show the rainbow when the app is ready, runs in the background
+    LED_BOOT_ANIMATION = environ.get("LED_BOOT_ANIMATION", "true").lower() == "true"
+
+    # Unix socket of the LED daemon (`flask led_daemon`). When set the web
+    # workers send their LED commands to the daemon instead of driving the
+    # strip, and frames of the binary frame API go through LED_DAEMON_FRAMES
+    LED_DAEMON_SOCKET = environ.get("LED_DAEMON_SOCKET")
+    LED_DAEMON_FRAMES = environ.get("LED_DAEMON_FRAMES") or "/dev/shm/stair_leds"  # noqa: S108
+
+    # JSON file with the steps and sensors of the stair, see app/const.py
+    STAIR_GEOMETRY_FILE = environ.get("STAIR_GEOMETRY_FILE")
+
+    # LED effects
+    LED_EFFECT_WORKERS = int(environ.get("LED_EFFECT_WORKERS", "4"))
+    LED_EFFECT_QUEUE_SIZE = int(environ.get("LED_EFFECT_QUEUE_SIZE", "16"))
+    # Clock of the LED animations: "real", "scaled" (LED_CLOCK_SPEED times
+    # real time) or "virtual" (no waiting at all, for benchmarks)
+    LED_CLOCK = environ.get("LED_CLOCK", "real")
+    LED_CLOCK_SPEED = float(environ.get("LED_CLOCK_SPEED", "1.0"))
+    # Memory budget in bytes for pre-rendered animation frames
+    LED_FRAME_CACHE_SIZE = int(environ.get("LED_FRAME_CACHE_SIZE", "8388608"))
+    # Number of committed frames kept in memory for /admin/flight_recorder
+    LED_FLIGHT_RECORDER_FRAMES = int(environ.get("LED_FLIGHT_RECORDER_FRAMES", "600"))
+
+    # Shared secret of the binary frame API (/led_frame, /led_stream and the
+    # led_frame Socket.IO event), sent as "Authorization: Bearer <token>" or
+    # ?token=<token>. Without a token the API is open like /set_color, and the
+    # app logs a warning at startup
+    LED_API_TOKEN = environ.get("LED_API_TOKEN")
 
 
 class DevelopmentConfig(Config):
@@ -42,6 +86,8 @@ class TestingConfig(Config):
 
     TESTING = True
     SOCKETIO_ASYNC_MODE = "threading"
+    LED_BACKEND = "virtual"
+    LED_BOOT_ANIMATION = False
     MQTT_BROKER_URL = environ.get("MQTT_BROKER_URL")
 
     # Database
@@ -18,9 +18,9 @@ from app.const import WORKOUTS
 # --------
 
 
-@pytest.fixture(autouse=True)
+@pytest.fixture
 def mock_strip() -> MagicMock:
-    """Mock the LED strip.
+    """Mock the LED strip of the ws281x backend.
 
     Returns
     -------
@@ -30,14 +30,7 @@ def mock_strip() -> MagicMock:
 
     # Mock the number of pixels
     mock.numPixels.return_value = 10
-    with patch("app.led_controller.PixelStrip.begin"), patch(
-        "app.led_controller.PixelStrip",
-        return_value=mock,
-    ), patch("app.led_controller.PixelStrip.setPixelColor"), patch(
-        "app.led_controller.PixelStrip.numPixels",
-    ), patch(
-        "app.led_controller.PixelStrip.show",
-    ):
+    with patch("app.led_backends.PixelStrip", return_value=mock):
         yield mock
 
 
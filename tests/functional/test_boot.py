@@ -0,0 +1,51 @@
+"""Test the boot sequence of the app."""
+
+import os
+import time
+
+import pytest
+
+from app import create_app, led_controller, led_ready
+from config import TestingConfig
+
+
+def test_boot_without_animation(app: pytest.fixture) -> None:
+    """Test that the LEDs are ready right away when the animation is off.
+
+    Args:
+    ----
+        app: The Flask application
+    """
+    assert not app.config["LED_BOOT_ANIMATION"]
+    assert led_ready.is_set()
+    response = app.test_client().get("/health")
+    assert response.status_code == 200
+    assert response.json == {"led_ready": True}
+
+
+def test_boot_animation_runs_in_background(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that create_app does not wait for the boot animation.
+
+    Args:
+    ----
+        monkeypatch: Fixture to enable the boot animation
+    """
+    monkeypatch.setattr(TestingConfig, "LED_BOOT_ANIMATION", True)
+    os.environ["FLASK_ENV"] = "testing"
+
+    started = time.monotonic()
+    app = create_app()
+    assert time.monotonic() - started < 2
+    assert not led_ready.is_set()
+    assert app.test_client().get("/health").status_code == 503
+
+    # The rainbow is a background animation, anything else stops it
+    deadline = time.monotonic() + 1
+    while not led_controller.animations.running and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert [animation.name for animation in led_controller.animations.running] == [
+        "rainbow",
+    ]
+    led_controller.cancel_animations()
+    assert led_ready.wait(1)
+    assert app.test_client().get("/health").status_code == 200
@@ -1,12 +1,19 @@
 """Test the CLI commands."""
 
+import os
+from pathlib import Path
 from unittest.mock import patch
 
 import pytest
 
+import app as app_module
+from app import create_app
 from app.blueprints.auth.models import User
 from app.blueprints.backend.models import Workout
 from app.const import WORKOUTS, IsAdmin
+from app.led_controller import LEDController
+from app.led_daemon import LEDDaemonClient
+from config import TestingConfig
 
 
 def test_initialize_database(cli_test_client: pytest.fixture) -> None:
@@ -84,3 +91,71 @@ def test_create_admin_password_mismatch(cli_test_client: pytest.fixture) -> None
     with patch("getpass.getpass", side_effect=inputs[2:4]):
         result = cli_test_client.invoke(args=["create_admin"], input="\n".join(inputs))
     assert "Passwords don't match" in result.output
+
+
+def test_benchmark_leds(cli_test_client: pytest.fixture) -> None:
+    """Test the benchmark_leds command.
+
+    Args:
+    ----
+        cli_test_client: Test client for the Flask application
+    """
+    output = cli_test_client.invoke(args=["benchmark_leds", "--seconds", "2"])
+    assert output.exit_code == 0
+    assert "120 frames in" in output.output
+    assert "effect sandglass" in output.output
+
+
+def test_benchmark_leds_with_daemon(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    """Test that the benchmark renders locally when the daemon owns the strip.
+
+    Args:
+    ----
+        monkeypatch: Fixture to configure the LED daemon
+        tmp_path: Directory for the socket of the daemon
+    """
+    monkeypatch.setattr(app_module, "led_controller", app_module.led_controller)
+    monkeypatch.setattr(TestingConfig, "LED_DAEMON_SOCKET", str(tmp_path / "leds"))
+    os.environ["FLASK_ENV"] = "testing"
+    app = create_app()
+    # The routes of the blueprints talk to the daemon as well
+    assert isinstance(app.extensions["led_controller"], LEDDaemonClient)
+    runner = app.test_cli_runner()
+
+    output = runner.invoke(args=["benchmark_leds", "--seconds", "1"])
+    assert output.exit_code == 0
+    assert "60 frames in" in output.output
+
+
+def test_led_daemon_app() -> None:
+    """Test that the app of the LED daemon leaves MQTT to the web workers."""
+    os.environ["FLASK_ENV"] = "testing"
+    with (
+        patch("app.mqtt.connect") as connect,
+        patch.object(app_module.mqtt_triggers, "start") as triggers,
+        patch.object(app_module.effect_executor, "start") as executor,
+    ):
+        daemon_app = create_app(led_daemon=True)
+
+    connect.assert_not_called()
+    triggers.assert_not_called()
+    executor.assert_not_called()
+    assert "/led_frame" not in {rule.rule for rule in daemon_app.url_map.iter_rules()}
+    assert "led_daemon" in daemon_app.cli.commands
+    assert isinstance(app_module.led_controller, LEDController)
+    assert app_module.led_controller.renderer.is_running
+
+
+def test_led_daemon_needs_its_own_app(cli_test_client: pytest.fixture) -> None:
+    """Test that the web app refuses to run the LED daemon.
+
+    Args:
+    ----
+        cli_test_client: Test client for the Flask application
+    """
+    output = cli_test_client.invoke(args=["led_daemon"])
+    assert output.exit_code == 2
+    assert "create_app(led_daemon=True)" in output.output
@@ -3,6 +3,8 @@
 import pytest
 from flask_login import current_user
 
+from app import sensor_registry
+
 
 @pytest.mark.usefixtures("auth_client")
 def test_dashboard_view(client: pytest.fixture) -> None:
@@ -70,3 +72,70 @@ def test_workouts_view(client: pytest.fixture) -> None:
     response = client.get("/admin/workouts")
     assert response.status_code == 200
     assert response.request.path == "/admin/workouts"
+
+
+@pytest.mark.usefixtures("auth_client")
+def test_flight_recorder_download(client: pytest.fixture) -> None:
+    """Test that the flight recorder is downloaded as an animation file.
+
+    Args:
+    ----
+        client: Test client for the Flask application.
+    """
+    assert current_user.is_authenticated is True
+    assert current_user.is_admin is True
+
+    response = client.get("/admin/flight_recorder")
+    assert response.status_code == 200
+    assert response.data.startswith(b"STAN")
+
+    response = client.get("/admin/flight_recorder?format=json")
+    assert response.status_code == 200
+    assert response.json["fps"] == 60
+    assert all("source" in frame for frame in response.json["frames"])
+
+
+@pytest.mark.usefixtures("auth_client")
+def test_led_profiler_view(client: pytest.fixture) -> None:
+    """Test the LED profiler page and its JSON stats.
+
+    Args:
+    ----
+        client: Test client for the Flask application.
+    """
+    assert current_user.is_authenticated is True
+    assert current_user.is_admin is True
+
+    response = client.get("/admin/led_profiler")
+    assert response.status_code == 200
+    assert b"LED profiler" in response.data
+
+    response = client.get("/admin/led_profiler?format=json")
+    assert response.status_code == 200
+    assert set(response.json) == {"budget_ms", "frame", "commit", "effects"}
+
+
+@pytest.mark.usefixtures("auth_client")
+def test_sensor_registry_follows_the_routes(
+    app: pytest.fixture,
+    client: pytest.fixture,
+) -> None:
+    """Test that adding and deleting sensors updates the sensor registry.
+
+    Args:
+    ----
+        app: The Flask application.
+        client: Test client for the Flask application.
+    """
+    app.config["WTF_CSRF_ENABLED"] = False
+    assert current_user.is_authenticated is True
+    assert current_user.is_admin is True
+
+    client.post("/admin/sensor/add", data={"client_id": 4, "ip_address": "10.0.0.4"})
+    assert 4 in sensor_registry
+    client.post(f"/admin/sensor/{sensor_registry.get(4)}/delete")
+    assert 4 not in sensor_registry
+
+    client.post("/admin/sensor/add", data={"client_id": 5, "ip_address": "10.0.0.5"})
+    client.post("/admin/sensors/delete_all")
+    assert len(sensor_registry) == 0
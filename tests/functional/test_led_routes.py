@@ -0,0 +1,263 @@
+"""Functional tests for the queued LED routes."""
+
+import os
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+from flask_login import current_user
+
+from app import (
+    create_app,
+    led_commands,
+    led_controller,
+    mqtt,
+    mqtt_triggers,
+    socketio,
+    workout_end_animation,
+)
+from app.blueprints.backend.models import Scene
+from app.const import MQTT_TRIGGER_TOPIC
+from app.led_controller import Color
+from config import TestingConfig
+
+
+def test_set_color_is_queued(client: pytest.fixture) -> None:
+    """Test that the set_color route answers with a command id.
+
+    Args:
+    ----
+        client: Test client for the Flask application.
+    """
+    response = client.get(
+        "/set_color?red=255&green=0&blue=300",
+        headers={"Accept": "application/json"},
+    )
+    assert response.status_code == 202
+    assert response.json["command"] == "set_color"
+
+    status = client.get(f"/led_commands/{response.json['id']}")
+    assert status.status_code == 200
+    assert status.json["status"] in {"queued", "running", "done"}
+
+
+def test_turn_off_redirects_with_command(client: pytest.fixture) -> None:
+    """Test that the LED control form is sent back right away.
+
+    Args:
+    ----
+        client: Test client for the Flask application.
+    """
+    led_controller.set_color(Color(255, 0, 0))
+    response = client.get("/turn_off")
+    assert response.status_code == 302
+    assert "/admin/led_control?command=" in response.location
+
+
+def test_invalid_commands(client: pytest.fixture) -> None:
+    """Test that invalid colors and unknown command ids are rejected.
+
+    Args:
+    ----
+        client: Test client for the Flask application.
+    """
+    assert client.get("/set_color?red=255").status_code == 400
+    assert client.get("/set_color?red=a&green=0&blue=0").status_code == 400
+    assert client.get("/led_commands/unknown").status_code == 404
+
+
+def test_binary_frames(app: pytest.fixture, client: pytest.fixture) -> None:
+    """Test that raw RGB frames are shown over HTTP and Socket.IO.
+
+    Args:
+    ----
+        app: The Flask application.
+        client: Test client for the Flask application.
+    """
+    count = led_controller.count
+    red = bytes((255, 0, 0)) * count
+    green = bytes((0, 255, 0)) * count
+
+    assert client.post("/led_frame", data=red).status_code == 204
+    assert (led_controller.renderer.frame == Color(255, 0, 0)).all()
+
+    response = client.post("/led_stream", data=red + green)
+    assert response.json == {"frames": 2}
+    assert (led_controller.renderer.frame == Color(0, 255, 0)).all()
+
+    socket = socketio.test_client(app, flask_test_client=client)
+    assert socket.emit("led_frame", red, callback=True) is True
+    assert (led_controller.renderer.frame == Color(255, 0, 0)).all()
+    assert socket.emit("led_frame", red[:-1], callback=True) is False
+    socket.disconnect()
+
+    assert client.post("/led_frame", data=red[:-3]).status_code == 400
+    assert client.post("/led_stream", data=red + green[:3]).status_code == 400
+
+
+def test_binary_frames_token(app: pytest.fixture, client: pytest.fixture) -> None:
+    """Test that the frame API checks the token when one is configured.
+
+    Args:
+    ----
+        app: The Flask application.
+        client: Test client for the Flask application.
+    """
+    app.config["LED_API_TOKEN"] = "secret"
+    frame = bytes(3 * led_controller.count)
+
+    assert client.post("/led_frame", data=frame).status_code == 401
+    assert client.post("/led_stream?token=wrong", data=frame).status_code == 401
+    response = client.post(
+        "/led_frame",
+        data=frame,
+        headers={"Authorization": "Bearer secret"},
+    )
+    assert response.status_code == 204
+    assert client.post("/led_stream?token=secret", data=frame).json == {"frames": 1}
+
+    socket = socketio.test_client(app, flask_test_client=client)
+    assert socket.emit("led_frame", frame, callback=True) is False
+    socket.disconnect()
+
+
+def test_open_frame_api_warns(
+    monkeypatch: pytest.MonkeyPatch,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    """Test that the app warns at startup when the frame API has no token.
+
+    Args:
+    ----
+        monkeypatch: Fixture to set the token
+        caplog: Captured log messages
+    """
+    os.environ["FLASK_ENV"] = "testing"
+    create_app()
+    assert "LED_API_TOKEN is not set" in caplog.text
+
+    caplog.clear()
+    monkeypatch.setattr(TestingConfig, "LED_API_TOKEN", "secret")
+    create_app()
+    assert "LED_API_TOKEN" not in caplog.text
+
+
+@pytest.mark.usefixtures("auth_client")
+def test_scenes(client: pytest.fixture) -> None:
+    """Test storing, showing and editing a scene.
+
+    Args:
+    ----
+        client: Test client for the Flask application.
+    """
+    assert current_user.is_authenticated is True
+    assert current_user.is_admin is True
+
+    spec = '{"layers": [{"type": "solid", "color": "#0000ff"}]}'
+    response = client.post("/admin/scenes/add", data={"name": "blauw", "spec": spec})
+    assert response.status_code == 302
+    response = client.post("/admin/scenes/add", data={"name": "kapot", "spec": "{"})
+    assert response.status_code == 302
+    scene = Scene.query.one()
+    assert scene.name == "blauw"
+    assert "blauw" in client.get("/admin/led_control").text
+
+    response = client.get(f"/scene/{scene.id}", headers={"Accept": "application/json"})
+    assert response.json["command"] == "show_scene"
+    assert led_commands.wait(response.json["id"], 5)["status"] == "done"
+    assert (led_controller.renderer.frame == Color(0, 0, 255)).all()
+    assert scene.id in led_controller.scene_cache
+
+    client.post(
+        f"/admin/scenes/{scene.id}/update",
+        data={"name": "rood", "spec": '{"frame": ["#ff0000"]}'},
+    )
+    assert scene.id not in led_controller.scene_cache
+    # A description of the wrong shape is flashed instead of failing
+    response = client.post(
+        f"/admin/scenes/{scene.id}/update",
+        data={"name": "kapot", "spec": '{"frame": 5}'},
+        follow_redirects=True,
+    )
+    assert "Ongeldige scene" in response.text
+    assert Scene.query.one().name == "rood"
+
+    client.post(f"/admin/scenes/{scene.id}/delete")
+    assert client.get(f"/scene/{scene.id}").status_code == 404
+    response = client.post(f"/admin/scenes/{scene.id}/update", data={"spec": "{}"})
+    assert response.status_code == 404
+
+
+@pytest.mark.usefixtures("auth_client")
+def test_mqtt_queue_stats(client: pytest.fixture) -> None:
+    """Test that the MQTT queue metrics are available to admins.
+
+    Args:
+    ----
+        client: Test client for the Flask application.
+    """
+    assert current_user.is_authenticated is True
+    assert current_user.is_admin is True
+
+    response = client.get("/admin/mqtt_queues")
+    assert response.status_code == 200
+    assert set(response.json) == {"trigger", "status"}
+    assert {"depth", "dropped", "lag"} <= set(response.json["trigger"])
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [b"not json", b"[1, 2]", b'"sensor-1"', b'{"status": "trigger"}'],
+)
+def test_invalid_trigger_is_dropped(payload: bytes) -> None:
+    """Test that a trigger without a client ID never reaches the worker.
+
+    Args:
+    ----
+        payload: Body of the MQTT message
+    """
+    os.environ["FLASK_ENV"] = "testing"
+    with patch.object(mqtt.client, "message_callback_add") as callback_add:
+        create_app()
+    callbacks = dict(call.args for call in callback_add.call_args_list)
+    on_topic_trigger = callbacks[MQTT_TRIGGER_TOPIC]
+
+    message = SimpleNamespace(payload=payload)
+    with (
+        patch.object(mqtt_triggers, "put") as put,
+        patch("builtins.print") as mock_print,
+    ):
+        on_topic_trigger(None, None, message)
+        put.assert_not_called()
+        assert "Invalid MQTT trigger message" in mock_print.call_args.args[0]
+
+        on_topic_trigger(None, None, SimpleNamespace(payload=b'{"client_id": 1}'))
+        put.assert_called_once_with({"client_id": 1})
+
+
+def test_stop_workout_is_queued(app: pytest.fixture, client: pytest.fixture) -> None:
+    """Test that stopping a workout queues the wipe instead of running it.
+
+    Args:
+    ----
+        app: The Flask application.
+        client: Test client for the Flask application.
+    """
+    socket = socketio.test_client(app, flask_test_client=client)
+    with patch.object(led_commands, "submit") as submit:
+        socket.emit("system_control", {"mode": "stop", "workout_id": 1})
+    socket.disconnect()
+    submit.assert_called_once_with(
+        "stop_workout",
+        workout_end_animation,
+        False,  # noqa: FBT003
+        key="led_color",
+    )
+
+    with (
+        patch.object(led_controller, "rainbow") as rainbow,
+        patch.object(led_controller, "color_wipe") as color_wipe,
+    ):
+        workout_end_animation(True)  # noqa: FBT003
+        rainbow.assert_called_once_with()
+        color_wipe.assert_called_once_with(Color(0, 0, 0), 10)
@@ -0,0 +1,92 @@
+"""Unit tests for the bounded LED effect executor."""
+
+import threading
+
+from app.const import QueuePolicy
+from app.effect_executor import EffectExecutor
+
+
+def _blocked_executor(policy: QueuePolicy) -> tuple[EffectExecutor, threading.Event]:
+    """Create an executor whose only worker is busy until the event is set."""
+    release = threading.Event()
+    started = threading.Event()
+
+    def block() -> None:
+        started.set()
+        release.wait(5)
+
+    executor = EffectExecutor(workers=1, max_queue=2, policy=policy)
+    executor.start()
+    executor.submit(block)
+    started.wait(5)
+    return executor, release
+
+
+def test_latest_wins_per_key() -> None:
+    """Test that a newer job replaces the waiting job with the same key."""
+    executor, release = _blocked_executor(QueuePolicy.LATEST_WINS)
+    results: list[int] = []
+
+    first = executor.submit(results.append, 1, key="sensor-3")
+    second = executor.submit(results.append, 2, key="sensor-3")
+    other = executor.submit(results.append, 3, key="sensor-4")
+    assert executor.pending == 2
+
+    release.set()
+    second.result(5)
+    other.result(5)
+    executor.shutdown()
+
+    assert first.cancelled() is True
+    assert results == [2, 3]
+    assert executor.stats == {
+        "queued": 3,
+        "coalesced": 1,
+        "dropped": 0,
+        "completed": 3,
+        "failed": 0,
+        "pending": 0,
+    }
+
+
+def test_drop_newest_when_full() -> None:
+    """Test that new jobs are rejected when the queue is full."""
+    executor, release = _blocked_executor(QueuePolicy.DROP_NEWEST)
+
+    assert executor.submit(print) is not None
+    assert executor.submit(print) is not None
+    assert executor.submit(print) is None
+
+    release.set()
+    executor.shutdown()
+    assert executor.counters["dropped"] == 1
+
+
+def test_drop_oldest_when_full() -> None:
+    """Test that the oldest waiting job is dropped when the queue is full."""
+    executor, release = _blocked_executor(QueuePolicy.DROP_OLDEST)
+
+    oldest = executor.submit(print)
+    executor.submit(print)
+    newest = executor.submit(print)
+
+    release.set()
+    newest.result(5)
+    executor.shutdown()
+    assert oldest.cancelled() is True
+    assert executor.counters["dropped"] == 1
+
+
+def test_failed_job_is_counted() -> None:
+    """Test that an exception in an effect does not kill the worker."""
+    executor = EffectExecutor(workers=1, max_queue=4)
+    executor.start()
+
+    failing = executor.submit(int, "not a number")
+    working = executor.submit(int, "42")
+
+    assert isinstance(failing.exception(5), ValueError)
+    assert working.result(5) == 42
+    executor.shutdown()
+    assert executor.counters["failed"] == 1
+    assert executor.submit(print) is None
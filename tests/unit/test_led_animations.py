@@ -0,0 +1,84 @@
+"""Unit tests for the LED animation handles."""
+
+import threading
+
+from app.const import AnimationPriority, AnimationStatus
+from app.led_animations import AnimationManager
+from app.led_compositor import Compositor
+from app.led_controller import Color, LEDController
+from app.led_effects import SandglassEffect
+
+
+def test_layer_animation_cancel() -> None:
+    """Test that cancelling a layer animation removes its layer."""
+    compositor = Compositor(10)
+    manager = AnimationManager(compositor)
+    layer = compositor.add(SandglassEffect(10, 0xFF0000), now=0)
+    animation = manager.start("sandglass", layer=layer)
+
+    assert animation.status == AnimationStatus.RUNNING
+    assert animation.cancel()
+    assert animation.join(0)
+    assert animation.status == AnimationStatus.CANCELLED
+    assert not compositor.is_active
+    # A second cancel has nothing left to stop
+    assert not animation.cancel()
+    assert manager.running == []
+
+
+def test_loop_animation_finishes() -> None:
+    """Test the status of a loop animation that runs to the end."""
+    manager = AnimationManager(Compositor(10))
+    with manager.run("wipe") as animation:
+        assert animation.sleep(0)
+        assert not animation.join(0)
+    assert animation.join(0)
+    assert animation.status == AnimationStatus.FINISHED
+
+
+def test_higher_priority_preempts() -> None:
+    """Test that an animation cancels the running ones with a lower priority."""
+    manager = AnimationManager(Compositor(10))
+    stopped = threading.Event()
+
+    def background() -> None:
+        with manager.run("rainbow", AnimationPriority.BACKGROUND) as animation:
+            while animation.sleep(10):
+                pass
+        stopped.set()
+
+    thread = threading.Thread(target=background)
+    thread.start()
+    while not manager.running:
+        pass
+    normal = manager.start("sandglass", AnimationPriority.NORMAL)
+    assert stopped.wait(1)
+    thread.join()
+
+    # Equal or higher priorities keep running
+    manager.start("wipe", AnimationPriority.NORMAL)
+    assert normal.status == AnimationStatus.RUNNING
+    manager.start("ripple", AnimationPriority.TRIGGER)
+    assert normal.status == AnimationStatus.CANCELLED
+    assert [animation.name for animation in manager.running] == ["ripple"]
+    assert manager.stats[0]["priority"] == "trigger"
+
+
+def test_trigger_keeps_the_sandglass() -> None:
+    """Test that trigger effects blend over the sandglass of a workout."""
+    controller = LEDController(104, 18, 800000, 10, 255, False, 0)  # noqa: FBT003
+    controller.start(backend="virtual")
+    sandglass = controller.sandglass(60, Color(0, 0, 255))
+
+    controller.ripple_drop(10, Color(255, 0, 0))
+    controller.follow_step(10, Color(255, 0, 0))
+    controller.play_program(
+        {"layers": [{"type": "solid", "color": "#00ff00", "zone": {"steps": [1]}}]},
+        AnimationPriority.TRIGGER,
+    )
+
+    assert sandglass.status == AnimationStatus.RUNNING
+    assert "sandglass" in [
+        layer.name for layer in controller.renderer.compositor.layers
+    ]
+    controller.stop()
@@ -0,0 +1,255 @@
+"""Unit tests for the LED output backends."""
+
+import os
+from pathlib import Path
+from unittest.mock import MagicMock, call, patch
+
+import numpy as np
+import pytest
+
+from app.led_backends import (
+    FileSinkBackend,
+    LEDBackend,
+    MultiChannelBackend,
+    VirtualBackend,
+    WS281xBackend,
+)
+from app.led_controller import Color, LEDController
+
+
+def test_ws281x_backend(mock_strip: MagicMock) -> None:
+    """Test that the ws281x backend shows every frame once.
+
+    Args:
+    ----
+        mock_strip (MagicMock): The mocked LED strip.
+    """
+    backend = WS281xBackend(10, 18, 800000, 10, False, 255, 0)  # noqa: FBT003
+    backend.begin()
+    backend.write(np.full(10, Color(0, 255, 0), dtype=np.uint32))
+
+    mock_strip.begin.assert_called_once()
+    assert mock_strip.setPixelColor.call_count == 10
+    assert mock_strip.show.call_count == 1
+
+
+def test_multi_channel_backend() -> None:
+    """Test that one frame is split over the channels and shown together."""
+    strips = [MagicMock(), MagicMock()]
+    events = MagicMock()
+    for index, strip in enumerate(strips):
+        events.attach_mock(strip.show, f"show_{index}")
+        events.attach_mock(strip.setPixelColor, f"set_{index}")
+
+    controller = LEDController(5, 18, 800000, 10, 255, False, 0)  # noqa: FBT003
+    with patch("app.led_backends.PixelStrip", side_effect=strips):
+        backend = controller.create_backend(
+            "multi",
+            channels=[
+                {"count": 3, "pin": 18, "dma": 10, "channel": 0},
+                {"count": 2, "pin": 10, "dma": 11, "channel": 0, "reverse": True},
+            ],
+        )
+        backend.begin()
+    assert isinstance(backend, MultiChannelBackend)
+    assert backend.count == 5
+
+    backend.write(np.arange(1, 6, dtype=np.uint32))
+    assert strips[0].setPixelColor.call_args_list == [
+        call(0, 1),
+        call(1, 2),
+        call(2, 3),
+    ]
+    # The second channel is wired from the other end of the stair
+    assert strips[1].setPixelColor.call_args_list == [call(0, 5), call(1, 4)]
+    # Both buffers are loaded before the first one is shown
+    names = [name for name, *_ in events.mock_calls]
+    assert names.index("show_0") > names.index("set_1")
+    assert backend.frames_written == 1
+
+
+def test_ws281x_backend_close(mock_strip: MagicMock) -> None:
+    """Test that closing the backend releases the strip and its DMA channel.
+
+    Args:
+    ----
+        mock_strip (MagicMock): The mocked LED strip.
+    """
+    backend = WS281xBackend(10, 18, 800000, 10, False, 255, 0)  # noqa: FBT003
+    backend.begin()
+    backend.close()
+    mock_strip._cleanup.assert_called_once()  # noqa: SLF001
+
+    # Closing again, or restarting, does not release the strip twice
+    backend.close()
+    backend.begin()
+    assert mock_strip._cleanup.call_count == 1  # noqa: SLF001
+    assert mock_strip.begin.call_count == 2
+
+
+def test_multi_channel_backend_shows_spi_last() -> None:
+    """Test that the blocking SPI channel is shown after the DMA channels."""
+    strips = [MagicMock(), MagicMock()]
+    events = MagicMock()
+    for index, strip in enumerate(strips):
+        events.attach_mock(strip.show, f"show_{index}")
+
+    controller = LEDController(5, 18, 800000, 10, 255, False, 0)  # noqa: FBT003
+    with patch("app.led_backends.PixelStrip", side_effect=strips):
+        backend = controller.create_backend(
+            "multi",
+            channels=[
+                {"count": 3, "pin": 10, "dma": 10, "channel": 0},
+                {"count": 2, "pin": 21, "dma": 11, "channel": 0},
+            ],
+        )
+        backend.begin()
+    backend.write(np.arange(5, dtype=np.uint32))
+
+    assert [name for name, *_ in events.mock_calls] == ["show_1", "show_0"]
+
+
+@pytest.mark.parametrize(
+    ("channels", "error"),
+    [
+        (
+            [
+                {"count": 3, "pin": 18, "dma": 10, "channel": 0},
+                {"count": 2, "pin": 13, "dma": 11, "channel": 1},
+            ],
+            "PWM output",
+        ),
+        (
+            [
+                {"count": 3, "pin": 18, "dma": 10, "channel": 0},
+                {"count": 2, "pin": 10, "dma": 10, "channel": 0},
+            ],
+            "own DMA channel",
+        ),
+        ([{"count": 5, "pin": 4, "dma": 10, "channel": 0}], "GPIO pin 4"),
+    ],
+)
+def test_multi_channel_backend_outputs(channels: list[dict], error: str) -> None:
+    """Test that every channel needs its own output and DMA channel."""
+    controller = LEDController(5, 18, 800000, 10, 255, False, 0)  # noqa: FBT003
+    with pytest.raises(ValueError, match=error):
+        controller.create_backend("multi", channels=channels)
+
+
+def test_multi_channel_backend_length() -> None:
+    """Test that the channels have to cover the whole strip."""
+    controller = LEDController(5, 18, 800000, 10, 255, False, 0)  # noqa: FBT003
+    with pytest.raises(ValueError, match="do not add up to 5 LEDs"):
+        controller.create_backend(
+            "multi",
+            channels=[{"count": 3, "pin": 18, "dma": 10, "channel": 0}],
+        )
+
+
+def test_virtual_backend_history() -> None:
+    """Test that the virtual strip keeps the most recent frames."""
+    backend = VirtualBackend(2, history=3)
+    for value in range(5):
+        backend.write(np.array([Color(value, 0, 0), 0], dtype=np.uint32))
+
+    assert backend.frames_written == 5
+    assert backend.frame.tolist() == [Color(4, 0, 0), 0]
+    assert backend.recent_frames()[:, 0, 0].tolist() == [2, 3, 4]
+
+
+def test_file_sink_backend(tmp_path: Path) -> None:
+    """Test that the file sink writes raw RGB bytes per frame.
+
+    Args:
+    ----
+        tmp_path (Path): Temporary directory.
+    """
+    path = tmp_path / "frames.rgb"
+    backend = FileSinkBackend(2, str(path))
+    backend.begin()
+    backend.write(np.array([Color(1, 2, 3), Color(4, 5, 6)], dtype=np.uint32))
+    backend.write(np.zeros(2, dtype=np.uint32))
+    backend.close()
+
+    assert path.read_bytes() == bytes([1, 2, 3, 4, 5, 6, 0, 0, 0, 0, 0, 0])
+
+
+def test_file_sink_fifo_without_reader(tmp_path: Path) -> None:
+    """Test that frames are dropped instead of blocking without a reader.
+
+    Args:
+    ----
+        tmp_path (Path): Temporary directory.
+    """
+    path = tmp_path / "frames.fifo"
+    os.mkfifo(path)
+    backend = FileSinkBackend(2, str(path))
+    backend.begin()
+    backend.write(np.zeros(2, dtype=np.uint32))
+
+    assert backend.frames_dropped == 1
+    assert backend.frames_written == 0
+
+    # Frames are written as soon as a reader attaches
+    reader = os.open(path, os.O_RDONLY | os.O_NONBLOCK)
+    backend.write(np.array([Color(1, 2, 3), 0], dtype=np.uint32))
+    assert os.read(reader, 6) == bytes([1, 2, 3, 0, 0, 0])
+    os.close(reader)
+    backend.close()
+
+
+def _read_available(fd: int) -> bytes:
+    """Read everything that waits in a nonblocking pipe."""
+    data = b""
+    try:
+        while chunk := os.read(fd, 65536):
+            data += chunk
+    except BlockingIOError:
+        pass
+    return data
+
+
+def test_file_sink_fifo_keeps_frames_whole(tmp_path: Path) -> None:
+    """Test that a frame larger than the pipe buffer is never cut in half.
+
+    Args:
+    ----
+        tmp_path (Path): Temporary directory.
+    """
+    count = 30000
+    path = tmp_path / "frames.fifo"
+    os.mkfifo(path)
+    reader = os.open(path, os.O_RDONLY | os.O_NONBLOCK)
+    backend = FileSinkBackend(count, str(path))
+    backend.begin()
+
+    def show(level: int) -> None:
+        backend.write(np.full(count, Color(level, 0, 0), dtype=np.uint32))
+
+    # The pipe takes the first frame only in part, so the second is dropped
+    # and the rest of the first goes out before the third
+    show(1)
+    show(2)
+    data = b""
+    for level in (3, 4):
+        data += _read_available(reader)
+        show(level)
+    data += _read_available(reader)
+    os.close(reader)
+    backend.close()
+
+    assert backend.frames_written == 3
+    assert backend.frames_dropped == 1
+    assert len(data) > 2 * count * 3
+    red = np.frombuffer(data, dtype=np.uint8)[::3]
+    assert (red == np.repeat([1, 3, 4], count)[: len(red)]).all()
+
+
+def test_backend_without_write() -> None:
+    """Test that a backend must implement write to be created."""
+
+    class Incomplete(LEDBackend):
+        name = "incomplete"
+
+    with pytest.raises(TypeError, match="write"):
+        Incomplete(4)
@@ -0,0 +1,61 @@
+"""Unit tests for the LED frame cache."""
+
+import numpy as np
+
+from app.led_cache import FrameCache, FrameSequence
+from app.led_effects import rainbow_frame
+
+
+def sequence(frames: int, count: int = 10) -> FrameSequence:
+    """Create a sequence of rainbow frames."""
+    return FrameSequence.from_packed(rainbow_frame(count, j) for j in range(frames))
+
+
+def test_sequence_round_trip() -> None:
+    """Test that frames are stored as RGB bytes and replayed unchanged."""
+    frames = sequence(4)
+    assert len(frames) == 4
+    assert frames.nbytes == 4 * 10 * 3
+    assert not frames.frames.flags.writeable
+    for index in range(4):
+        assert np.array_equal(frames.frame(index), rainbow_frame(10, index))
+
+
+def test_cache_hits_and_misses() -> None:
+    """Test that a sequence is only rendered once."""
+    cache = FrameCache()
+    rendered = []
+
+    def render() -> FrameSequence:
+        rendered.append(True)
+        return sequence(2)
+
+    first = cache.get_or_render(("rainbow", (), 10), render)
+    second = cache.get_or_render(("rainbow", (), 10), render)
+    assert first is second
+    assert len(rendered) == 1
+    assert cache.stats["hits"] == 1
+    assert cache.stats["misses"] == 1
+
+
+def test_cache_evicts_least_recently_used() -> None:
+    """Test that the memory budget evicts the oldest unused sequences."""
+    cache = FrameCache(max_bytes=2 * 60)
+    cache.put("a", sequence(2))
+    cache.put("b", sequence(2))
+    assert cache.get("a") is not None
+    cache.put("c", sequence(1))
+
+    assert "b" not in cache
+    assert "a" in cache
+    assert "c" in cache
+    assert cache.nbytes == 90
+    assert cache.stats["evictions"] == 1
+
+    # Too large for the whole budget, so it is not cached at all
+    cache.put("d", sequence(7))
+    assert "d" not in cache
+
+    cache.resize(0)
+    assert len(cache) == 0
+    assert cache.nbytes == 0
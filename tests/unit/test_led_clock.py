@@ -0,0 +1,79 @@
+"""Unit tests for the clocks that drive the LED animations."""
+
+import threading
+import time
+
+import pytest
+
+from app.led_clock import Clock, ScaledClock, VirtualClock, create_clock
+
+
+def test_virtual_clock_does_not_sleep() -> None:
+    """Test that waiting on the virtual clock only moves the time."""
+    clock = VirtualClock()
+    event = threading.Event()
+
+    started = time.monotonic()
+    for _ in range(1000):
+        assert not clock.wait(event, 0.6)
+    assert time.monotonic() - started < 0.5
+    assert clock.now() == pytest.approx(600)
+
+    event.set()
+    assert clock.wait(event, 10)
+    assert clock.now() == pytest.approx(600)
+    assert clock.advance(-1) == pytest.approx(600)
+
+
+def test_virtual_clock_waiters_share_the_time() -> None:
+    """Test that parallel waits move the clock to the latest deadline only."""
+    clock = VirtualClock()
+    never = threading.Event()
+    # Hold both waiters back until both deadlines are pending
+    clock._deadlines.append(0.0)  # noqa: SLF001
+    threads = [
+        threading.Thread(target=clock.wait, args=(never, timeout))
+        for timeout in (0.25, 1.0)
+    ]
+    for thread in threads:
+        thread.start()
+    while len(clock._deadlines) < 3:  # noqa: SLF001
+        time.sleep(0.001)
+    with clock._condition:  # noqa: SLF001
+        clock._deadlines.remove(0.0)  # noqa: SLF001
+        clock._condition.notify_all()  # noqa: SLF001
+    for thread in threads:
+        thread.join(1)
+        assert not thread.is_alive()
+    assert clock.now() == pytest.approx(1.0)
+
+    # A cancelled waiter stops waiting without moving the clock
+    clock._deadlines.append(clock.now() + 1)  # noqa: SLF001
+    cancelled = threading.Event()
+    thread = threading.Thread(target=clock.wait, args=(cancelled, 5.0))
+    thread.start()
+    cancelled.set()
+    thread.join(1)
+    assert not thread.is_alive()
+    assert clock.now() == pytest.approx(1.0)
+
+
+def test_scaled_clock() -> None:
+    """Test that the scaled clock runs faster than real time."""
+    clock = ScaledClock(10)
+    started = clock.now()
+    clock.sleep(0.5)
+
+    assert clock.now() - started == pytest.approx(0.5, abs=0.1)
+    assert clock.real_timeout(1) == pytest.approx(0.1)
+    with pytest.raises(ValueError, match="must be positive"):
+        ScaledClock(0)
+
+
+def test_create_clock() -> None:
+    """Test that the clock is selected by name."""
+    assert type(create_clock()) is Clock
+    assert isinstance(create_clock("scaled", 2), ScaledClock)
+    assert isinstance(create_clock("virtual"), VirtualClock)
+    with pytest.raises(ValueError, match="Unknown LED clock"):
+        create_clock("sundial")
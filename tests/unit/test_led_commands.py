@@ -0,0 +1,54 @@
+"""Unit tests for the queued LED commands."""
+
+import threading
+
+from app.const import CommandStatus, QueuePolicy
+from app.effect_executor import EffectExecutor
+from app.led_commands import LEDCommandQueue
+
+
+def test_command_status_follows_the_job() -> None:
+    """Test the status of a command from queued to done."""
+    executor = EffectExecutor(workers=1, max_queue=2)
+    executor.start()
+    commands = LEDCommandQueue(executor, history=2)
+    release = threading.Event()
+    started = threading.Event()
+
+    def block() -> None:
+        started.set()
+        release.wait(5)
+
+    running = commands.submit("block", block)
+    started.wait(5)
+    assert commands.status(running)["status"] == CommandStatus.RUNNING.value
+
+    first = commands.submit("color", print, "first", key="color")
+    second = commands.submit("color", print, "second", key="color")
+    # The newer color replaced the waiting one
+    assert commands.status(first)["status"] == CommandStatus.CANCELLED.value
+    assert commands.status(second)["status"] == CommandStatus.QUEUED.value
+    assert commands.status(second)["command"] == "color"
+    # Only the two most recent commands are remembered
+    assert commands.status(running) is None
+
+    release.set()
+    assert commands.wait(second, 5)["status"] == CommandStatus.DONE.value
+    executor.shutdown()
+    assert commands.status("unknown") is None
+
+
+def test_failed_and_dropped_commands() -> None:
+    """Test that errors and full queues are reported in the status."""
+    executor = EffectExecutor(workers=1, max_queue=1, policy=QueuePolicy.DROP_NEWEST)
+    commands = LEDCommandQueue(executor)
+
+    dropped = commands.submit("noop", print)
+    assert commands.status(dropped)["status"] == CommandStatus.DROPPED.value
+
+    executor.start()
+    failed = commands.submit("fail", int, "red")
+    status = commands.wait(failed, 5)
+    executor.shutdown()
+    assert status["status"] == CommandStatus.FAILED.value
+    assert "invalid literal" in status["error"]
@@ -0,0 +1,113 @@
+"""Unit tests for the LED effect compositor."""
+
+import numpy as np
+
+from app.const import BlendMode
+from app.led_compositor import Compositor
+from app.led_controller import Color
+from app.led_effects import Effect, RippleEffect, solid_frame
+from app.led_flight_recorder import FlightRecorder
+
+
+class SolidEffect(Effect):
+    """Effect that lights a fixed set of pixels."""
+
+    name = "solid"
+
+    def __init__(
+        self,
+        color: int,
+        alpha: list[float],
+        duration: float | None,
+    ) -> None:
+        """Initialize the effect."""
+        self.color = color
+        self.alpha = np.array(alpha, dtype=np.float32)
+        self.duration = duration
+
+    def render(self, elapsed: float, count: int) -> tuple[np.ndarray, np.ndarray]:
+        """Render the effect."""
+        return solid_frame(count, self.color), self.alpha
+
+
+def test_blend_modes() -> None:
+    """Test the add, max and alpha over blend modes."""
+    base = np.full(2, Color(100, 0, 0), dtype=np.uint32)
+    red = SolidEffect(Color(200, 0, 0), [1.0, 0.5], 10)
+
+    compositor = Compositor(2)
+    compositor.add(red, now=0, blend=BlendMode.ADD)
+    assert compositor.compose(base, now=1).tolist() == [
+        Color(255, 0, 0),
+        Color(200, 0, 0),
+    ]
+
+    compositor.clear()
+    compositor.add(red, now=0, blend=BlendMode.MAX)
+    assert compositor.compose(base, now=1).tolist() == [
+        Color(200, 0, 0),
+        Color(100, 0, 0),
+    ]
+
+    compositor.clear()
+    compositor.add(red, now=0, blend=BlendMode.OVER, opacity=0.5)
+    assert compositor.compose(base, now=1).tolist() == [
+        Color(150, 0, 0),
+        Color(125, 0, 0),
+    ]
+
+
+def test_layers_expire() -> None:
+    """Test that layers are dropped after their time to live."""
+    compositor = Compositor(2)
+    base = np.zeros(2, dtype=np.uint32)
+    short = compositor.add(SolidEffect(Color(0, 0, 255), [1, 1], 1), now=0)
+    endless = compositor.add(SolidEffect(Color(0, 0, 255), [1, 1], None), now=0)
+
+    compositor.compose(base, now=0.5)
+    assert short.finished.is_set() is False
+
+    compositor.compose(base, now=1.5)
+    assert short.finished.is_set() is True
+    assert compositor.layers == [endless]
+
+    compositor.remove(endless)
+    assert compositor.is_active is False
+    assert compositor.compose(base, now=2) is base
+
+
+def test_overlapping_ripples_blend() -> None:
+    """Test that the cleanup of one ripple does not blank out another one."""
+    compositor = Compositor(20)
+    base = np.zeros(20, dtype=np.uint32)
+    compositor.add(RippleEffect(5, 4, Color(255, 0, 0), 0.1), 0, BlendMode.MAX)
+    compositor.add(RippleEffect(9, 4, Color(0, 255, 0), 0.1), 0.4, BlendMode.MAX)
+
+    # The first ripple is clearing its center while the second one grows
+    frame = compositor.compose(base, now=0.55)
+    assert frame[5] == 0
+    assert frame[2] == Color(255, 0, 0)
+    assert frame[9] == Color(0, 255, 0)
+    assert frame[8] == Color(255, 255, 0)
+
+
+def test_failing_effect_is_removed() -> None:
+    """Test that an effect that raises only takes down its own layer."""
+
+    class BrokenEffect(Effect):
+        name = "broken"
+
+        def render(self, elapsed: float, count: int) -> tuple[np.ndarray, np.ndarray]:
+            return solid_frame(count, 0), np.ones(count + 1)
+
+    base = np.zeros(2, dtype=np.uint32)
+    compositor = Compositor(2)
+    compositor.flight_recorder = FlightRecorder(2)
+    broken = compositor.add(BrokenEffect(), now=0)
+    compositor.add(SolidEffect(Color(0, 0, 200), [1.0, 1.0], None), now=0)
+
+    assert compositor.compose(base, now=1).tolist() == [Color(0, 0, 200)] * 2
+    assert broken.finished.is_set()
+    assert [layer.name for layer in compositor.layers] == ["solid"]
+    ((_, message),) = compositor.flight_recorder.events
+    assert message.startswith("Effect broken failed: ValueError")
@@ -0,0 +1,180 @@
+"""Unit tests for the LED daemon and its client."""
+
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from app.const import AnimationPriority
+from app.led_controller import Color, LEDController
+from app.led_daemon import LEDDaemon, LEDDaemonClient, SharedFrameBuffer
+from app.stair_geometry import StairGeometry
+
+GEOMETRY = StairGeometry(
+    10, 2, 5, {1: {"led": 9, "step": 1}, 2: {"led": 0, "step": 2}}
+)
+
+
+@pytest.fixture(name="daemon")
+def setup_daemon(tmp_path: Path) -> LEDDaemon:
+    """Serve a controller on a virtual strip over a unix socket.
+
+    Args:
+    ----
+        tmp_path (Path): Directory for the socket and the frame buffer
+
+    Returns:
+    -------
+        LEDDaemon: The running daemon
+    """
+    controller = LEDController(10, 18, 800000, 10, 255, False, 0, geometry=GEOMETRY)  # noqa: FBT003
+    controller.start(backend="virtual")
+    server = LEDDaemon(controller, str(tmp_path / "leds.sock"), tmp_path / "frames")
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    controller.stop()
+
+
+def _client(daemon: LEDDaemon) -> LEDDaemonClient:
+    """Create a client of the daemon."""
+    return LEDDaemonClient(GEOMETRY, daemon.server_address, daemon.frames_path)
+
+
+def test_shared_frame_buffer(tmp_path: Path) -> None:
+    """Test that a frame written in one mapping is read in another.
+
+    Args:
+    ----
+        tmp_path (Path): Directory for the frame buffer
+    """
+    owner = SharedFrameBuffer(tmp_path / "frames", 4, create=True)
+    writer = SharedFrameBuffer(tmp_path / "frames", 4)
+    writer.write(np.array([1, 2, 3, 4]))
+
+    sequence, frame = owner.read()
+    assert sequence == 2
+    assert frame.tolist() == [1, 2, 3, 4]
+
+    with pytest.raises(ValueError, match="does not hold 5 pixels"):
+        SharedFrameBuffer(tmp_path / "frames", 5)
+    writer.close()
+    owner.close()
+
+
+def test_commands_run_in_the_daemon(daemon: LEDDaemon) -> None:
+    """Test that the client runs the controller commands remotely.
+
+    Args:
+    ----
+        daemon (LEDDaemon): The running daemon
+    """
+    client = _client(daemon)
+    renderer = daemon.controller.renderer
+
+    client.set_color(Color(255, 0, 0))
+    assert (renderer.frame == Color(255, 0, 0)).all()
+    assert client.trigger_program(1) is False
+
+    sandglass = client.sandglass(60, Color(0, 0, 255))
+    assert daemon.controller.animations.running[0].name == "sandglass"
+    assert sandglass.cancel() is True
+    assert sandglass.cancel() is False
+
+    with pytest.raises(ValueError, match="Invalid layer type"):
+        client.play_program({"layers": [{}]}, AnimationPriority.TRIGGER)
+    with pytest.raises(AttributeError):
+        client.start()
+    client.close()
+
+
+def test_controller_errors_are_reported(
+    daemon: LEDDaemon,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture,
+) -> None:
+    """Test that any controller error is sent back and the connection stays.
+
+    Args:
+    ----
+        daemon (LEDDaemon): The running daemon
+        monkeypatch: Fixture to break a controller method
+        capsys: Captured output
+    """
+
+    def broken() -> None:
+        msg = "step 40 does not exist"
+        raise IndexError(msg)
+
+    monkeypatch.setattr(daemon.controller, "turn_off", broken)
+    client = _client(daemon)
+    client.set_color(Color(255, 0, 0))
+    connection = client._connection()  # noqa: SLF001
+
+    assert client.turn_off() is None
+    assert "turn_off: IndexError: step 40 does not exist" in capsys.readouterr().out
+    client.set_color(Color(0, 255, 0))
+    assert client._connection() is connection  # noqa: SLF001
+    assert (daemon.controller.renderer.frame == Color(0, 255, 0)).all()
+    client.close()
+
+
+def test_diagnostics_come_from_the_daemon(daemon: LEDDaemon, tmp_path: Path) -> None:
+    """Test that the frame times and the flight recorder are read remotely.
+
+    Args:
+    ----
+        daemon (LEDDaemon): The running daemon
+        tmp_path (Path): Directory for the flight recorder file
+    """
+    client = _client(daemon)
+    client.set_color(Color(255, 0, 0))
+
+    report = client.profiler_report()
+    assert set(report) == {"stats", "renderer"}
+    assert report["renderer"]["target_fps"] == daemon.controller.renderer.fps
+
+    log = client.flight_recorder_log()
+    assert log["fps"] == daemon.controller.renderer.fps
+    assert log["frames"]
+
+    path = tmp_path / "flight_recorder.stan"
+    assert client.dump_flight_recorder(str(path)) >= 1
+    assert path.read_bytes().startswith(b"STAN")
+    client.close()
+
+
+def test_frames_go_through_shared_memory(daemon: LEDDaemon) -> None:
+    """Test that the daemon shows the frames of the binary frame API.
+
+    Args:
+    ----
+        daemon (LEDDaemon): The running daemon
+    """
+    client = _client(daemon)
+    client.show_frame(bytes((0, 255, 0)) * 10)
+
+    deadline = time.monotonic() + 5
+    while daemon.controller.renderer.frame_source != "external":
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    assert (daemon.controller.renderer.frame == Color(0, 255, 0)).all()
+
+
+def test_client_without_daemon(tmp_path: Path, capsys: pytest.CaptureFixture) -> None:
+    """Test that the client reports a missing daemon instead of failing.
+
+    Args:
+    ----
+        tmp_path (Path): Directory without a daemon
+        capsys: Captured output
+    """
+    client = LEDDaemonClient(GEOMETRY, str(tmp_path / "leds.sock"), tmp_path / "f")
+
+    assert client.set_color(Color(255, 0, 0)) is None
+    client.show_frame(bytes(30))
+    assert capsys.readouterr().out.count("LED daemon unavailable") == 2
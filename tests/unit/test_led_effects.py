@@ -0,0 +1,106 @@
+"""Unit tests for the vectorized LED effect kernels."""
+
+import numpy as np
+import pytest
+
+from app.led_controller import Color
+from app.led_effects import (
+    WHEEL,
+    Effect,
+    SandglassEffect,
+    frame_from_bytes,
+    pack_rgb,
+    rainbow_frame,
+    solid_frame,
+    span_mask,
+    unpack_rgb,
+)
+
+
+def _wheel(pos: int) -> Color:
+    """Reference implementation of the rainbow wheel."""
+    if pos < 85:
+        return Color(pos * 3, 255 - pos * 3, 0)
+    if pos < 170:
+        pos -= 85
+        return Color(255 - pos * 3, 0, pos * 3)
+    pos -= 170
+    return Color(0, pos * 3, 255 - pos * 3)
+
+
+def test_wheel_lookup_table() -> None:
+    """Test that the wheel table matches the per-pixel implementation."""
+    assert WHEEL.shape == (256,)
+    assert WHEEL.tolist() == [_wheel(pos) for pos in range(256)]
+
+
+def test_rainbow_frame() -> None:
+    """Test the rainbow kernel against the original per-pixel loop."""
+    count = 104
+    for step in (0, 17, 255, 300):
+        expected = [_wheel((int(i * 256 / count) + step) & 255) for i in range(count)]
+        assert rainbow_frame(count, step).tolist() == expected
+
+
+def test_pack_unpack_roundtrip() -> None:
+    """Test packing and unpacking of color channels."""
+    frame = np.array([Color(255, 0, 0), Color(1, 2, 3), Color(0, 0, 0)])
+    channels = unpack_rgb(frame)
+
+    assert channels.tolist() == [[255, 0, 0], [1, 2, 3], [0, 0, 0]]
+    assert pack_rgb(*channels.T).tolist() == frame.tolist()
+
+
+def test_frame_from_bytes() -> None:
+    """Test packing a raw frame of RGB bytes."""
+    frame = frame_from_bytes(bytes((255, 0, 0, 1, 2, 3)), 2)
+    assert frame.tolist() == [Color(255, 0, 0), Color(1, 2, 3)]
+
+    with pytest.raises(ValueError, match="Expected 6 bytes"):
+        frame_from_bytes(bytes(5), 2)
+
+
+def test_solid_frame_and_span_mask() -> None:
+    """Test the solid frame and span mask kernels."""
+    assert solid_frame(4, Color(0, 0, 255)).tolist() == [255] * 4
+    assert span_mask(10, 0, 3).nonzero()[0].tolist() == [0, 1, 2]
+    assert span_mask(10, 5, 2).nonzero()[0].tolist() == [4, 5, 6]
+
+
+def test_sandglass_follows_elapsed_time() -> None:
+    """Test that the sandglass is computed from the elapsed time."""
+    sandglass = SandglassEffect(duration=11, color=Color(0, 0, 255), hold=1)
+
+    colors, alpha = sandglass.render(0.5, 10)
+    assert (colors == Color(0, 0, 255)).all()
+    assert alpha.tolist() == [1.0] * 10
+
+    # Halfway the drain, the first five pixels are off
+    _, alpha = sandglass.render(6, 10)
+    assert alpha.tolist() == [0.0] * 5 + [1.0] * 5
+
+    # The boundary pixel fades out
+    _, alpha = sandglass.render(6.25, 10)
+    assert alpha[5] == 0.75
+
+    # The sandglass is empty exactly at the end of the duration
+    _, alpha = sandglass.render(11, 10)
+    assert not alpha.any()
+
+
+def test_sandglass_without_fade() -> None:
+    """Test that the boundary pixel switches off without fading."""
+    sandglass = SandglassEffect(duration=11, color=0, hold=1, fade=False)
+
+    _, alpha = sandglass.render(6.25, 10)
+    assert alpha.tolist() == [0.0] * 6 + [1.0] * 4
+
+
+def test_effect_without_render() -> None:
+    """Test that an effect must implement render to be created."""
+
+    class Incomplete(Effect):
+        name = "incomplete"
+
+    with pytest.raises(TypeError, match="render"):
+        Incomplete()
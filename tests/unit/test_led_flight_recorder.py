@@ -0,0 +1,63 @@
+"""Unit tests for the LED flight recorder."""
+
+from pathlib import Path
+
+import numpy as np
+
+from app.led_backends import VirtualBackend
+from app.led_controller import Color
+from app.led_effects import rainbow_frame
+from app.led_flight_recorder import FlightRecorder
+from app.led_recording import AnimationFile
+from app.led_renderer import LEDRenderer
+
+
+def test_ring_buffer_keeps_last_frames() -> None:
+    """Test that the oldest frames are overwritten once the buffer is full."""
+    recorder = FlightRecorder(10, capacity=4)
+    for step in range(6):
+        recorder.record(rainbow_frame(10, step), 100.0 + step, f"step{step}")
+
+    frames, timestamps, sources = recorder.snapshot()
+    assert len(recorder) == 4
+    assert recorder.nbytes == 4 * 10 * 4 + 4 * 8
+    assert timestamps.tolist() == [102.0, 103.0, 104.0, 105.0]
+    assert sources == ["step2", "step3", "step4", "step5"]
+    for index, step in enumerate(range(2, 6)):
+        assert np.array_equal(frames[index], rainbow_frame(10, step))
+
+    recorder.resize(0)
+    recorder.record(rainbow_frame(10, 0), 0.0, "frame")
+    assert len(recorder) == 0
+
+
+def test_dump_replays_at_original_pace(tmp_path: Path) -> None:
+    """Test that frames are held until the next one, with long gaps capped."""
+    recorder = FlightRecorder(10, capacity=8)
+    recorder.record(rainbow_frame(10, 0), 0.0, "frame")
+    recorder.record(rainbow_frame(10, 1), 0.1, "frame")
+    recorder.record(rainbow_frame(10, 2), 60.0, "frame")
+
+    path = tmp_path / "flight.stan"
+    assert recorder.dump(path, 50, max_gap=0.5) == 5 + 25 + 1
+    with AnimationFile(path) as recording:
+        assert (recording.count, recording.fps, len(recording)) == (10, 50, 31)
+        assert np.array_equal(recording.frame(4), rainbow_frame(10, 0))
+        assert np.array_equal(recording.frame(5), rainbow_frame(10, 1))
+        assert np.array_equal(recording.frame(30), rainbow_frame(10, 2))
+
+    assert FlightRecorder(10).dump(tmp_path / "empty.stan", 50) == 0
+
+
+def test_renderer_records_committed_frames() -> None:
+    """Test that the renderer records every written frame with its source."""
+    renderer = LEDRenderer(VirtualBackend(10), 10)
+    renderer.fill(Color(255, 0, 0), source="set_color")
+    renderer.commit()
+    renderer.commit()
+    renderer.set_frame(rainbow_frame(10, 0))
+    renderer.commit()
+
+    frames, _, sources = renderer.flight_recorder.snapshot()
+    assert sources == ["set_color", "frame"]
+    assert (frames[0] == Color(255, 0, 0)).all()
@@ -0,0 +1,83 @@
+"""Unit tests for the Meeloper follow effect."""
+
+import numpy as np
+import pytest
+
+from app.led_controller import Color
+from app.led_follow import FollowEffect
+
+
+def test_prediction_between_triggers() -> None:
+    """Test that the segment keeps moving between two sensors."""
+    follow = FollowEffect(Color(255, 0, 0))
+    follow.trigger(97, 0.0)
+    # One trigger gives a position, but no speed yet
+    assert follow.position_at(0.5) == 97
+
+    follow.trigger(77, 1.0)
+    assert follow.speed == pytest.approx(-20)
+    assert follow.position_at(1.5) == pytest.approx(67)
+
+    # A trigger on time keeps the speed, the prediction was right
+    follow.trigger(57, 2.0)
+    assert follow.speed == pytest.approx(-20)
+    assert follow.position_at(2.25) == pytest.approx(52)
+
+
+def test_prediction_is_corrected() -> None:
+    """Test that a late trigger slows the estimate down."""
+    follow = FollowEffect(Color(255, 0, 0), alpha=0.5, beta=0.5)
+    follow.trigger(97, 0.0)
+    follow.trigger(77, 1.0)
+    follow.trigger(57, 2.0)
+    follow.trigger(37, 4.0)
+
+    assert -20 < follow.speed < -10
+    # The prediction stops after the horizon instead of running off the stair
+    assert follow.position_at(100) == follow.position_at(4 + follow.horizon)
+
+
+def test_zero_speed_is_an_estimate() -> None:
+    """Test that a walker that stands still is filtered like any other speed."""
+    follow = FollowEffect(Color(255, 0, 0), alpha=0.5, beta=0.5)
+    follow.trigger(57, 0.0)
+    follow.trigger(57, 1.0)
+    assert follow.speed == 0.0
+
+    # The third trigger corrects the estimate instead of starting over
+    follow.trigger(47, 2.0)
+    assert follow.speed == pytest.approx(-5)
+    assert follow.position_at(2.0) == pytest.approx(52)
+
+
+def test_render_segment() -> None:
+    """Test that the segment is drawn around the predicted position."""
+    follow = FollowEffect(Color(0, 0, 255), length=4)
+    _, alpha = follow.render(0, 20)
+    assert not alpha.any()
+
+    follow.trigger(10, 0)
+    colors, alpha = follow.render(0, 20)
+    assert np.flatnonzero(alpha == 1).tolist() == [9, 10, 11]
+    assert alpha[8] == alpha[12] == 0.5
+    assert (colors == Color(0, 0, 255)).all()
+
+    # Between two pixels the edges are partly lit
+    follow.trigger(11, 1)
+    _, alpha = follow.render(1.25, 20)
+    assert np.flatnonzero(alpha == 1).tolist() == [10, 11, 12]
+    assert alpha[9] == pytest.approx(0.25)
+    assert alpha[13] == pytest.approx(0.75)
+
+
+def test_fade_out_after_timeout() -> None:
+    """Test that the effect fades out and ends without triggers."""
+    follow = FollowEffect(Color(0, 0, 255), timeout=2)
+    follow.trigger(10, 0)
+    assert follow.render(1.75, 20)[1].max() == pytest.approx(0.5)
+    assert not follow.is_finished(1.9)
+    assert follow.is_finished(2)
+
+    # A walker that comes back after the timeout starts a new estimate
+    follow.trigger(50, 5)
+    assert follow.speed == 0
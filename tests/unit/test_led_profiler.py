@@ -0,0 +1,66 @@
+"""Unit tests for the LED render profiler."""
+
+import pytest
+
+from app.led_backends import VirtualBackend
+from app.led_clock import VirtualClock
+from app.led_controller import Color, LEDController
+from app.led_effects import RippleEffect
+from app.led_benchmark import run_benchmark
+from app.led_profiler import HISTOGRAM_EDGES_MS, FrameTimer, RenderProfiler
+from app.led_renderer import LEDRenderer
+
+
+def test_frame_timer_percentiles() -> None:
+    """Test the percentiles, histogram and budget over the rolling window."""
+    timer = FrameTimer(window=100)
+    assert timer.stats()["p99_ms"] == 0
+
+    for duration in range(1, 201):
+        timer.record(duration / 10000)
+
+    stats = timer.stats(budget=0.015)
+    assert stats["count"] == 200
+    assert stats["mean_ms"] == pytest.approx(10.05)
+    # Only the last 100 durations (10.1 to 20 ms) are in the window
+    assert stats["p50_ms"] == pytest.approx(15.05)
+    assert stats["p99_ms"] == pytest.approx(19.901)
+    assert stats["max_ms"] == pytest.approx(20)
+    assert stats["over_budget"] == 50
+    assert len(stats["histogram"]) == len(HISTOGRAM_EDGES_MS) - 1
+    assert sum(stats["histogram"]) == 100
+
+
+def test_renderer_profiles_layers_and_commits() -> None:
+    """Test that every layer and every backend write is measured."""
+    renderer = LEDRenderer(VirtualBackend(10), 10)
+    renderer.add_layer(RippleEffect(5, 3, Color(255, 0, 0), 0.1))
+    renderer.commit()
+    renderer.commit()
+
+    stats = renderer.profiler.stats()
+    assert stats["budget_ms"] == pytest.approx(16.667)
+    assert stats["effects"]["ripple"]["count"] == 2
+    assert stats["frame"]["count"] == stats["commit"]["count"] == 1
+
+    renderer.profiler.reset()
+    assert renderer.profiler.stats()["effects"] == {}
+    assert isinstance(renderer.profiler, RenderProfiler)
+
+
+def test_benchmark_on_virtual_clock() -> None:
+    """Test that a minute on the stair is rendered without waiting."""
+    controller = LEDController(104, 18, 800000, 10, 255, False, 0, fps=30)  # noqa: FBT003
+    with pytest.raises(TypeError, match="virtual clock"):
+        run_benchmark(controller)
+
+    controller.set_clock(VirtualClock())
+    controller.start(backend="virtual")
+    stats = run_benchmark(controller, 60)
+    controller.stop()
+
+    assert stats["frames"] == 1800
+    assert controller.clock.now() == pytest.approx(60)
+    assert set(stats["effects"]) == {"meeloper", "rainbow", "ripple_field", "sandglass"}
+    assert stats["effects"]["rainbow"]["count"] == 1800
+    assert stats["commit"]["count"] > 0
@@ -0,0 +1,221 @@
+"""Unit tests for the declarative LED effect programs."""
+
+import numpy as np
+import pytest
+
+from app.const import STAIR_GEOMETRY, AnimationStatus, BlendMode
+from app.led_clock import VirtualClock
+from app.led_controller import Color, LEDController
+from app.led_effects import unpack_rgb
+from app.led_programs import EffectProgram, parse_color
+from app.stair_geometry import StairGeometry
+
+GEOMETRY = StairGeometry.from_dict(STAIR_GEOMETRY)
+
+
+def test_parse_color() -> None:
+    """Test the color notations of effect programs."""
+    assert parse_color("#ff8000").tolist() == [255, 128, 0]
+    assert parse_color([0, 300, 10]).tolist() == [0, 255, 10]
+    assert parse_color(0x0000FF).tolist() == [0, 0, 255]
+    with pytest.raises(ValueError, match="Invalid color"):
+        parse_color("red")
+
+
+def test_layers_stack_in_zones() -> None:
+    """Test that later layers cover earlier ones inside their zone only."""
+    program = EffectProgram(
+        {
+            "layers": [
+                {"type": "solid", "color": "#0000ff"},
+                {"type": "solid", "color": "#ff0000", "zone": {"steps": [1]}},
+                {"type": "solid", "color": "#00ff00", "zone": {"start": 0, "end": 2}},
+            ],
+        },
+        104,
+        GEOMETRY,
+    )
+    colors, alpha = program.render(0, 104)
+
+    assert (alpha == 1).all()
+    assert colors[:2].tolist() == [Color(0, 255, 0)] * 2
+    assert colors[50] == Color(0, 0, 255)
+    assert colors[94:].tolist() == [Color(255, 0, 0)] * 10
+
+
+def test_fades_and_timing() -> None:
+    """Test the delay, the duration and the eased fades of a layer."""
+    program = EffectProgram(
+        {
+            "duration": 4,
+            "layers": [
+                {
+                    "type": "solid",
+                    "color": "#ffffff",
+                    "delay": 1,
+                    "duration": 2,
+                    "fade_in": 1,
+                    "fade_out": 0.5,
+                    "easing": "ease_in",
+                },
+            ],
+        },
+        10,
+    )
+
+    assert program.duration == 4
+    assert program.render(0.5, 10)[1].max() == 0
+    assert program.render(1.5, 10)[1][0] == pytest.approx(0.25)
+    assert program.render(2.5, 10)[1][0] == pytest.approx(1)
+    assert program.render(2.75, 10)[1][0] == pytest.approx(0.25)
+    assert program.render(3, 10)[1].max() == 0
+
+
+def test_moving_segment_and_gradient() -> None:
+    """Test a bouncing segment on top of a scrolling gradient."""
+    program = EffectProgram(
+        {
+            "layers": [
+                {"type": "gradient", "colors": ["#000000", "#ff0000"], "speed": 1},
+                {
+                    "type": "segment",
+                    "color": [0, 0, 255],
+                    "length": 1,
+                    "from": 0,
+                    "to": 9,
+                    "travel": 1,
+                    "repeat": "bounce",
+                },
+            ],
+        },
+        10,
+    )
+    colors, _ = program.render(0, 10)
+    rgb = unpack_rgb(colors)
+    assert rgb[0].tolist() == [0, 0, 255]
+    assert rgb[1:, 0].tolist() == [round(255 * i / 9) for i in range(1, 10)]
+
+    colors, _ = program.render(1.5, 10)
+    assert unpack_rgb(colors)[4, 2] == pytest.approx(255 / 2, abs=1)
+    # The gradient moved one and a half pixel
+    assert unpack_rgb(colors)[2, 0] == round(255 * 0.5 / 9)
+
+
+def test_triggers_are_relative_to_the_sensor() -> None:
+    """Test that a trigger lights up around the sensor that fired."""
+    program = EffectProgram(
+        {
+            "name": "splash",
+            "blend": "max",
+            "triggers": [
+                {
+                    "sensor": "any",
+                    "layers": [
+                        {
+                            "type": "solid",
+                            "color": "#ffffff",
+                            "zone": {"start": -2, "end": 3},
+                            "duration": 1,
+                        },
+                    ],
+                },
+            ],
+        },
+        104,
+        GEOMETRY,
+    )
+    assert program.name == "splash"
+    assert program.blend == BlendMode.MAX
+    assert program.render(0, 104)[1].max() == 0
+    assert not program.trigger(7, 0)
+
+    assert program.trigger(3, 1.0)
+    alpha = program.render(1.5, 104)[1]
+    assert np.flatnonzero(alpha).tolist() == [55, 56, 57, 58, 59]
+    assert program.render(2.0, 104)[1].max() == 0
+
+
+@pytest.mark.parametrize(
+    ("spec", "error"),
+    [
+        ({"layers": [{"type": "sparkle"}]}, "Invalid layer type"),
+        ({"layers": [{"type": "solid"}]}, "Missing 'color'"),
+        ({"layers": [{"type": "solid", "color": 0, "easing": "wobble"}]}, "easing"),
+        ({"blend": "multiply"}, "Invalid blend"),
+        ({"triggers": [{"sensor": 9}]}, "Unknown sensor 9"),
+        (
+            {"triggers": [{"layers": [{"type": "solid", "color": 0}]}]},
+            "needs a duration",
+        ),
+        ({"layers": [{"type": "pulse", "color": 0, "period": 0}]}, "period"),
+        ({"layers": [{"type": "solid", "color": 0, "duration": "5s"}]}, "duration"),
+        ({"layers": [{"type": "solid", "color": 0, "zone": {"steps": [40]}}]}, "step"),
+        ({"layers": [{"type": "solid", "color": 0, "zone": {"steps": 3}}]}, "solid"),
+        ({"layers": ["solid"]}, "Invalid layer"),
+        ({"triggers": [{"sensor": [1]}]}, "Unknown sensor"),
+        ({"duration": -1}, "above 0"),
+    ],
+)
+def test_invalid_programs(spec: dict, error: str) -> None:
+    """Test that mistakes in a description are reported when compiling."""
+    with pytest.raises(ValueError, match=error):
+        EffectProgram(spec, 104, GEOMETRY)
+
+
+def test_numbers_are_converted() -> None:
+    """Test that numbers given as strings are compiled to floats."""
+    program = EffectProgram(
+        {"layers": [{"type": "solid", "color": 0, "duration": "5"}]},
+        104,
+        GEOMETRY,
+    )
+    assert program.layers[0].duration == 5.0
+    assert program.layers[0].level(5.0) == 0.0
+
+
+def test_controller_plays_program() -> None:
+    """Test that the controller runs a program and passes triggers on."""
+    controller = LEDController(104, 18, 800000, 10, 255, False, 0, fps=10)  # noqa: FBT003
+    controller.set_clock(VirtualClock())
+    controller.start(backend="virtual")
+    assert not controller.trigger_program(1)
+
+    animation = controller.play_program(
+        {
+            "name": "flash",
+            "duration": 2,
+            "triggers": [
+                {
+                    "sensor": 1,
+                    "layers": [{"type": "solid", "color": "#ffffff", "duration": 1}],
+                },
+            ],
+        },
+    )
+    assert controller.trigger_program(1)
+    assert not controller.trigger_program(2)
+    assert animation.join(5)
+    controller.stop()
+    assert animation.status == AnimationStatus.FINISHED
+
+
+def test_controller_replaces_program() -> None:
+    """Test that a new program cancels the one that is still running."""
+    controller = LEDController(104, 18, 800000, 10, 255, False, 0, fps=10)  # noqa: FBT003
+    controller.start(backend="virtual")
+    spec = {
+        "triggers": [
+            {
+                "sensor": 1,
+                "layers": [{"type": "solid", "color": "#ffffff", "duration": 1}],
+            },
+        ],
+    }
+
+    first = controller.play_program({**spec, "name": "first"})
+    second = controller.play_program({**spec, "name": "second"})
+    assert first.status == AnimationStatus.CANCELLED
+    assert first.layer not in controller.renderer.compositor
+    assert controller.renderer.compositor.layers == [second.layer]
+    assert controller.trigger_program(1)
+    controller.stop()
@@ -0,0 +1,106 @@
+"""Unit tests for the binary LED animation files."""
+
+import time
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from app.led_backends import VirtualBackend
+from app.led_controller import Color, LEDController
+from app.led_effects import RippleEffect, rainbow_frame
+from app.led_recording import (
+    HEADER,
+    MAGIC,
+    VERSION,
+    AnimationFile,
+    AnimationRecorder,
+    record_effect,
+)
+from app.led_renderer import LEDRenderer
+
+
+def test_record_and_map(tmp_path: Path) -> None:
+    """Test that recorded frames are read back from the memory map."""
+    path = tmp_path / "rainbow.stan"
+    with AnimationRecorder(path, 10, 30) as recorder:
+        for step in range(5):
+            recorder.write(rainbow_frame(10, step))
+
+    assert path.stat().st_size == HEADER.size + 5 * 10 * 4
+    with AnimationFile(path) as recording:
+        assert (recording.count, recording.fps, len(recording)) == (10, 30, 5)
+        assert recording.duration == pytest.approx(5 / 30)
+        for step in range(5):
+            assert np.array_equal(recording.frame(step), rainbow_frame(10, step))
+
+
+def test_invalid_files(tmp_path: Path) -> None:
+    """Test that files without a valid header are rejected."""
+    path = tmp_path / "invalid.stan"
+    path.write_bytes(b"nope")
+    with pytest.raises(ValueError, match="Not an LED animation file"):
+        AnimationFile(path)
+
+    with AnimationRecorder(path, 10, 30) as recorder:
+        recorder.write(rainbow_frame(10, 0))
+    path.write_bytes(path.read_bytes()[:-4])
+    with pytest.raises(ValueError, match="truncated"):
+        AnimationFile(path)
+
+    path.write_bytes(HEADER.pack(MAGIC, VERSION, 10, 0, 0))
+    with pytest.raises(ValueError, match="no frame rate"):
+        AnimationFile(path)
+
+
+def test_record_effect(tmp_path: Path) -> None:
+    """Test that an effect is rendered offline at the requested frame rate."""
+    path = tmp_path / "ripple.stan"
+    ripple = RippleEffect(5, 3, Color(255, 0, 0), 0.1)
+
+    assert record_effect(ripple, path, 10, 20) == 12
+    with AnimationFile(path) as recording:
+        assert recording.frame(0).tolist()[4:7] == [0, Color(255, 0, 0), 0]
+        assert not recording.frame(11).any()
+
+
+def test_renderer_records_every_tick(tmp_path: Path) -> None:
+    """Test that the renderer records static frames instead of idling."""
+    path = tmp_path / "live.stan"
+    renderer = LEDRenderer(VirtualBackend(10), 10, fps=50)
+    renderer.fill(Color(0, 0, 255))
+    renderer.start_recording(path)
+    renderer.start()
+    time.sleep(0.3)
+    frames = renderer.stop_recording()
+    renderer.stop()
+
+    assert frames >= 5
+    with AnimationFile(path) as recording:
+        assert len(recording) == frames
+        assert (recording.frames == Color(0, 0, 255)).all()
+    assert renderer.stop_recording() == 0
+
+
+def test_controller_plays_animation(tmp_path: Path) -> None:
+    """Test that the controller plays a file at its recorded frame rate."""
+    path = tmp_path / "rainbow.stan"
+    with AnimationRecorder(path, 10, 50) as recorder:
+        for step in range(10):
+            recorder.write(rainbow_frame(10, step))
+
+    controller = LEDController(10, 18, 800000, 10, 255, False, 0)  # noqa: FBT003
+    controller.start(backend="virtual")
+    started = time.monotonic()
+    assert controller.play_animation(str(path))
+    elapsed = time.monotonic() - started
+    assert np.array_equal(controller.renderer.frame, rainbow_frame(10, 9))
+    assert elapsed == pytest.approx(0.2, abs=0.05)
+
+    short = LEDController(5, 18, 800000, 10, 255, False, 0)  # noqa: FBT003
+    short.start(backend="virtual")
+    with pytest.raises(ValueError, match="has 10 LEDs"):
+        short.play_animation(str(path))
+    short.stop()
+    controller.stop()
+    assert controller.animations.running == []
@@ -0,0 +1,86 @@
+"""Unit tests for the LEDRenderer class."""
+
+import time
+
+from app.led_backends import VirtualBackend
+from app.led_controller import Color
+from app.led_effects import RippleEffect
+from app.led_renderer import LEDRenderer
+
+
+def test_renderer_commit_single_write() -> None:
+    """Test that a commit pushes the whole frame with one backend write."""
+    backend = VirtualBackend(10)
+    renderer = LEDRenderer(backend, count=10, fps=60)
+    renderer.fill(Color(255, 0, 0), 2, 5)
+    renderer.set_pixel(9, Color(0, 0, 255))
+    renderer.set_pixel(42, Color(0, 0, 255))  # Out of range, ignored
+
+    renderer.commit()
+
+    assert backend.frames_written == 1
+    assert backend.frame.tolist() == [0, 0] + [Color(255, 0, 0)] * 3 + [0] * 4 + [
+        Color(0, 0, 255),
+    ]
+    assert renderer.frames_committed == 1
+
+
+def test_renderer_skips_unchanged_frames() -> None:
+    """Test that a frame that did not change is not written again."""
+    backend = VirtualBackend(10)
+    renderer = LEDRenderer(backend, count=10, fps=60)
+
+    assert renderer.commit() is True
+    renderer.fill(0)
+    assert renderer.commit() is False
+    renderer.set_pixel(3, Color(0, 255, 0))
+    assert renderer.commit() is True
+
+    assert backend.frames_written == 2
+    assert renderer.frames_skipped == 1
+
+
+def test_renderer_thread_caps_frame_rate() -> None:
+    """Test that the render thread never exceeds the configured frame rate."""
+    backend = VirtualBackend(10)
+    renderer = LEDRenderer(backend, count=10, fps=20)
+    renderer.start()
+    assert renderer.is_running is True
+
+    # A long running layer keeps the renderer at the target frame rate
+    renderer.add_layer(RippleEffect(5, 10, Color(0, 0, 255), 0.02), ttl=0.5)
+    time.sleep(0.25)
+    assert 3 <= renderer.current_fps <= 7
+
+    # Many writes between two frames never cause extra writes to the strip
+    for i in range(1000):
+        renderer.set_pixel(i % 10, Color(0, 255, 0))
+    time.sleep(0.1)
+    renderer.stop()
+
+    assert renderer.is_running is False
+    assert 3 <= backend.frames_written <= 9
+
+
+def test_renderer_idles_when_static() -> None:
+    """Test that the renderer stops writing frames when nothing changes."""
+    backend = VirtualBackend(10)
+    renderer = LEDRenderer(backend, count=10, fps=100)
+    renderer.start()
+
+    renderer.fill(Color(255, 0, 0))
+    time.sleep(0.1)
+    assert renderer.stats["idle"] is True
+    frames_written = backend.frames_written
+
+    # No frames while idle, even when the same color is set again
+    renderer.fill(Color(255, 0, 0))
+    time.sleep(0.1)
+    assert backend.frames_written == frames_written
+
+    # The renderer wakes up as soon as the frame changes
+    renderer.set_pixel(0, Color(0, 0, 255))
+    time.sleep(0.1)
+    renderer.stop()
+    assert backend.frames_written == frames_written + 1
+    assert backend.frame[0] == Color(0, 0, 255)
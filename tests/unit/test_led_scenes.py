@@ -0,0 +1,90 @@
+"""Unit tests for the stored LED scenes."""
+
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from app.led_controller import Color
+from app.led_scenes import SceneCache, compile_scene
+from app.stair_geometry import StairGeometry
+
+GEOMETRY = StairGeometry(10, 2, 5, {1: {"led": 9, "step": 1}})
+
+
+def test_compile_scene() -> None:
+    """Test that the frame and the layers are flattened into one frame."""
+    frame = compile_scene(
+        {
+            "frame": ["#ff0000", [0, 255, 0]],
+            "layers": [
+                # Timing is ignored, the layer shows right away
+                {"type": "solid", "color": "#0000ff", "zone": {"steps": [1]}},
+                {"type": "solid", "color": "#ffffff", "fade_in": 5, "delay": 2,
+                 "zone": {"start": 8}, "opacity": 0.5},
+            ],
+        },
+        10,
+        GEOMETRY,
+    )
+
+    assert frame.tolist()[:2] == [Color(255, 0, 0), Color(0, 255, 0)]
+    assert frame.tolist()[2:5] == [0, 0, 0]
+    assert frame.tolist()[5:8] == [Color(0, 0, 255)] * 3
+    assert frame.tolist()[8:] == [Color(128, 128, 255)] * 2
+    assert not frame.flags.writeable
+
+
+def test_invalid_scenes() -> None:
+    """Test that invalid scenes are rejected with a readable error."""
+    with pytest.raises(ValueError, match="11 pixels"):
+        compile_scene({"frame": ["#000000"] * 11}, 10)
+    with pytest.raises(ValueError, match="Invalid color"):
+        compile_scene({"frame": ["red"]}, 10)
+    with pytest.raises(ValueError, match="JSON object"):
+        compile_scene([], 10)
+    with pytest.raises(ValueError, match="list of colors"):
+        compile_scene({"frame": 5}, 10)
+    with pytest.raises(ValueError, match="list of JSON objects"):
+        compile_scene({"layers": ["solid"]}, 10)
+    with pytest.raises(ValueError, match="list of JSON objects"):
+        compile_scene({"layers": {"type": "solid"}}, 10)
+
+
+def test_scene_cache() -> None:
+    """Test that a scene is compiled once until it is invalidated."""
+    cache = SceneCache()
+    blue = {"layers": [{"type": "solid", "color": "#0000ff"}]}
+
+    frame = cache.get_or_compile(1, blue, 10)
+    assert cache.get_or_compile(1, {"frame": ["#ff0000"]}, 10) is frame
+    assert cache.counters == {"hits": 1, "misses": 1}
+
+    assert cache.invalidate(1) is True
+    assert cache.invalidate(1) is False
+    red = cache.get_or_compile(1, {"frame": ["#ff0000"]}, 10)
+    assert red[0] == Color(255, 0, 0)
+    assert np.count_nonzero(red) == 1
+    assert len(cache) == 1
+
+
+def test_invalidate_during_compile() -> None:
+    """Test that a scene edited while it compiles is not cached stale."""
+    cache = SceneCache()
+
+    def edited_while_compiling(*args: object) -> np.ndarray:
+        cache.invalidate(1)
+        return compile_scene(*args)
+
+    with patch("app.led_scenes.compile_scene", side_effect=edited_while_compiling):
+        stale = cache.get_or_compile(1, {"frame": ["#ff0000"]}, 10)
+    assert stale[0] == Color(255, 0, 0)
+    assert 1 not in cache
+
+    with patch("app.led_scenes.compile_scene", side_effect=lambda *_: cache.clear()):
+        cache.get_or_compile(2, {}, 10)
+    assert len(cache) == 0
+
+    fresh = cache.get_or_compile(1, {"frame": ["#00ff00"]}, 10)
+    assert fresh[0] == Color(0, 255, 0)
+    assert 1 in cache
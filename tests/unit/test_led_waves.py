@@ -0,0 +1,91 @@
+"""Unit tests for the wave simulation ripples."""
+
+import numpy as np
+
+from app.led_controller import Color
+from app.led_effects import unpack_rgb
+from app.led_waves import RippleField
+
+
+def run(field: RippleField, seconds: float, fps: int = 60) -> np.ndarray:
+    """Render the field frame by frame and return the last alpha."""
+    alpha = np.zeros(field.count, dtype=np.float32)
+    for frame in range(1, round(seconds * fps) + 1):
+        _, alpha = field.render(frame / fps, field.count)
+    return alpha
+
+
+def test_drop_spreads_in_both_directions() -> None:
+    """Test that a drop splits into two waves that travel outwards."""
+    field = RippleField(100, speed=40)
+    field.add_drop(50, Color(0, 0, 255))
+
+    alpha = run(field, 0.5)
+    lit = np.flatnonzero(alpha > 0.1)
+    # After half a second both crests are about 20 pixels from the center
+    assert abs(lit.min() - 30) <= 4
+    assert abs(lit.max() - 70) <= 4
+    assert alpha[50] < 0.1
+
+
+def test_render_keeps_the_color() -> None:
+    """Test that the crests are rendered at full color with an alpha."""
+    field = RippleField(20)
+    field.add_drop(10, Color(0, 128, 255))
+
+    colors, alpha = field.render(0, 20)
+    assert alpha[10] == 1.0
+    assert unpack_rgb(colors)[10].tolist() == [0, 128, 255]
+    assert alpha[0] == 0.0
+    assert colors[0] == 0
+
+
+def test_drops_superimpose() -> None:
+    """Test that two drops add up in one field instead of overwriting."""
+    single = RippleField(60)
+    single.add_drop(20, Color(255, 0, 0))
+    run(single, 0.25)
+
+    double = RippleField(60)
+    double.add_drop(20, Color(255, 0, 0))
+    double.add_drop(40, Color(255, 0, 0))
+    run(double, 0.25)
+
+    # Where the waves meet the amplitude is larger than either wave alone
+    assert double.energy > single.energy
+    assert abs(double._field[0, 30]) > abs(single._field[0, 30])  # noqa: SLF001
+
+
+def test_field_fades_out() -> None:
+    """Test that the waves are damped and absorbed at the ends of the strip."""
+    field = RippleField(100, decay=1.5)
+    field.add_drop(50, Color(255, 255, 255))
+    assert not field.is_finished(0)
+
+    run(field, 8)
+    assert field.is_finished(8)
+    assert field.render(8, 100)[1].max() == 0.0
+
+
+def test_render_skips_ahead_when_behind() -> None:
+    """Test that a long gap between frames does not simulate a backlog."""
+    field = RippleField(30)
+    field.add_drop(15, Color(255, 0, 0))
+    field.render(60, 30)
+    assert field._sim_time <= 60  # noqa: SLF001
+    assert field._sim_time > 59.8  # noqa: SLF001
+
+
+def test_drop_on_a_retired_field() -> None:
+    """Test that a drop reports a field that already told it is finished."""
+    field = RippleField(30)
+    assert field.add_drop(15, Color(255, 0, 0))
+    run(field, 8)
+    assert field.is_finished(8)
+
+    # The compositor removes the layer, even though the drop is pending
+    assert not field.add_drop(15, Color(255, 0, 0))
+    assert field.is_finished(8)
+    field.rewind()
+    assert not field.is_finished(0)
+    assert field.add_drop(15, Color(255, 0, 0))
@@ -1,19 +1,29 @@
 """Unit tests for the LEDController class."""
 
-from unittest.mock import MagicMock, patch
+import threading
+import time
+from unittest.mock import patch
 
+import numpy as np
+import pytest
+
+from app.const import AnimationStatus
+from app.led_backends import VirtualBackend
+from app.led_clock import VirtualClock
 from app.led_controller import Color, Direction, LEDController
+from app.led_effects import rainbow_frame
 
 
-def test_led_controller_color_wipe(mock_strip: MagicMock) -> None:
-    """Test the color_wipe method of the LEDController class.
+@pytest.fixture(name="controller")
+def setup_controller() -> LEDController:
+    """Create a LEDController that renders to a virtual strip.
 
-    Args:
-    ----
-        mock_strip (MagicMock): The mocked LED strip.
+    Returns
+    -------
+        LEDController: Controller with a running render thread
     """
     controller = LEDController(
-        count=mock_strip.numPixels(),
+        count=10,
         pin=18,
         freq_hz=800000,
         dma=10,
@@ -21,41 +31,69 @@ def test_led_controller_color_wipe(mock_strip: MagicMock) -> None:
         brightness=255,
         channel=0,
     )
-    controller.start()
+    controller.start(backend="virtual")
+    yield controller
+    controller.stop()
+
+
+@pytest.fixture(name="virtual_controller")
+def setup_virtual_controller() -> LEDController:
+    """Create a LEDController that runs its animations on a virtual clock.
+
+    The render thread still commits every frame, a low frame rate keeps
+    long animations quick.
+
+    Returns
+    -------
+        LEDController: Controller that plays animations without waiting
+    """
+    controller = LEDController(10, 18, 800000, 10, 255, False, 0, fps=5)  # noqa: FBT003
+    controller.set_clock(VirtualClock())
+    controller.start(backend="virtual")
+    yield controller
+    controller.stop()
+
+
+def test_led_controller_color_wipe(virtual_controller: LEDController) -> None:
+    """Test the color_wipe method of the LEDController class.
+
+    Args:
+    ----
+        virtual_controller (LEDController): The LED controller.
+    """
+    controller = virtual_controller
+    controller.stop()
+    frames_written = controller.backend.frames_written
 
     color = Color(0, 255, 0)
     controller.color_wipe(color, wait_ms=50, direction=Direction.BOTTOM_TO_TOP)
+    assert controller.clock.now() == pytest.approx(0.5)
+
+    # The effect only writes the frame buffer, the renderer pushes it
+    assert (controller.renderer.frame == color).all()
+    assert controller.backend.frames_written == frames_written
 
-    assert mock_strip.setPixelColor.call_count == 10
-    assert mock_strip.show.call_count == 10
+    controller.renderer.commit()
+    assert (controller.backend.frame == color).all()
+    assert controller.backend.frames_written == frames_written + 1
 
 
-def test_led_controller_one_led(mock_strip: MagicMock) -> None:
+def test_led_controller_one_led(controller: LEDController) -> None:
     """Test the one_led method of the LEDController class.
 
     Args:
     ----
-        mock_strip (MagicMock): The mocked LED strip.
+        controller (LEDController): The LED controller.
     """
-    # Arrange
-    controller = LEDController(
-        count=mock_strip.numPixels(),
-        pin=18,
-        freq_hz=800000,
-        dma=10,
-        invert=False,
-        brightness=255,
-        channel=0,
-    )
-    controller.start()
-
     # Act
     color = Color(255, 0, 0)
     led_number = 5
     controller.one_led(color, led_number)
+    controller.stop()
 
     # Assert
-    assert mock_strip.setPixelColor.call_count == 1
+    assert controller.backend.frame[led_number] == color
+    assert np.count_nonzero(controller.backend.frame) == 1
 
 
 # def test_led_controller_rainbow(mock_strip: MagicMock) -> None:
@@ -84,28 +122,20 @@ def test_led_controller_one_led(mock_strip: MagicMock) -> None:
 #     assert mock_strip.setPixelColor.call_count == 2560
 
 
-def test_led_controller_set_sensor_led(mock_strip: MagicMock) -> None:
+def test_led_controller_set_sensor_led(controller: LEDController) -> None:
     """Test the set_sensor_led method of the LEDController class.
 
     Args:
     ----
-        mock_strip (MagicMock): The mocked LED strip.
+        controller (LEDController): The LED controller.
     """
-    # Arrange
-    controller = LEDController(
-        count=mock_strip.numPixels(),
-        pin=18,
-        freq_hz=800000,
-        dma=10,
-        brightness=255,
-        invert=False,
-        channel=1,
-    )
-    controller.start()
-
     # Act
     color = Color(0, 255, 0)
 
+    controller.set_sensor_led(color, 6)
+    controller.stop()
+    assert np.flatnonzero(controller.backend.frame).tolist() == [0, 1, 2]
+
     # Test for an invalid Sensor ID
     invalid_sensor_id = 10
     with patch("builtins.print") as mock_print:
@@ -113,32 +143,227 @@ def test_led_controller_set_sensor_led(mock_strip: MagicMock) -> None:
         mock_print.assert_called_once_with(f"Invalid sensor ID: {invalid_sensor_id}")
 
 
-def test_led_controller_ripple_effect(mock_strip: MagicMock) -> None:
+def test_led_controller_ripple_effect(controller: LEDController) -> None:
     """Test the ripple_effect method of the LEDController class.
 
     Args:
     ----
-        mock_strip (MagicMock): The mocked LED strip.
+        controller (LEDController): The LED controller.
     """
-    controller = LEDController(
-        count=mock_strip.numPixels(),
-        pin=18,
-        freq_hz=800000,
-        dma=10,
-        brightness=255,
-        invert=False,
-        channel=1,
-    )
-    controller.start()
+    controller.backend = VirtualBackend(10, history=64)
+    controller.renderer.backend = controller.backend
 
     start_position = 5
     ripple_length = 3
     color = Color(255, 0, 0)
-    wait_ms = 10
+    wait_ms = 50
 
     controller.ripple_effect(start_position, ripple_length, color, wait_ms)
+    controller.stop()
+
+    # The ripple ran as a compositor layer and left the frame buffer untouched
+    frames = controller.backend.recent_frames()
+    assert (frames[:, start_position] == [255, 0, 0]).all(axis=1).any()
+    assert not controller.renderer.compositor.is_active
+    assert not controller.renderer.frame.any()
+
+
+def test_led_controller_ripple_drop(controller: LEDController) -> None:
+    """Test that drops share one ripple layer that is re-added after it ends.
+
+    Args:
+    ----
+        controller (LEDController): The LED controller.
+    """
+    compositor = controller.renderer.compositor
+    controller.ripple_drop(3, Color(0, 0, 255))
+    controller.ripple_drop(7, Color(0, 0, 255))
+    assert len(compositor.layers) == 1
+    layer = compositor.layers[0]
+
+    # The layer is removed once the waves faded out
+    assert layer.wait(15)
+    controller.ripple_drop(5, Color(0, 0, 255))
+    assert len(compositor.layers) == 1
+    assert compositor.layers[0] is not layer
+
+    with patch("builtins.print") as mock_print:
+        controller.ripple_drop(None, Color(0, 0, 255))
+        mock_print.assert_called_once_with("Ripple drop has no position")
+
+
+def test_ripple_drop_on_an_expiring_field(controller: LEDController) -> None:
+    """Test that a drop on a layer that is about to expire is not lost.
+
+    Args:
+    ----
+        controller (LEDController): The LED controller.
+    """
+    compositor = controller.renderer.compositor
+    controller.ripple_drop(3, Color(0, 0, 255))
+    layer = compositor.layers[0]
+
+    # The waves faded out and the compositor decided to drop the layer,
+    # but it did not remove it yet
+    field = controller.ripple_field
+    with field._lock:  # noqa: SLF001
+        field._field[:] = 0  # noqa: SLF001
+        field._previous[:] = 0  # noqa: SLF001
+    assert layer.is_expired(time.monotonic())
+    controller.ripple_drop(5, Color(0, 0, 255))
+
+    assert layer.wait(1)
+    assert len(compositor.layers) == 1
+    assert compositor.layers[0] is not layer
+    assert compositor.layers[0].effect is field
+
+
+def test_led_controller_follow_step(controller: LEDController) -> None:
+    """Test that the Meeloper segment runs as one layer for all triggers.
+
+    Args:
+    ----
+        controller (LEDController): The LED controller.
+    """
+    controller.follow_step(2, Color(255, 0, 0))
+    controller.follow_step(4, Color(255, 0, 0))
+    assert [animation.name for animation in controller.animations.running] == [
+        "meeloper",
+    ]
+    assert len(controller.renderer.compositor.layers) == 1
+
+    with patch("builtins.print") as mock_print:
+        controller.follow_step(None, Color(255, 0, 0))
+        mock_print.assert_called_once_with("Meeloper step has no position")
+
+
+def test_led_controller_falls_back_to_virtual_strip() -> None:
+    """Test that a strip that fails to initialize is replaced by a virtual one."""
+    controller = LEDController(10, 18, 800000, 10, 255, False, 0)  # noqa: FBT003
+    with patch("builtins.print"):
+        controller.start()
+    controller.stop()
+
+    assert isinstance(controller.backend, VirtualBackend)
+
+
+def test_led_controller_sandglass(controller: LEDController) -> None:
+    """Test that the sandglass finishes after its duration.
+
+    Args:
+    ----
+        controller (LEDController): The LED controller.
+    """
+    started = time.monotonic()
+    animation = controller.sandglass(0.3, Color(0, 0, 255))
+    assert animation.status == AnimationStatus.RUNNING
+    assert animation.join(1)
+    elapsed = time.monotonic() - started
+
+    assert 0.3 <= elapsed < 0.5
+    assert animation.status == AnimationStatus.FINISHED
+    assert not controller.renderer.compositor.is_active
+
+
+def test_led_controller_virtual_sandglass(virtual_controller: LEDController) -> None:
+    """Test that a ten minute sandglass runs without waiting ten minutes.
+
+    Args:
+    ----
+        virtual_controller (LEDController): The LED controller.
+    """
+    controller = virtual_controller
+    animation = controller.sandglass(600, Color(0, 0, 255))
+
+    assert animation.join(5)
+    assert controller.clock.now() == pytest.approx(600, abs=0.5)
+    assert animation.status == AnimationStatus.FINISHED
+
+
+def test_led_controller_virtual_rainbow(virtual_controller: LEDController) -> None:
+    """Test that the rainbow keeps its timing on the virtual clock.
+
+    Args:
+    ----
+        virtual_controller (LEDController): The LED controller.
+    """
+    controller = virtual_controller
+    started = controller.clock.now()
+    assert controller.rainbow(wait_ms=20)
+
+    assert controller.clock.now() - started == pytest.approx(256 * 0.02, abs=0.05)
+    assert np.array_equal(controller.renderer.frame, rainbow_frame(10, 255))
+
+
+def test_led_controller_rainbow_is_cached(controller: LEDController) -> None:
+    """Test that the rainbow frames are rendered once and then replayed.
+
+    Args:
+    ----
+        controller (LEDController): The LED controller.
+    """
+    controller.rainbow(wait_ms=0)
+    controller.rainbow(wait_ms=0)
+
+    assert controller.frame_cache.stats["misses"] == 1
+    assert controller.frame_cache.stats["hits"] == 1
+    assert np.array_equal(controller.renderer.frame, rainbow_frame(10, 255))
+
+
+def test_led_controller_trigger_preempts_rainbow(controller: LEDController) -> None:
+    """Test that a trigger effect stops a background animation right away.
+
+    Args:
+    ----
+        controller (LEDController): The LED controller.
+    """
+    rainbow = threading.Thread(target=controller.rainbow, kwargs={"wait_ms": 50})
+    rainbow.start()
+    time.sleep(0.1)
+    assert [animation.name for animation in controller.animations.running] == [
+        "rainbow",
+    ]
+
+    controller.ripple_drop(5, Color(0, 0, 255))
+    rainbow.join(0.5)
+    assert not rainbow.is_alive()
+    assert [animation.name for animation in controller.animations.running] == [
+        "ripple_field",
+    ]
+
+
+def test_led_controller_cancel_animations(controller: LEDController) -> None:
+    """Test that animations are stopped by name.
+
+    Args:
+    ----
+        controller (LEDController): The LED controller.
+    """
+    controller.ripple_drop(5, Color(255, 0, 0))
+    ripple = controller.animations.running[0]
+    sandglass = controller.sandglass(10, Color(0, 0, 255))
+
+    assert controller.cancel_animations("sandglass") == 1
+    assert sandglass.status == AnimationStatus.CANCELLED
+    assert ripple.status == AnimationStatus.RUNNING
+    assert controller.cancel_animations() == 1
+    assert not controller.renderer.compositor.is_active
+
+
+def test_led_controller_show_scene(controller: LEDController) -> None:
+    """Test that a scene is compiled on the first show and then reused.
+
+    Args:
+    ----
+        controller: LEDController instance
+    """
+    controller.show_scene(7, {"frame": ["#ff0000"] * 10})
+    assert (controller.renderer.frame == Color(255, 0, 0)).all()
+    assert controller.renderer.frame_source == "scene-7"
 
-    assert (
-        mock_strip.setPixelColor.call_count == 2 * ripple_length * 2
-    )  # Both directions on and off
-    assert mock_strip.show.call_count == 2 * ripple_length
+    # The edit only shows after the scene was invalidated
+    controller.show_scene(7, {"frame": ["#00ff00"] * 10})
+    assert (controller.renderer.frame == Color(255, 0, 0)).all()
+    assert controller.invalidate_scene(7) is True
+    controller.show_scene(7, {"frame": ["#00ff00"] * 10})
+    assert (controller.renderer.frame == Color(0, 255, 0)).all()
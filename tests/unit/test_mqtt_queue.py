@@ -0,0 +1,99 @@
+"""Unit tests for the MQTT message queues."""
+
+import threading
+
+import pytest
+
+from app.const import QueuePolicy
+from app.mqtt_queue import MessageQueue
+
+
+def test_messages_are_handled_in_order() -> None:
+    """Test that the worker handles the messages in the order they came."""
+    handled = []
+    queue = MessageQueue("test")
+    queue.start(handled.append)
+
+    for client_id in range(5):
+        assert queue.put({"client_id": client_id}) is True
+    assert queue.join()
+    queue.stop()
+
+    assert [message["client_id"] for message in handled] == list(range(5))
+    stats = queue.stats
+    assert stats["handled"] == 5
+    assert stats["depth"] == 0
+    assert stats["lag"]["count"] == 5
+    assert queue.put({"client_id": 5}) is False
+
+
+@pytest.mark.parametrize(
+    ("policy", "expected", "coalesced", "dropped"),
+    [
+        (QueuePolicy.DROP_OLDEST, [1, 2], 0, 1),
+        (QueuePolicy.DROP_NEWEST, [0, 1], 0, 1),
+        (QueuePolicy.LATEST_WINS, [2], 2, 0),
+    ],
+)
+def test_queue_policies(
+    policy: QueuePolicy,
+    expected: list[int],
+    coalesced: int,
+    dropped: int,
+) -> None:
+    """Test what happens to messages when the worker falls behind.
+
+    Args:
+    ----
+        policy: What to do with new messages
+        expected: Values of the messages that are handled
+        coalesced: Number of replaced messages
+        dropped: Number of dropped messages
+    """
+    release = threading.Event()
+    started = threading.Event()
+    handled = []
+
+    def handle(message: dict) -> None:
+        if message["value"] is None:
+            started.set()
+            release.wait(5)
+        else:
+            handled.append(message["value"])
+
+    queue = MessageQueue("test", policy, max_queue=2)
+    queue.start(handle)
+    queue.put({"value": None})
+    started.wait(5)
+    for value in range(3):
+        queue.put({"value": value}, key="sensor-1")
+    assert queue.depth == len(expected)
+    release.set()
+    assert queue.join()
+    queue.stop()
+
+    assert handled == expected
+    assert queue.counters["coalesced"] == coalesced
+    assert queue.counters["dropped"] == dropped
+    assert queue.max_depth == len(expected)
+
+
+def test_failing_handler(capsys: pytest.CaptureFixture) -> None:
+    """Test that a failing message does not stop the worker.
+
+    Args:
+    ----
+        capsys: Captured output
+    """
+    handled = []
+    queue = MessageQueue("mqtt-trigger")
+    queue.start(lambda message: handled.append(message["client_id"]))
+
+    queue.put({})
+    queue.put({"client_id": 1})
+    assert queue.join()
+    queue.stop()
+
+    assert handled == [1]
+    assert queue.counters["failed"] == 1
+    assert "MQTT mqtt-trigger message failed" in capsys.readouterr().out
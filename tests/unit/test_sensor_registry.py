@@ -0,0 +1,39 @@
+"""Unit tests for the in-memory sensor registry."""
+
+from types import SimpleNamespace
+
+from app.sensor_registry import SensorRegistry, parse_client_id
+
+
+def test_parse_client_id() -> None:
+    """Test that all spellings of a client ID give the sensor number."""
+    assert parse_client_id("sensor-3") == 3
+    assert parse_client_id("3") == 3
+    assert parse_client_id(3) == 3
+    assert parse_client_id("camera-3") is None
+
+
+def test_registry_follows_the_database() -> None:
+    """Test loading, adding and removing sensors."""
+    registry = SensorRegistry()
+    registry.load(
+        [
+            SimpleNamespace(id=1, client_id="sensor-1"),
+            SimpleNamespace(id=2, client_id="sensor-2"),
+            SimpleNamespace(id=3, client_id="unknown"),
+        ],
+    )
+    assert len(registry) == 2
+    assert 1 in registry
+    assert "2" in registry
+    assert registry.get("sensor-2") == 2
+
+    registry.add("sensor-5", 7)
+    assert registry.get(5) == 7
+    assert registry.remove(1) is True
+    assert registry.remove(1) is False
+    assert 1 not in registry
+
+    registry.clear()
+    assert len(registry) == 0
+    assert registry.get(5) is None
@@ -0,0 +1,82 @@
+"""Unit tests for the stair geometry."""
+
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from app.const import STAIR_GEOMETRY
+from app.stair_geometry import StairGeometry
+
+
+@pytest.fixture(name="stair")
+def setup_stair() -> StairGeometry:
+    """Compile the default stair geometry."""
+    return StairGeometry.from_dict(STAIR_GEOMETRY)
+
+
+def test_steps(stair: StairGeometry) -> None:
+    """Test that steps are numbered from the top of the strip."""
+    assert stair.step_span(1) == (94, 104)
+    assert stair.step_span(10) == (4, 14)
+    # The bottom step is cut off at the first LED
+    assert stair.step_span(11) == (0, 4)
+    with pytest.raises(IndexError):
+        stair.step_span(12)
+
+    assert stair.led_step(103) == 1
+    assert stair.led_step(94) == 1
+    assert stair.led_step(93) == 2
+    assert stair.led_step(0) == 11
+
+    # Every LED belongs to exactly one step
+    assert (stair.step_masks.sum(axis=0) == 1).all()
+    assert np.flatnonzero(stair.step_mask(11)).tolist() == [0, 1, 2, 3]
+    assert not stair.step_mask(1).flags.writeable
+
+
+def test_sensors(stair: StairGeometry) -> None:
+    """Test the sensor lookups against the original hard-coded tables."""
+    locations = {1: 97, 2: 77, 3: 57, 4: 37, 5: 17, 6: 0}
+    steps = {1: 1, 2: 3, 3: 5, 4: 7, 5: 9, 6: 11}
+    for sensor_id in range(1, 7):
+        assert stair.sensor_position(sensor_id) == locations[sensor_id]
+        assert stair.sensor_step(sensor_id) == steps[sensor_id]
+        assert stair.led_step(locations[sensor_id]) == steps[sensor_id]
+
+    assert stair.sensor_zone(3) == (56, 59)
+    assert np.flatnonzero(stair.sensor_mask(6)).tolist() == [0, 1, 2]
+    assert stair.sensor_position(7) is None
+    assert stair.sensor_zone(7) is None
+
+
+def test_load_other_stair(tmp_path: Path) -> None:
+    """Test that a differently sized stair is loaded from a JSON file."""
+    path = tmp_path / "stair.json"
+    path.write_text(
+        json.dumps(
+            {
+                "led_count": 30,
+                "step_count": 3,
+                "step_length": 10,
+                "sensors": {"1": {"led": 25, "step": 1}},
+            },
+        ),
+    )
+    stair = StairGeometry.load(path)
+    assert stair.led_count == 30
+    assert stair.sensor_zone(1) == (25, 26)
+    assert stair.step_span(3) == (0, 10)
+
+
+def test_invalid_geometry() -> None:
+    """Test that layouts that do not fit the strip are rejected."""
+    with pytest.raises(ValueError, match="leave LEDs unused"):
+        StairGeometry(30, 2, 10, {})
+    with pytest.raises(ValueError, match="exceed the LED strip"):
+        StairGeometry(30, 5, 10, {})
+    with pytest.raises(ValueError, match="outside of the LED strip"):
+        StairGeometry(30, 3, 10, {1: {"led": 30, "step": 1}})
+    with pytest.raises(ValueError, match="is on step 4 of 3"):
+        StairGeometry(30, 3, 10, {1: {"led": 5, "step": 4}})